@@ -1 +1,8 @@
-from .generator import generate_package  # noqa: F401
+def __getattr__(name: str):
+    # Imported when first used, so the client (`client.py`) does not have to load
+    # the generator (and jinja2 and yaml) just to talk to the server.
+    if name == "generate_package":
+        from .generator import generate_package
+
+        return generate_package
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,24 @@
+from .load import bench_type_file_formats, bench_yaml_backends  # noqa: F401
+from .memory import (  # noqa: F401
+    allocation_site,
+    compare_load_memory,
+    load_memory,
+    load_memory_comparison,
+    peak_rss_of_load,
+    phase_memory,
+    trace_generation_memory,
+)
+from .render import bench_engines, synthetic_model  # noqa: F401
+from .suite import (  # noqa: F401
+    bench_memory,
+    bench_suite,
+    compare_to_baseline,
+    load_baseline,
+    save_baseline,
+)
+from .synthetic import (  # noqa: F401
+    synthetic_type_document,
+    write_synthetic_type_file,
+)
+from .templates import bench_startup, bench_template_environments  # noqa: F401
+from .timing import best_of  # noqa: F401
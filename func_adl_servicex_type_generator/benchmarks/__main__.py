@@ -0,0 +1,116 @@
+import argparse
+import tempfile
+from pathlib import Path
+
+from func_adl_servicex_type_generator.benchmarks.load import (
+    bench_type_file_formats,
+    bench_yaml_backends,
+)
+from func_adl_servicex_type_generator.benchmarks.memory import (
+    compare_load_memory,
+    peak_rss_of_load,
+)
+from func_adl_servicex_type_generator.benchmarks.render import bench_engines
+from func_adl_servicex_type_generator.benchmarks.templates import (
+    bench_startup,
+    bench_template_environments,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the type generator")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    yaml_parser = commands.add_parser("yaml", help="Compare the yaml loader backends")
+    yaml_parser.add_argument("type_file", type=Path, help="The type file to load")
+    yaml_parser.add_argument(
+        "--repeat", type=int, default=3, help="Number of loads per backend"
+    )
+
+    formats_parser = commands.add_parser(
+        "formats", help="Compare loading yaml, json, and msgpack type files"
+    )
+    formats_parser.add_argument("type_file", type=Path, help="The type file to load")
+    formats_parser.add_argument(
+        "--repeat", type=int, default=3, help="Number of loads per format"
+    )
+
+    memory_parser = commands.add_parser(
+        "memory", help="Peak RSS and model size when loading a type file"
+    )
+    memory_parser.add_argument("type_file", type=Path, help="The type file to load")
+    memory_parser.add_argument(
+        "--yaml_backend", choices=["auto", "c", "python"], default="auto"
+    )
+    memory_parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Also load into plain dataclasses without string interning, and "
+        "compare the peak RSS",
+    )
+
+    templates_parser = commands.add_parser(
+        "templates",
+        help="Template compile time, and sx_type_gen startup with and without the "
+        "compiled template cache",
+    )
+    templates_parser.add_argument(
+        "--repeat", type=int, default=3, help="Number of runs of each"
+    )
+
+    engines_parser = commands.add_parser(
+        "engines",
+        help="Render a synthetic model with the jinja and fast class file engines",
+    )
+    engines_parser.add_argument(
+        "--classes", type=int, default=20000, help="Number of classes in the model"
+    )
+    engines_parser.add_argument(
+        "--repeat", type=int, default=1, help="Number of renders per engine"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "yaml":
+        timings = bench_yaml_backends(args.type_file, args.repeat)
+        for backend, t in timings.items():
+            print(f"{backend:>8}: {t:.3f} s")
+        if "c" in timings:
+            print(f" speedup: {timings['python'] / timings['c']:.1f}x")
+    elif args.command == "formats":
+        timings = bench_type_file_formats(args.type_file, args.repeat)
+        for file_format, t in timings.items():
+            print(f"{file_format:>8}: {t:.3f} s")
+    elif args.command == "memory":
+        m = peak_rss_of_load(args.type_file, args.yaml_backend)
+        print(f"   peak RSS: {m.rss_after_bytes / 1024 / 1024:.1f} MB")
+        print(
+            f"  load RSS: {(m.rss_after_bytes - m.rss_before_bytes) / 1024 / 1024:.1f} MB"
+        )
+        print(f"     model: {m.model_bytes / 1024 / 1024:.1f} MB")
+        if args.compare:
+            c = compare_load_memory(args.type_file, args.yaml_backend)
+            print(f"  plain RSS: {c.plain_rss_bytes / 1024 / 1024:.1f} MB (peak)")
+            print(f"slotted RSS: {c.slotted_rss_bytes / 1024 / 1024:.1f} MB (peak)")
+            print(f"      ratio: {c.ratio:.2f}x")
+    elif args.command == "templates":
+        timings = bench_template_environments(repeat=args.repeat)
+        for kind, t in timings.items():
+            print(f"{kind:>15}: {t * 1000:.1f} ms")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_dir = Path(tmp_dir)
+            print(f"  startup (cold): {bench_startup(None, repeat=args.repeat):.3f} s")
+            bench_startup(cache_dir, repeat=1)
+            print(
+                f"  startup (warm): {bench_startup(cache_dir, repeat=args.repeat):.3f} s"
+            )
+    elif args.command == "engines":
+        timings = bench_engines(args.classes, repeat=args.repeat)
+        for engine, t in timings.items():
+            print(f"{engine:>8}: {t:.3f} s")
+        print(f" speedup: {timings['jinja'] / timings['fast']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
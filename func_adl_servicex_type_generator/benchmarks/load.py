@@ -0,0 +1,48 @@
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+from func_adl_servicex_type_generator.benchmarks.timing import best_of
+from func_adl_servicex_type_generator.loader import (
+    _g_yaml_backends,
+    convert_type_file,
+    load_type_file,
+    load_yaml,
+    msgpack,
+)
+
+
+def bench_yaml_backends(type_file: Path, repeat: int = 3) -> Dict[str, float]:
+    """Time `load_yaml` on a type file with each of the available yaml backends.
+
+    Args:
+        type_file (Path): The type file to load (the bigger the better)
+        repeat (int): Number of times to load the file with each backend
+
+    Returns:
+        Dict[str, float]: Best load time, in seconds, indexed by backend name
+    """
+    return {
+        backend: best_of(lambda: load_yaml(type_file, backend=backend), repeat)
+        for backend in _g_yaml_backends.keys()
+    }
+
+
+def bench_type_file_formats(type_file: Path, repeat: int = 3) -> Dict[str, float]:
+    """Convert a type file to each format we can read, and time loading it.
+
+    Args:
+        type_file (Path): The type file to convert and load
+        repeat (int): Number of times to load each format
+
+    Returns:
+        Dict[str, float]: Best load time, in seconds, indexed by format
+    """
+    extensions = [".yaml", ".json"] + ([".msgpack"] if msgpack is not None else [])
+    result = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for ext in extensions:
+            converted = Path(tmp_dir) / f"types{ext}"
+            convert_type_file(type_file, converted)
+            result[ext[1:]] = best_of(lambda: load_type_file(converted), repeat)
+    return result
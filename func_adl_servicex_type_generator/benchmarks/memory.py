@@ -0,0 +1,267 @@
+import gc
+import os
+import subprocess
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+from func_adl_servicex_type_generator.generator import _g_template_path
+from func_adl_servicex_type_generator.loader import (
+    iter_type_document,
+    load_raw_type_file,
+    load_type_path,
+    loaded_data_from_stream,
+)
+from func_adl_servicex_type_generator.package import class_renderer
+
+# Run in a fresh interpreter so the peak RSS is for the load alone. With `plain`
+# the model is built the way it was before it was slimmed down: plain dataclasses
+# (with a `__dict__`) and strings that are not interned.
+_g_rss_script = """
+import dataclasses, resource, sys
+from pathlib import Path
+from func_adl_servicex_type_generator import loader
+if sys.argv[3] == "plain":
+    loader._intern = lambda s: s
+    for name in ["class_info", "enum_value_info", "method_arg_info", "method_info"]:
+        cls = getattr(loader, name)
+        setattr(loader, name, dataclasses.make_dataclass(
+            name,
+            [
+                (f.name, f.type, dataclasses.field(
+                    default=f.default, default_factory=f.default_factory
+                ))
+                for f in dataclasses.fields(cls)
+            ],
+            frozen=cls.__dataclass_params__.frozen,
+        ))
+def peak_rss():
+    # On linux ru_maxrss is carried over from the parent process, so use the
+    # high water mark of this process' memory instead.
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+before = peak_rss()
+data = loader.load_type_path(Path(sys.argv[1]), backend=sys.argv[2])
+after = peak_rss()
+print(before, after)
+"""
+
+
+@dataclass
+class load_memory:
+    "Memory used loading a type file"
+
+    # Peak RSS of the process after importing the generator, before the load
+    rss_before_bytes: int
+
+    # Peak RSS of the process after the load
+    rss_after_bytes: int
+
+    # Memory still held by the loaded model
+    model_bytes: int
+
+
+@dataclass
+class load_memory_comparison:
+    "Peak RSS loading a type file into the slotted model and into a plain one"
+
+    # Peak RSS after loading with plain dataclasses and no string interning
+    plain_rss_bytes: int
+
+    # Peak RSS after loading with the model as it is
+    slotted_rss_bytes: int
+
+    @property
+    def ratio(self) -> float:
+        "How many times smaller the peak RSS is with the slotted model"
+        return self.plain_rss_bytes / self.slotted_rss_bytes
+
+
+def _rss_of_load(type_file: Path, backend: str, model: str) -> Tuple[int, int]:
+    """The peak RSS before and after loading a type file in a fresh python
+    process, with the `slotted` or `plain` model"""
+    env = dict(os.environ)
+    package_root = str(Path(__file__).parent.parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [package_root] + ([env["PYTHONPATH"]] if "PYTHONPATH" in env else [])
+    )
+    r = subprocess.run(
+        [sys.executable, "-c", _g_rss_script, str(type_file), backend, model],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if r.returncode != 0:
+        raise RuntimeError(
+            f"Unable to measure the memory used loading {type_file}: {r.stderr}"
+        )
+    rss_before, rss_after = [int(v) for v in r.stdout.split()]
+    return rss_before, rss_after
+
+
+def peak_rss_of_load(type_file: Path, backend: str = "auto") -> load_memory:
+    """Measure the memory needed to load a type file.
+
+    The peak RSS is measured in a separate python process (it needs the
+    `resource` module, so this does not run on Windows). The model size is
+    measured in this process with `tracemalloc`.
+
+    Args:
+        type_file (Path): The type file (or directory of them) to load
+        backend (str): The yaml parser backend
+
+    Returns:
+        load_memory: The memory used
+    """
+    rss_before, rss_after = _rss_of_load(type_file, backend, "slotted")
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        data = load_type_path(type_file, backend=backend)
+        gc.collect()
+        model_bytes = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    del data
+
+    return load_memory(rss_before, rss_after, model_bytes)
+
+
+def compare_load_memory(
+    type_file: Path, backend: str = "auto"
+) -> load_memory_comparison:
+    """Compare the peak RSS of loading a type file into the model (slotted
+    classes, interned strings) with loading it into plain dataclasses without
+    interning. Each load runs in its own python process (see `peak_rss_of_load`).
+
+    Args:
+        type_file (Path): The type file (or directory of them) to load
+        backend (str): The yaml parser backend
+
+    Returns:
+        load_memory_comparison: The peak RSS of each
+    """
+    return load_memory_comparison(
+        _rss_of_load(type_file, backend, "plain")[1],
+        _rss_of_load(type_file, backend, "slotted")[1],
+    )
+
+
+@dataclass
+class allocation_site:
+    "A line of code, and the memory allocated there"
+
+    # `file:line`
+    location: str
+
+    # Bytes, and number of blocks, allocated there and still held
+    size_bytes: int
+    count: int
+
+
+@dataclass
+class phase_memory:
+    "Memory used by one phase of a generation"
+
+    # Name of the phase
+    name: str
+
+    # Memory allocated during the phase and still held at its end
+    retained_bytes: int
+
+    # Highest memory use during the phase, above what was held when it started
+    peak_bytes: int
+
+    # Where the retained memory was allocated, biggest first
+    top_sites: List[allocation_site]
+
+
+class _phase_tracer:
+    """Runs the phases one after the other, with tracemalloc running. The snapshot
+    at the end of one phase is the starting point of the next."""
+
+    def __init__(self, n_sites: int):
+        self._n_sites = n_sites
+        gc.collect()
+        self._snapshot = tracemalloc.take_snapshot()
+        self.phases: List[phase_memory] = []
+
+    def run(self, name: str, f: Callable[[], Any]) -> Any:
+        "Run `f` as phase `name`, and return what it returns"
+        start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+        result = f()
+
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        sites = [
+            allocation_site(
+                f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+                d.size_diff,
+                d.count_diff,
+            )
+            for d in after.compare_to(self._snapshot, "lineno")
+            if d.size_diff > 0 and d.traceback[0].filename != tracemalloc.__file__
+        ][: self._n_sites]
+        self._snapshot = after
+        self.phases.append(phase_memory(name, current - start, peak - start, sites))
+        return result
+
+
+def trace_generation_memory(
+    type_file: Path,
+    n_sites: int = 10,
+    engine: str = "jinja",
+    template_path: Path = _g_template_path,
+) -> List[phase_memory]:
+    """Follow the memory used by each phase of generating the class files for a
+    type file, with `tracemalloc`:
+
+    - `yaml_document`: the raw type file contents
+    - `loaded_data`: the `LoadedData` model built from it (including the index)
+    - `resolution`: the resolved methods, method tables, and view model of every
+      class
+    - `rendered_text`: the text of every class file
+
+    Everything from each phase is kept until the end, as it is while a package is
+    generated, so the retained memory of the phases adds up to the total.
+
+    Args:
+        type_file (Path): The type file to load (yaml, json, or msgpack)
+        n_sites (int): Number of allocation sites to list for each phase
+        engine (str): How to render the class files
+        template_path (Path): The template directory
+
+    Returns:
+        List[phase_memory]: The memory used by each phase, in order
+    """
+    tracemalloc.start()
+    try:
+        tracer = _phase_tracer(n_sites)
+        raw = tracer.run("yaml_document", lambda: load_raw_type_file(type_file))
+        data = tracer.run(
+            "loaded_data",
+            lambda: loaded_data_from_stream(iter_type_document(raw), str(type_file)),
+        )
+
+        classes = [c for c in data.classes if not c.is_alias]
+        renderer = class_renderer(
+            data.classes, template_path, "package", data.index, engine=engine
+        )
+        views = tracer.run("resolution", lambda: [renderer.view(c) for c in classes])
+        tracer.run("rendered_text", lambda: [renderer.render_view(v) for v in views])
+    finally:
+        tracemalloc.stop()
+
+    return tracer.phases
@@ -0,0 +1,58 @@
+from pathlib import Path
+from typing import Dict
+
+from func_adl_servicex_type_generator.benchmarks.synthetic import (
+    synthetic_type_document,
+)
+from func_adl_servicex_type_generator.benchmarks.timing import best_of
+from func_adl_servicex_type_generator.generator import _g_template_path
+from func_adl_servicex_type_generator.loader import (
+    LoadedData,
+    iter_type_document,
+    loaded_data_from_stream,
+)
+from func_adl_servicex_type_generator.package import _g_engines, class_renderer
+
+
+def synthetic_model(n_classes: int, seed: int = 1) -> LoadedData:
+    "Load a synthetic type file document (see `synthetic_type_document`)"
+    return loaded_data_from_stream(
+        iter_type_document(synthetic_type_document(n_classes, seed)),
+        source="synthetic model",
+    )
+
+
+def bench_engines(
+    n_classes: int = 20000,
+    template_path: Path = _g_template_path,
+    repeat: int = 1,
+) -> Dict[str, float]:
+    """Time rendering every class module of a synthetic model with each engine.
+
+    A new `class_renderer` is used for each run, so the time includes resolving
+    the methods of every class.
+
+    Args:
+        n_classes (int): Number of classes in the synthetic model
+        template_path (Path): The template directory
+        repeat (int): Number of times to render the model with each engine
+
+    Returns:
+        Dict[str, float]: Best time, in seconds, indexed by engine name
+    """
+    data = synthetic_model(n_classes)
+
+    def render_all(engine: str):
+        renderer = class_renderer(
+            data.classes,
+            template_path,
+            "func_adl_servicex_xaodr25",
+            data.index,
+            engine=engine,
+        )
+        for c in data.classes:
+            renderer.render(c)
+
+    return {
+        engine: best_of(lambda: render_all(engine), repeat) for engine in _g_engines
+    }
@@ -0,0 +1,219 @@
+import itertools
+import json
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from func_adl_servicex_type_generator.benchmarks.memory import (
+    phase_memory,
+    trace_generation_memory,
+)
+from func_adl_servicex_type_generator.benchmarks.synthetic import (
+    write_synthetic_type_file,
+)
+from func_adl_servicex_type_generator.benchmarks.timing import best_of
+from func_adl_servicex_type_generator.generator import (
+    _g_template_path,
+    generate_package,
+)
+from func_adl_servicex_type_generator.loader import load_yaml
+from func_adl_servicex_type_generator.model_cache import default_cache_dir
+from func_adl_servicex_type_generator.output import output_writer
+from func_adl_servicex_type_generator.package import (
+    template_package_scaffolding,
+    write_out_classes,
+)
+
+# The benchmarks in the suite, in the order they are run
+_g_suite_benchmarks = [
+    "load_yaml",
+    "write_out_classes",
+    "template_package_scaffolding",
+    "generate_package",
+]
+
+# Model sizes (number of classes) the suite runs by default, and the range it
+# supports.
+default_suite_sizes = [100, 1000, 10000]
+_g_min_classes = 100
+_g_max_classes = 50000
+
+# A benchmark this many times slower than its baseline is a regression
+default_max_ratio = 1.5
+
+# Timings, by benchmark name and then model size (as a string, like the json)
+suite_results = Dict[str, Dict[str, float]]
+
+
+def default_baseline_path() -> Path:
+    "Where the suite baseline is kept if no other file is given"
+    return default_cache_dir() / "benchmark_baseline.json"
+
+
+def _check_sizes(sizes: Sequence[int]):
+    "Make sure the model sizes are ones the suite supports"
+    for n in sizes:
+        if not (_g_min_classes <= n <= _g_max_classes):
+            raise RuntimeError(
+                f"Model size {n} is out of range - use {_g_min_classes} to "
+                f"{_g_max_classes} classes"
+            )
+
+
+def bench_suite(
+    sizes: Sequence[int] = default_suite_sizes,
+    repeat: int = 1,
+    engine: str = "jinja",
+    template_path: Path = _g_template_path,
+) -> suite_results:
+    """Time each part of the generation on synthetic models of several sizes:
+
+    - `load_yaml`: parse the type file
+    - `write_out_classes`: write all the class files and `__init__` files
+    - `template_package_scaffolding`: write the package files and
+      `event_collection.py`
+    - `generate_package`: everything, from type file to package
+
+    Everything runs in one process (`jobs=1`) so the numbers don't depend on the
+    number of CPUs.
+
+    Args:
+        sizes (Sequence[int]): The number of classes in each model (100 to 50k)
+        repeat (int): Number of times to run each benchmark (the best is kept)
+        engine (str): How to write the class files
+        template_path (Path): The template directory
+
+    Returns:
+        suite_results: Best time, in seconds, by benchmark and model size
+    """
+    _check_sizes(sizes)
+    results: suite_results = {name: {} for name in _g_suite_benchmarks}
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+            type_file = tmp_path / "types.yaml"
+            write_synthetic_type_file(type_file, n)
+
+            # Every run writes into a new directory, so each one does the same work
+            run_number = itertools.count()
+
+            def output_dir() -> Path:
+                return tmp_path / f"run_{next(run_number)}"
+
+            results["load_yaml"][str(n)] = best_of(lambda: load_yaml(type_file), repeat)
+
+            data = load_yaml(type_file)
+            package_name = "func_adl_servicex_xaodr25"
+            calibration_types = [""] + list(data.config["dataset_types"])
+
+            def write_classes():
+                out = output_dir()
+                write_out_classes(
+                    data.classes,
+                    template_path,
+                    out / package_name,
+                    package_name,
+                    calibration_types,
+                    "25",
+                    config_vars=data.config,
+                    index=data.index,
+                    writer=output_writer(out),
+                    engine=engine,
+                )
+
+            results["write_out_classes"][str(n)] = best_of(write_classes, repeat)
+
+            template_data = {
+                "package_name": package_name,
+                "package_version": "1.0.0",
+                "package_info_description": "synthetic model",
+                "calibration_types": calibration_types,
+                "backend_default_name": "atlasr25",
+                "collections": data.collections,
+                "metadata": data.metadata,
+                "release_series": "25",
+            }
+            results["template_package_scaffolding"][str(n)] = best_of(
+                lambda: template_package_scaffolding(
+                    template_data, template_path, output_dir(), data.files
+                ),
+                repeat,
+            )
+
+            results["generate_package"][str(n)] = best_of(
+                lambda: generate_package(
+                    type_file, "1.0.0", output_dir(), jobs=1, engine=engine
+                ),
+                repeat,
+            )
+    return results
+
+
+def save_baseline(path: Path, results: suite_results):
+    "Save suite results as the baseline to compare later runs against"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2))
+
+
+def load_baseline(path: Path) -> suite_results:
+    "Load a baseline saved by `save_baseline`"
+    return json.loads(path.read_text())
+
+
+def compare_to_baseline(
+    results: suite_results,
+    baseline: suite_results,
+    max_ratio: float = default_max_ratio,
+) -> List[str]:
+    """Find the benchmarks that got slower than their baseline.
+
+    Only benchmarks and sizes that are in both are compared.
+
+    Args:
+        results (suite_results): This run
+        baseline (suite_results): The baseline run
+        max_ratio (float): A benchmark that takes more than this many times its
+            baseline time is a regression.
+
+    Returns:
+        List[str]: A description of each regression (empty if there are none)
+    """
+    regressions = []
+    for name, timings in results.items():
+        for size, t in timings.items():
+            base = baseline.get(name, {}).get(size, None)
+            if base is None or base <= 0:
+                continue
+            ratio = t / base
+            if ratio > max_ratio:
+                regressions.append(
+                    f"{name} ({size} classes) is {ratio:.2f}x its baseline: "
+                    f"{t:.3f} s vs {base:.3f} s (limit {max_ratio:.2f}x)"
+                )
+    return regressions
+
+
+def bench_memory(
+    sizes: Sequence[int] = default_suite_sizes,
+    n_sites: int = 5,
+    engine: str = "jinja",
+) -> Dict[str, List[phase_memory]]:
+    """Trace the memory used by each phase of the generation (see
+    `trace_generation_memory`) on synthetic models of several sizes.
+
+    Args:
+        sizes (Sequence[int]): The number of classes in each model (100 to 50k)
+        n_sites (int): Number of allocation sites to show for each phase
+        engine (str): How to render the class files
+
+    Returns:
+        Dict[str, List[phase_memory]]: The phases, by model size
+    """
+    _check_sizes(sizes)
+    results = {}
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            type_file = Path(tmp_dir) / "types.yaml"
+            write_synthetic_type_file(type_file, n)
+            results[str(n)] = trace_generation_memory(type_file, n_sites, engine)
+    return results
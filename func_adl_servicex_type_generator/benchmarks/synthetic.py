@@ -0,0 +1,277 @@
+import random
+from pathlib import Path
+from typing import Any, Dict, List
+
+import yaml
+
+# Namespaces the synthetic classes are spread over
+_g_namespaces = ["xAOD", "xAOD::Trig", "xAOD::Calo", "Analysis"]
+
+# Return types for methods that don't return another class
+_g_basic_return_types = [
+    "bool",
+    "bool",
+    "unsigned int",
+    "float",
+    "double",
+    "int",
+    "const char *",
+    "const vector<float>",
+    "const vector<int>",
+]
+
+# Argument types (python)
+_g_argument_types = ["int", "float", "str", "bool"]
+
+
+def _py_name(cpp_name: str) -> str:
+    "The python name for a C++ class name, the way the type file writer does it"
+    return cpp_name.replace("::", ".")
+
+
+def _flat_name(cpp_name: str) -> str:
+    "The python name for a template instance (`vector<xAOD::Jet_v1>`)"
+    return (
+        cpp_name.replace("::", "_")
+        .replace("<", "_")
+        .replace(">", "_")
+        .replace("*", "")
+        .replace(" ", "")
+    )
+
+
+def _support_classes() -> List[Dict[str, Any]]:
+    "The vectors of basic types that methods can return"
+    return [
+        {
+            "python_name": _flat_name(f"vector<{t}>"),
+            "cpp_name": f"vector<{t}>",
+            "is_container_of_cpp": t,
+            "is_container_of_python": py_t,
+            "methods": [{"name": "size", "return_type": "unsigned int"}],
+        }
+        for t, py_t in [("float", "float"), ("int", "int")]
+    ]
+
+
+def _object_class(
+    rnd: random.Random, cpp_name: str, known: List[str], n_methods: int
+) -> Dict[str, Any]:
+    "An xAOD style object, with methods that return basic types and other objects"
+    enum_name = "Kind"
+    methods: List[Dict[str, Any]] = []
+    for i in range(n_methods):
+        pick = rnd.random()
+        if pick < 0.1 and len(known) > 0:
+            return_type = f"const {rnd.choice(known)} *"
+        elif pick < 0.15 and len(known) > 0:
+            return_type = f"const vector<{rnd.choice(known)}>"
+        elif pick < 0.2:
+            return_type = f"{cpp_name}::{enum_name}"
+        else:
+            return_type = rnd.choice(_g_basic_return_types)
+        m: Dict[str, Any] = {"name": f"method{i}", "return_type": return_type}
+        n_args = rnd.choice([0, 0, 0, 1, 2])
+        if n_args > 0:
+            m["arguments"] = [
+                {"name": f"arg{a}", "type": rnd.choice(_g_argument_types)}
+                for a in range(n_args)
+            ]
+        methods.append(m)
+
+    # A typed accessor, like `auxdataConst`, that takes a parameter
+    methods.append(
+        {
+            "name": "auxdataConst",
+            "return_type": "U",
+            "arguments": [{"name": "name", "type": "str"}],
+            "parameter_arguments": [{"name": "auxdata_type", "type": "cpp_type[U]"}],
+            "param_helper": "type_support.index_type_forwarder",
+            "param_type_callback": "lambda s, a, param_1: {{package_name}}.type_support"
+            ".cpp_generic_1arg_callback('auxdataConst', s, a, param_1)",
+        }
+    )
+
+    # And one that takes an enum defined by this class
+    methods.append(
+        {
+            "name": "hasKind",
+            "return_type": "bool",
+            "arguments": [
+                {"name": "kind", "type": f"{_py_name(cpp_name)}.{enum_name}"}
+            ],
+        }
+    )
+
+    header = cpp_name.split("::")[-1]
+    return {
+        "python_name": _py_name(cpp_name),
+        "cpp_name": cpp_name,
+        "include_file": f"{cpp_name.split('::')[0]}Synthetic/versions/{header}.h",
+        "library": f"{cpp_name.split('::')[0]}Synthetic",
+        "methods": methods,
+        "enums": [
+            {
+                "name": enum_name,
+                "values": [
+                    {"name": f"Kind{v}", "value": v} for v in range(rnd.randint(2, 12))
+                ],
+            }
+        ],
+    }
+
+
+def _collection(rnd: random.Random, cpp_name: str, index: int) -> Dict[str, Any]:
+    "An event collection of `cpp_name` objects"
+    c: Dict[str, Any] = {
+        "collection_name": f"Objects{index}",
+        "cpp_item_type": cpp_name,
+        "python_item_type": _py_name(cpp_name),
+        "cpp_container_type": f"DataVector<{cpp_name}>",
+        "python_container_type": f"Iterable[{_py_name(cpp_name)}]",
+        "include_file": f"{cpp_name.split('::')[0]}Synthetic/Object{index}.h",
+        "link_libraries": [f"{cpp_name.split('::')[0]}Synthetic"],
+        "parameters": [
+            {"name": "collection", "type": "str", "default_value": f"'Objects{index}'"}
+        ],
+    }
+
+    # Some collections are calibrated, like jets and electrons
+    if rnd.random() < 0.5:
+        c["method_callback"] = (
+            "lambda s, a: {{package_name}}.calibration_support.fixup_collection_call"
+            f"(s, a, 'objects{index}_collection')"
+        )
+        c["extra_parameters"] = [
+            {
+                "name": "calibration",
+                "type": "str",
+                "default_value": "'NOSYS'",
+                "actions": [
+                    {
+                        "value": "'*None*'",
+                        "metadata_names": [],
+                        "bank_rename": "{bank_name}",
+                    },
+                    {
+                        "value": "'*Any*'",
+                        "metadata_names": [f"calibrate_objects{index}"],
+                        "bank_rename": "{bank_name}_{calibration}",
+                    },
+                ],
+            },
+            {
+                "name": "working_point",
+                "type": "str",
+                "default_value": "'Tight'",
+                "actions": [],
+            },
+        ]
+    return c
+
+
+def _metadata(name: str) -> Dict[str, Any]:
+    "A job script block, like the ones the calibrated collections load"
+    return {
+        "name": name,
+        "data": [
+            {
+                "metadata_type": "add_job_script",
+                "name": name,
+                "script": [
+                    f"# Calibrate {{bank_name}} for {name}",
+                    "from AnalysisAlgorithmsConfig.ConfigSequence import ConfigSequence",
+                    "config = ConfigSequence()",
+                    "config.setOptionValue('.workingPoint', '{working_point}')",
+                ],
+                "depends_on": ["*PREVIOUS*"],
+            }
+        ],
+    }
+
+
+def synthetic_type_document(n_classes: int, seed: int = 1) -> Dict[str, Any]:
+    """Build a type file document (what `load_raw_type_file` returns) that looks
+    like an xAOD model: objects in several namespaces with enums and
+    parameterized methods, a `vector` of each, and an `ElementLink` to each that
+    behaves like it. One in four objects has an event collection, and half of
+    those take extra (calibration) parameters that load metadata.
+
+    The same arguments always give the same document.
+
+    Args:
+        n_classes (int): Number of classes to make
+        seed (int): Seed for the random choices
+
+    Returns:
+        Dict[str, Any]: The type file contents
+    """
+    rnd = random.Random(seed)
+    classes = _support_classes()
+    objects: List[str] = []
+    while len(classes) < n_classes:
+        cpp_name = f"{rnd.choice(_g_namespaces)}::Object{len(objects)}_v1"
+        classes.append(_object_class(rnd, cpp_name, objects[-50:], rnd.randint(5, 40)))
+        objects.append(cpp_name)
+
+        vector_name = f"vector<{cpp_name}>"
+        classes.append(
+            {
+                "python_name": _flat_name(vector_name),
+                "cpp_name": vector_name,
+                "is_container_of_cpp": cpp_name,
+                "is_container_of_python": _py_name(cpp_name),
+                "methods": [{"name": "size", "return_type": "unsigned int"}],
+            }
+        )
+
+        link_name = f"ElementLink<DataVector<{cpp_name}>>"
+        classes.append(
+            {
+                "python_name": _flat_name(link_name),
+                "cpp_name": link_name,
+                "also_behaves_like": [f"{cpp_name}**"],
+                "methods": [{"name": "isValid", "return_type": "bool"}],
+            }
+        )
+
+    classes = classes[:n_classes]
+    known = set(c["cpp_name"] for c in classes)
+
+    collections = []
+    for i, cpp_name in enumerate(objects[::4]):
+        if cpp_name in known:
+            collections.append(_collection(rnd, cpp_name, i))
+
+    metadata = [
+        _metadata(a["metadata_names"][0])
+        for c in collections
+        for p in c.get("extra_parameters", [])
+        for a in p["actions"]
+        if len(a["metadata_names"]) > 0
+    ]
+
+    return {
+        "collections": collections,
+        "classes": classes,
+        "metadata": metadata,
+        "config": {"atlas_release": "25.0.0", "dataset_types": ["PHYS", "PHYSLITE"]},
+    }
+
+
+def write_synthetic_type_file(path: Path, n_classes: int, seed: int = 1):
+    """Write a synthetic type file (see `synthetic_type_document`) as yaml.
+
+    Args:
+        path (Path): The file to write
+        n_classes (int): Number of classes to make
+        seed (int): Seed for the random choices
+    """
+    dumper = yaml.CSafeDumper if hasattr(yaml, "CSafeDumper") else yaml.SafeDumper
+    with path.open("wt") as f_out:
+        yaml.dump(
+            synthetic_type_document(n_classes, seed),
+            f_out,
+            Dumper=dumper,
+            sort_keys=False,
+        )
@@ -0,0 +1,89 @@
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from func_adl_servicex_type_generator.benchmarks.timing import best_of
+from func_adl_servicex_type_generator.generator import _g_template_path
+from func_adl_servicex_type_generator.package import (
+    reset_template_environments,
+    template_environment,
+)
+
+
+def _build_environments(template_path: Path, bytecode_cache_dir: Optional[Path]):
+    "Build (and so compile) the package and class template environments"
+    template_environment(template_path / "package", bytecode_cache_dir)
+    template_environment(template_path / "files", bytecode_cache_dir)
+
+
+def bench_template_environments(
+    template_path: Path = _g_template_path, repeat: int = 3
+) -> Dict[str, float]:
+    """Time getting the template environments ready to render.
+
+    - `compile`: compile every template from source
+    - `bytecode_cache`: load the compiled templates from a warm bytecode cache
+    - `shared`: reuse the environments already built in this process
+
+    Args:
+        template_path (Path): The template directory
+        repeat (int): Number of times to build the environments for each
+
+    Returns:
+        Dict[str, float]: Best time, in seconds, for each
+    """
+
+    def fresh(bytecode_cache_dir: Optional[Path]):
+        # Also forgets the compiled sub-templates, so they are compiled again
+        reset_template_environments()
+        _build_environments(template_path, bytecode_cache_dir)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir = Path(tmp_dir)
+        fresh(cache_dir)
+        result = {
+            "compile": best_of(lambda: fresh(None), repeat),
+            "bytecode_cache": best_of(lambda: fresh(cache_dir), repeat),
+            "shared": best_of(
+                lambda: _build_environments(template_path, cache_dir), repeat
+            ),
+        }
+    reset_template_environments()
+    return result
+
+
+def bench_startup(
+    bytecode_cache_dir: Optional[Path] = None,
+    template_path: Path = _g_template_path,
+    repeat: int = 3,
+) -> float:
+    """Time the startup of a new `sx_type_gen` process: importing the generator and
+    getting the template environments ready.
+
+    Args:
+        bytecode_cache_dir (Optional[Path]): The compiled template cache to use, or
+            None to compile the templates from source.
+        template_path (Path): The template directory
+        repeat (int): Number of processes to start
+
+    Returns:
+        float: Best wall time, in seconds
+    """
+    code = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "from func_adl_servicex_type_generator.benchmarks.templates import "
+        "_build_environments\n"
+        "cache = None if sys.argv[2] == '' else Path(sys.argv[2])\n"
+        "_build_environments(Path(sys.argv[1]), cache)\n"
+    )
+    args = [
+        sys.executable,
+        "-c",
+        code,
+        str(template_path),
+        "" if bytecode_cache_dir is None else str(bytecode_cache_dir),
+    ]
+    return best_of(lambda: subprocess.run(args, check=True), repeat)
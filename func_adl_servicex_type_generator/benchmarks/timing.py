@@ -0,0 +1,26 @@
+import time
+from typing import Any, Callable
+
+
+def best_of(f: Callable[[], Any], repeat: int = 3) -> float:
+    """Run a function several times and return the fastest wall time.
+
+    The best of several runs is the least sensitive to other activity on the
+    machine, which is what we want when comparing two implementations.
+
+    Args:
+        f (Callable[[], Any]): The function to time
+        repeat (int): How many times to run it
+
+    Returns:
+        float: The fastest run, in seconds
+    """
+    assert repeat > 0, "Must run the benchmark at least once"
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    assert best is not None
+    return best
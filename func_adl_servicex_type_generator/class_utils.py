@@ -1,3 +1,6 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Callable, Optional, Set, Tuple
 
@@ -37,6 +40,77 @@ def remove_ns_stem(stem: str, name: str) -> str:
     return name
 
 
+@dataclass(frozen=True)
+class type_expression:
+    """A parsed python type expression.
+
+    `Iterable[xAOD.Jet]` -> type_expression("Iterable", (type_expression("xAOD.Jet"),))
+
+    `args` is None when the type has no `[...]` part.
+    """
+
+    name: str
+    args: Optional[Tuple["type_expression", ...]] = None
+
+    def transform(self, transform: Callable[[str], str]) -> "type_expression":
+        "Return a new expression with `transform` applied to every type name"
+        return type_expression(
+            transform(self.name),
+            (
+                None
+                if self.args is None
+                else tuple(a.transform(transform) for a in self.args)
+            ),
+        )
+
+    def __str__(self) -> str:
+        if self.args is None:
+            return self.name
+        return f"{self.name}[{', '.join(str(a) for a in self.args)}]"
+
+
+_g_type_token = re.compile(r"[\[\],]|[^\[\],]+")
+
+
+@lru_cache(maxsize=None)
+def parse_type_expression(name: str) -> type_expression:
+    """Parse a python type expression into a tree. Results are cached, so each
+    distinct type string is only parsed once.
+
+    Args:
+        name (str): The type, like `Iterable[xAOD.Jet_v1]`
+
+    Returns:
+        type_expression: The parsed type
+    """
+    tokens = [t.strip() for t in _g_type_token.findall(name)]
+    position = 0
+
+    def parse_type() -> type_expression:
+        nonlocal position
+        type_name = ""
+        if position < len(tokens) and tokens[position] not in "[],":
+            type_name = tokens[position]
+            position += 1
+        if position == len(tokens) or tokens[position] != "[":
+            return type_expression(type_name)
+
+        position += 1
+        args = [parse_type()]
+        while position < len(tokens) and tokens[position] == ",":
+            position += 1
+            args.append(parse_type())
+        if position == len(tokens) or tokens[position] != "]":
+            raise RuntimeError(f"Missing ']' in type expression '{name}'")
+        position += 1
+        return type_expression(type_name, tuple(args))
+
+    result = parse_type()
+    if position != len(tokens):
+        raise RuntimeError(f"Unable to parse type expression '{name}'")
+    return result
+
+
 def process_by_namespace(name: str, transform: Callable[[str], str]) -> str:
     """Strip off and rebuild a python namespace, calling
     the transform function on each item.
@@ -50,50 +124,10 @@ def process_by_namespace(name: str, transform: Callable[[str], str]) -> str:
     Returns:
         str: transformed name, reassembled
     """
-    typename = ""
-    depth_level = 0
-    argument = ""
-    index = 0
-    transformed = False
-    while index < len(name):
-        if depth_level > 0:
-            if name[index] == "]":
-                depth_level -= 1
-                if depth_level == 0:
-                    typename += (
-                        "["
-                        + ", ".join(
-                            [
-                                process_by_namespace(a.strip(), transform)
-                                for a in argument.split(",")
-                            ]
-                        )
-                        + "]"
-                    )
-                else:
-                    argument += name[index]
-            elif name[index] == "[":
-                depth_level += 1
-                argument += name[index]
-            else:
-                argument += name[index]
-            index += 1
-        else:
-            if name[index] == "[":
-                typename = transform(typename)
-                transformed = True
-                depth_level += 1
-                index += 1
-            else:
-                typename += name[index]
-                index += 1
-
-    if not transformed:
-        typename = transform(typename)
-
-    return typename
+    return str(parse_type_expression(name).transform(transform))
 
 
+@lru_cache(maxsize=None)
 def remove_namespaces(name: str) -> str:
     """Remove the namespaces from a fully qualified name
 
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Only the standard library is used here (and nothing else from this package is
+# imported) so the client starts quickly - the server does all the work.
+
+
+def default_socket_path() -> Path:
+    """Return the socket `sx_type_gen serve` listens on if no other is given.
+
+    `SX_TYPE_GEN_SOCKET` wins if it is set, otherwise it is in the user's runtime
+    directory (`$XDG_RUNTIME_DIR`), or the temp directory if there isn't one.
+
+    Returns:
+        Path: The socket path
+    """
+    if "SX_TYPE_GEN_SOCKET" in os.environ:
+        return Path(os.environ["SX_TYPE_GEN_SOCKET"])
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", "")
+    if runtime_dir != "":
+        return Path(runtime_dir) / "sx_type_gen.sock"
+    return Path(tempfile.gettempdir()) / f"sx_type_gen-{os.getuid()}.sock"
+
+
+def read_message(f_in) -> Optional[Dict[str, Any]]:
+    "Read one message (a line of JSON) from a socket file, or None at the end"
+    line = f_in.readline()
+    if len(line) == 0:
+        return None
+    return json.loads(line)
+
+
+def write_message(f_out, message: Dict[str, Any]):
+    "Write one message (a line of JSON) to a socket file"
+    f_out.write(json.dumps(message).encode() + b"\n")
+    f_out.flush()
+
+
+def send_request(
+    request: Dict[str, Any], socket_path: Optional[Path] = None
+) -> Dict[str, Any]:
+    """Send a request to a running `sx_type_gen serve` and wait for the answer.
+
+    Args:
+        request (Dict[str, Any]): The request (see `generation_server.handle`)
+        socket_path (Optional[Path]): The socket the server listens on. Defaults
+            to `default_socket_path()`.
+
+    Returns:
+        Dict[str, Any]: The server's response. `ok` is False if the request
+            failed, and `error` says why.
+    """
+    socket_path = socket_path if socket_path is not None else default_socket_path()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise RuntimeError(
+                f"No sx_type_gen server is listening on {socket_path} (start one "
+                f"with `sx_type_gen serve`): {e}"
+            ) from e
+        with s.makefile("rwb") as f:
+            write_message(f, request)
+            response = read_message(f)
+    if response is None:
+        raise RuntimeError(f"The sx_type_gen server on {socket_path} did not answer")
+    return response
+
+
+def generate_request(
+    type_files: List[Path],
+    version: str,
+    output_directories: Optional[List[Path]] = None,
+    yaml_backend: str = "auto",
+    jobs: Optional[int] = None,
+    incremental: bool = False,
+    engine: str = "jinja",
+) -> Dict[str, Any]:
+    """Build the request to generate packages. Relative paths are made absolute
+    here, as the server runs in a different directory.
+
+    Args:
+        type_files (List[Path]): The type file (or directory) of each release
+        version (str): The version of the packages to generate
+        output_directories (Optional[List[Path]]): Where to write each package.
+            Defaults to `../<package name>`.
+        yaml_backend (str): The yaml parser to use
+        jobs (Optional[int]): Number of worker processes (None is one per CPU)
+        incremental (bool): Update the output directories in place
+        engine (str): How to write the class files (`jinja` or `fast`)
+
+    Returns:
+        Dict[str, Any]: The request
+    """
+    outputs: List[Optional[Path]] = (
+        list(output_directories)
+        if output_directories is not None
+        else [None] * len(type_files)
+    )
+    if len(outputs) != len(type_files):
+        raise RuntimeError(
+            f"{len(type_files)} type files need as many output directories "
+            f"(got {len(outputs)})"
+        )
+    return {
+        "command": "generate",
+        "cwd": os.getcwd(),
+        "releases": [
+            [
+                os.path.abspath(f),
+                os.path.abspath(o) if o is not None else None,
+            ]
+            for f, o in zip(type_files, outputs)
+        ],
+        "version": version,
+        "yaml_backend": yaml_backend,
+        "jobs": jobs,
+        "incremental": incremental,
+        "engine": engine,
+    }
+
+
+def run() -> int:
+    "The `sx_type_gen_client` command: generate packages with a running server"
+    parser = argparse.ArgumentParser(
+        prog="sx_type_gen_client",
+        description="Generate python packages with a running `sx_type_gen serve`",
+    )
+    parser.add_argument(
+        "yaml_type_file",
+        type=Path,
+        nargs="+",
+        help="The type file (or directory of them) of each release",
+    )
+    parser.add_argument(
+        "--version",
+        type=str,
+        help="The version of the package to generate (1.1.0b2 or 1.1.0, etc.)",
+        required=True,
+    )
+    parser.add_argument(
+        "--output_directory",
+        type=Path,
+        nargs="+",
+        help="The output directory for each package (default is ../<package name>)",
+        default=None,
+    )
+    parser.add_argument(
+        "--yaml_backend",
+        choices=["auto", "c", "python"],
+        help="The yaml parser to use: libyaml (c), pure python, or the fastest available (auto)",
+        default="auto",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Number of worker processes to render with (default is one per CPU)",
+        default=None,
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["jinja", "fast"],
+        help="How to write the class files",
+        default="jinja",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Update an existing output directory in place",
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print the server's timings of each phase as JSON",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        help="The socket the server listens on",
+        default=None,
+    )
+    args = parser.parse_args()
+
+    try:
+        response = send_request(
+            generate_request(
+                args.yaml_type_file,
+                args.version,
+                args.output_directory,
+                yaml_backend=args.yaml_backend,
+                jobs=args.jobs,
+                incremental=args.incremental,
+                engine=args.engine,
+            ),
+            args.socket,
+        )
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    if not response["ok"]:
+        print(f"Generation failed: {response['error']}", file=sys.stderr)
+        return 1
+    if args.timings:
+        print(json.dumps(response["timings"], indent=2))
+    if args.incremental:
+        for s in response["stats"]:
+            print(
+                f"{s['output_directory']}: {s['written']} files written, "
+                f"{s['unchanged']} unchanged, {s['deleted']} deleted"
+            )
+    return 0
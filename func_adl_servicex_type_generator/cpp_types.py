@@ -0,0 +1,184 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+_g_cpp_to_py_type_map = {
+    "float": "float",
+    "int": "int",
+    "uint": "int",
+    "int16_t": "int",
+    "int32_t": "int",
+    "unsigned int": "int",
+    "short": "int",
+    "unsigned short": "int",
+    "unsigned long long": "int",
+    "long long": "int",
+    "long": "int",
+    "unsigned long": "int",
+    "double": "float",
+    "bool": "bool",
+    "uint64_t": "int",
+    "uint16_t": "int",
+    "uint8_t": "int",
+    "char": "str",
+    "string": "str",
+}
+
+_g_py_single_types = {i for _, i in _g_cpp_to_py_type_map.items()}
+
+
+@dataclass(frozen=True)
+class cpp_type:
+    """A parsed C++ type declaration, like `const xAOD::Jet_v1**`.
+
+    Build these with `parse_cpp_type`, which caches them.
+    """
+
+    # The normalized spelling of the full declaration (double spaces collapsed,
+    # `> >` written as `>>`).
+    normalized: str
+
+    # The type without a leading `const`, or the trailing reference and pointers
+    base_type: str
+
+    # How many `*` follow the type
+    pointer_depth: int
+
+    # True if the declaration starts with `const`
+    is_const: bool
+
+    # True if the declaration ends with a reference (`&` or `&&`)
+    is_reference: bool
+
+    # The base type without its template arguments (`vector` for `vector<float>`)
+    template_name: str
+
+    # The parsed template arguments, empty if this isn't a template
+    template_args: Tuple["cpp_type", ...]
+
+
+def _normalize_spelling(cpp_class_name: str) -> str:
+    "Collapse runs of spaces, and remove spaces between `>` or `<` pairs"
+    result: List[str] = []
+    n = len(cpp_class_name)
+    i = 0
+    while i < n:
+        ch = cpp_class_name[i]
+        if ch == " ":
+            # Skip the whole run of spaces
+            j = i
+            while j < n and cpp_class_name[j] == " ":
+                j += 1
+            previous = result[-1] if len(result) > 0 else ""
+            following = cpp_class_name[j] if j < n else ""
+            if not (previous == following and previous in "<>" and previous != ""):
+                result.append(" ")
+            i = j
+        else:
+            result.append(ch)
+            i += 1
+    return "".join(result)
+
+
+def _split_template(base_type: str) -> Tuple[str, List[str]]:
+    """Split `a<b, c<d, e>>` into the template name and its (unparsed) top level
+    arguments. Anything that isn't a template comes back with no arguments."""
+    start = base_type.find("<")
+    if start < 0 or not base_type.endswith(">"):
+        return base_type, []
+
+    args: List[str] = []
+    depth = 0
+    arg_start = start + 1
+    for i in range(start + 1, len(base_type) - 1):
+        ch = base_type[i]
+        if ch == "<":
+            depth += 1
+        elif ch == ">":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            args.append(base_type[arg_start:i])
+            arg_start = i + 1
+    args.append(base_type[arg_start:-1])
+    if depth != 0:
+        # Not balanced, so don't pretend we understood it
+        return base_type, []
+    return base_type[:start].strip(), [a.strip() for a in args if a.strip() != ""]
+
+
+@lru_cache(maxsize=None)
+def parse_cpp_type(cpp_class_name: str) -> cpp_type:
+    """Parse a C++ type declaration. Results are cached, so each distinct type
+    string is only parsed once (template arguments included).
+
+    Args:
+        cpp_class_name (str): The C++ type (`const xAOD::Jet_v1*`)
+
+    Returns:
+        cpp_type: The parsed type
+    """
+    base_type = cpp_class_name.strip()
+    is_const = base_type.startswith("const ")
+    if is_const:
+        base_type = base_type[6:].strip()
+    is_reference = base_type.endswith("&")
+    base_type = base_type.rstrip("&").strip()
+    pointer_depth = 0
+    while base_type.endswith("*"):
+        base_type = base_type[:-1].strip()
+        pointer_depth += 1
+
+    template_name, args = _split_template(base_type)
+    return cpp_type(
+        normalized=_normalize_spelling(cpp_class_name),
+        base_type=base_type,
+        pointer_depth=pointer_depth,
+        is_const=is_const,
+        is_reference=is_reference,
+        template_name=template_name,
+        template_args=tuple(parse_cpp_type(a) for a in args),
+    )
+
+
+def clean_cpp_type(cpp_class_name: Optional[str]) -> Optional[str]:
+    """Remove the prefixes and post-fixes from a C++ class name.
+
+    Args:
+        cpp_class_name (str): The C++ class name
+
+    Returns:
+        str: The cleaned C++ class name
+    """
+    if cpp_class_name is None:
+        return None
+    return parse_cpp_type(cpp_class_name).base_type
+
+
+def count_pointer_depth(cpp_class_name: Optional[str]) -> int:
+    """Count number of pointer levels in this declaration
+
+    Args:
+        cpp_class_name (Optional[str]): Class name to do counting on.
+        If None, then return zero
+
+    Returns:
+        int: How many pointers
+    """
+    if cpp_class_name is None:
+        return 0
+    return parse_cpp_type(cpp_class_name).pointer_depth
+
+
+def normalize_cpp_type(cpp_class_name: Optional[str]) -> Optional[str]:
+    """Normalize a C++ type for lookup (remove
+    extra spaces, etc.))
+
+    Args:
+        cpp_class_name (str): The C++ class name
+
+    Returns:
+        str: The normalized C++ class name
+    """
+    if cpp_class_name is None:
+        return None
+    return parse_cpp_type(cpp_class_name).normalized
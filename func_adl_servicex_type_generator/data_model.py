@@ -1,5 +1,37 @@
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional, Sequence, Type, TypeVar
+
+_T = TypeVar("_T")
+
+
+def _frozen_getstate(self) -> List[Any]:
+    return [getattr(self, name) for name in self.__slots__]
+
+
+def _frozen_setstate(self, state: List[Any]):
+    # A frozen class won't let pickle set the attributes the normal way
+    for name, value in zip(self.__slots__, state):
+        object.__setattr__(self, name, value)
+
+
+def _slotted(cls: Type[_T]) -> Type[_T]:
+    """Rebuild a dataclass with `__slots__` so instances carry no `__dict__`.
+
+    There are hundreds of thousands of method and argument records in a full
+    type file. `dataclass(slots=True)` does this, but needs python 3.10.
+    """
+    field_names = tuple(f.name for f in fields(cls))  # type: ignore
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = field_names
+    for name in field_names:
+        # Defaults live on in the generated __init__.
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    if cls.__dataclass_params__.frozen:  # type: ignore
+        cls_dict["__getstate__"] = _frozen_getstate
+        cls_dict["__setstate__"] = _frozen_setstate
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)  # type: ignore
 
 
 @dataclass
@@ -88,9 +120,11 @@ class collection_info:
     method_callback: str
 
 
-@dataclass
+@_slotted
+@dataclass(frozen=True)
 class method_arg_info:
-    """Holds type, etc., for a method argument"""
+    """Holds type, etc., for a method argument. Immutable, as the loader shares
+    identical arguments between methods."""
 
     # Argument name
     name: str
@@ -102,9 +136,11 @@ class method_arg_info:
     arg_type: str
 
 
-@dataclass
+@_slotted
+@dataclass(frozen=True)
 class method_info:
-    """Holds data for a method attached to a list"""
+    """Holds data for a method attached to a list. Immutable, as the loader shares
+    identical methods (and lists of methods) between classes."""
 
     # Name of the method
     name: str
@@ -113,10 +149,10 @@ class method_info:
     return_type: Optional[str]
 
     # Arguments for the method
-    arguments: List[method_arg_info]
+    arguments: Sequence[method_arg_info]
 
     # Parameterized function arguments
-    param_arguments: List[method_arg_info]
+    param_arguments: Sequence[method_arg_info]
 
     # param helper object when we are a parameterized function.
     param_helper: Optional[str]
@@ -125,6 +161,7 @@ class method_info:
     param_type_cb: Optional[str] = None
 
 
+@_slotted
 @dataclass
 class enum_value_info:
     """Holds the data for an enum value"""
@@ -147,6 +184,7 @@ class enum_info:
     values: List[enum_value_info]
 
 
+@_slotted
 @dataclass
 class class_info:
     """Holds the data for a particular class we are emitting"""
@@ -157,8 +195,8 @@ class class_info:
     # The fully qualified name of the class (cpp)
     cpp_name: str
 
-    # List of methods
-    methods: List[method_info]
+    # List of methods (may be shared with other classes - do not modify)
+    methods: Sequence[method_info]
 
     # C++ Container object type, None if this is not a container
     cpp_container_type: Optional[str]
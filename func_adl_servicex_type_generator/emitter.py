@@ -0,0 +1,153 @@
+from typing import List
+
+from func_adl_servicex_type_generator.view_model import class_view, enum_view
+
+# Builds the same text as `template/files/object.py`, without going through
+# jinja2. Any change to that template must be made here too (the tests compare
+# the two).
+
+_g_header = """from __future__ import annotations
+import ast
+from typing import Tuple, TypeVar, Iterable
+from func_adl import ObjectStream, func_adl_callback, func_adl_parameterized_call
+from enum import Enum
+import """
+
+_g_add_method_metadata = """
+
+T = TypeVar('T')
+
+def add_enum_info(s: ObjectStream[T], enum_name: str) -> ObjectStream[T]:
+    '''Use this to add enum definition information to the backend.
+
+    This can be used when you are writing a C++ function that needs to
+    make sure a particular enum is defined.
+
+    Args:
+        s (ObjectStream[T]): The ObjectStream that is being updated
+        enum_name (str): Name of the enum
+
+    Raises:
+        ValueError: If it is not known, a list of possibles is printed out
+
+    Returns:
+        ObjectStream[T]: Updated object stream with new metadata.
+    '''
+    if enum_name not in _defined_enums:
+        raise ValueError(f"Enum {enum_name} is not known - "
+                            f"choose from one of {','.join(_defined_enums.keys())}")
+    return s.MetaData(_defined_enums[enum_name])
+
+def _add_method_metadata(s: ObjectStream[T], a: ast.Call) -> Tuple[ObjectStream[T], ast.Call]:
+    '''Add metadata for a collection to the func_adl stream if we know about it
+    '''
+    assert isinstance(a.func, ast.Attribute)
+    if a.func.attr in _method_map:
+        s_update = s.MetaData(_method_map[a.func.attr])
+"""
+
+_g_add_method_metadata_end = """
+        for md in _enum_function_map.get(a.func.attr, []):
+            s_update = s_update.MetaData(md)
+        return s_update, a
+    else:
+        return s, a
+
+
+@func_adl_callback(_add_method_metadata)
+class """
+
+
+def _emit_enum_values(out: List[str], e: enum_view):
+    "The metadata for an enum definition"
+    out.append(
+        "\n            'metadata_type': 'define_enum',"
+        f"\n            'namespace': '{e.namespace}',"
+        f"\n            'name': '{e.name}',"
+        "\n            'values': ["
+    )
+    for value in e.values:
+        out.append(f"\n                '{value.name}',")
+    out.append("\n            ],\n        },")
+
+
+def emit_class_module(v: class_view) -> str:
+    """Build the python module for a class.
+
+    The text is exactly what rendering `template/files/object.py` gives.
+
+    Args:
+        v (class_view): The class to write out
+
+    Returns:
+        str: The text of the module
+    """
+    out: List[str] = [_g_header, f"{v.package_name}\n\n_method_map = {{"]
+
+    for m in v.methods:
+        out.append(f"\n    '{m.name}': {{")
+        for line in m.metadata:
+            out.append(f"\n        {line}")
+        out.append("\n    },")
+
+    out.append("\n}\n\n_enum_function_map = {")
+    for method_name, enums in v.referenced_enums.items():
+        out.append(f"\n    '{method_name}': [")
+        for e in enums:
+            out.append("\n        {")
+            _emit_enum_values(out, e)
+        out.append("\n    ],")
+
+    out.append("      \n}\n\n_defined_enums = {")
+    for e in v.enums:
+        out.append(f"\n    '{e.name}':\n        {{")
+        _emit_enum_values(out, e)
+
+    out.append(f'      \n}}\n\n_object_cpp_as_py_namespace="{v.cpp_as_py_namespace}"')
+    out.append(_g_add_method_metadata)
+    for i_file in v.include_files:
+        out.append(
+            "\n        s_update = s_update.MetaData({"
+            "\n            'metadata_type': 'inject_code',"
+            f"\n            'name': '{i_file}',"
+            f"\n            'body_includes': [\"{i_file}\"],"
+            "\n        })\n"
+        )
+    out.append("\n")
+    for l_file in v.libraries:
+        out.append(
+            "\n        s_update = s_update.MetaData({"
+            "\n            'metadata_type': 'inject_code',"
+            f"\n            'name': '{l_file}',"
+            f"\n            'link_libraries': [\"{l_file}\"],"
+            "\n        })\n"
+        )
+    out.append(_g_add_method_metadata_end)
+
+    out.append(f'{v.class_name}{v.bases}:\n    "A class"\n')
+
+    for e in v.enums:
+        out.append(f"\n    class {e.name}(Enum):")
+        for value in e.values:
+            out.append(f"\n        {value.name} = {value.value}")
+        out.append("\n")
+    out.append("\n")
+
+    for m in v.methods:
+        if not m.is_parameterized:
+            out.append(f"\n    def {m.name}(self")
+            for a in m.arguments:
+                out.append(f", {a.name}: {a.arg_type}")
+            out.append(f") -> {m.return_type}:")
+        else:
+            out.append(
+                f"\n    @func_adl_parameterized_call({m.param_type_cb})"
+                "\n    @property"
+                f"\n    def {m.name}(self) -> {v.package_name}.{m.param_helper_class}["
+            )
+            for a in m.arguments:
+                out.append(a.arg_type)
+            out.append("]:")
+        out.append('\n        "A method"\n        ...\n')
+
+    return "".join(out)
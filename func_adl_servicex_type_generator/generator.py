@@ -1,25 +1,295 @@
 import argparse
+import cProfile
 import itertools
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from func_adl_servicex_type_generator.class_utils import (
-    package_qualified_class,
-    split_release,
+from func_adl_servicex_type_generator.class_utils import split_release
+from func_adl_servicex_type_generator.loader import (
+    LoadedData,
+    convert_type_file,
+    load_type_path,
 )
-from func_adl_servicex_type_generator.loader import load_yaml
+from func_adl_servicex_type_generator.manifest import load_manifest, save_manifest
+from func_adl_servicex_type_generator.model_cache import (
+    clear_model_cache,
+    default_model_cache_dir,
+    default_template_cache_dir,
+    get_model_cache_info,
+    load_cached_model,
+)
+from func_adl_servicex_type_generator.output import output_writer, write_stats
 from func_adl_servicex_type_generator.package import (
+    class_renderer,
+    render_pool,
+    subrender_cache_info,
     template_package_scaffolding,
     write_out_classes,
 )
+from func_adl_servicex_type_generator.timings import phase_timings, render_hook
+
+# Where the templates live
+_g_template_path = Path(__file__).parent / ".." / "template"
+
+
+def run_cache(argv: List[str]) -> int:
+    "The `sx_type_gen cache` command: look at or clear the parsed model cache"
+    parser = argparse.ArgumentParser(
+        prog="sx_type_gen cache", description="Manage the parsed type file cache"
+    )
+    parser.add_argument("action", choices=["info", "clear"], help="What to do")
+    parser.add_argument(
+        "--cache_directory",
+        type=Path,
+        help="The directory that holds the cached models",
+        default=None,
+    )
+    args = parser.parse_args(argv)
+    cache_dir = (
+        args.cache_directory
+        if args.cache_directory is not None
+        else default_model_cache_dir()
+    )
+
+    if args.action == "clear":
+        n_removed = clear_model_cache(cache_dir)
+        print(f"Removed {n_removed} cached models from {cache_dir}")
+    else:
+        info = get_model_cache_info(cache_dir)
+        print(
+            f"{info.n_models} cached models using {info.total_bytes / 1024 / 1024:.1f} MB "
+            f"in {info.cache_dir}"
+        )
+    return 0
+
+
+def run_convert(argv: List[str]) -> int:
+    "The `sx_type_gen convert` command: rewrite a type file in a faster format"
+    parser = argparse.ArgumentParser(
+        prog="sx_type_gen convert",
+        description="Convert a type file to yaml, json, or msgpack (by output extension)",
+    )
+    parser.add_argument("input_file", type=Path, help="The type file to convert")
+    parser.add_argument(
+        "output_file",
+        type=Path,
+        help="The converted type file (.yaml, .json, or .msgpack)",
+    )
+    parser.add_argument(
+        "--yaml_backend",
+        choices=["auto", "c", "python"],
+        help="The yaml parser to use: libyaml (c), pure python, or the fastest available (auto)",
+        default="auto",
+    )
+    args = parser.parse_args(argv)
+
+    convert_type_file(args.input_file, args.output_file, backend=args.yaml_backend)
+    return 0
+
+
+def run_bench(argv: List[str]) -> int:
+    """The `sx_type_gen bench` command: time the generator on synthetic models, and
+    compare against a saved baseline"""
+    # The benchmarks use `generate_package`, so they can only be imported here
+    from func_adl_servicex_type_generator.benchmarks.suite import (
+        bench_memory,
+        bench_suite,
+        compare_to_baseline,
+        default_baseline_path,
+        default_max_ratio,
+        default_suite_sizes,
+        load_baseline,
+        save_baseline,
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="sx_type_gen bench",
+        description="Time loading and generating synthetic type files",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        help="Number of classes in each synthetic model (100 to 50000)",
+        default=default_suite_sizes,
+    )
+    parser.add_argument(
+        "--repeat", type=int, help="Number of runs of each benchmark", default=3
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["jinja", "fast"],
+        help="How to write the class files",
+        default="jinja",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="The baseline file to compare against (or save to)",
+        default=None,
+    )
+    parser.add_argument(
+        "--save_baseline",
+        action="store_true",
+        help="Save the results as the new baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--max_ratio",
+        type=float,
+        help="Fail if a benchmark takes more than this many times its baseline",
+        default=default_max_ratio,
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Instead of timing, trace the memory used by each phase (tracemalloc)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        help="Number of allocation sites to show for each phase with --memory",
+        default=5,
+    )
+    args = parser.parse_args(argv)
+
+    if args.memory:
+        memory = bench_memory(args.sizes, n_sites=args.top, engine=args.engine)
+        for size, phases in memory.items():
+            print(f"{size} classes:")
+            held = 0
+            for p in phases:
+                print(
+                    f"  {p.name:>14}: retained {p.retained_bytes / 1024 / 1024:8.1f} MB,"
+                    f" peak {(held + p.peak_bytes) / 1024 / 1024:8.1f} MB"
+                )
+                held += p.retained_bytes
+                for site in p.top_sites:
+                    print(
+                        f"      {site.size_bytes / 1024 / 1024:8.1f} MB "
+                        f"{site.count:>8} blocks  {site.location}"
+                    )
+        return 0
+    baseline_path = (
+        args.baseline if args.baseline is not None else default_baseline_path()
+    )
+    # Without a baseline there is nothing to compare to, and every run would pass
+    if not args.save_baseline and not baseline_path.exists():
+        print(
+            f"No benchmark baseline at {baseline_path} - record one with "
+            "--save_baseline (or give another with --baseline)",
+            file=sys.stderr,
+        )
+        return 1
+
+    results = bench_suite(args.sizes, repeat=args.repeat, engine=args.engine)
+    baseline = load_baseline(baseline_path) if not args.save_baseline else {}
+    for name, timings in results.items():
+        for size, t in timings.items():
+            base = baseline.get(name, {}).get(size, None)
+            ratio = f" ({t / base:.2f}x baseline)" if base else ""
+            print(f"{name:>30} {size:>6}: {t:8.3f} s{ratio}")
+
+    if args.save_baseline:
+        save_baseline(baseline_path, results)
+        print(f"Saved baseline to {baseline_path}")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, args.max_ratio)
+    for r in regressions:
+        print(f"Regression: {r}")
+    return 1 if len(regressions) > 0 else 0
+
+
+def run_serve(argv: List[str]) -> int:
+    """The `sx_type_gen serve` command: generate packages for `sx_type_gen_client`,
+    keeping the loaded models and compiled templates in memory"""
+    # The server uses the generator, so it can only be imported here
+    from func_adl_servicex_type_generator.client import default_socket_path
+    from func_adl_servicex_type_generator.server import (
+        default_max_models,
+        generation_server,
+        serve,
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="sx_type_gen serve",
+        description="Generate packages for sx_type_gen_client, keeping models and "
+        "templates in memory",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        help="The Unix socket to listen on",
+        default=None,
+    )
+    parser.add_argument(
+        "--max_models",
+        type=int,
+        help="Number of loaded type files to keep in memory",
+        default=default_max_models,
+    )
+    parser.add_argument(
+        "--cache_directory",
+        type=Path,
+        help="Where to cache parsed type files and compiled templates between runs",
+        default=None,
+    )
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="Only keep parsed type files and compiled templates in memory",
+    )
+    args = parser.parse_args(argv)
+
+    cache_dir = None
+    template_cache_dir = None
+    if not args.no_cache:
+        cache_dir = (
+            args.cache_directory
+            if args.cache_directory is not None
+            else default_model_cache_dir()
+        )
+        template_cache_dir = (
+            args.cache_directory / "templates"
+            if args.cache_directory is not None
+            else default_template_cache_dir()
+        )
+    socket_path = args.socket if args.socket is not None else default_socket_path()
+
+    generator = generation_server(cache_dir, template_cache_dir, args.max_models)
+    print(f"Listening on {socket_path} (Ctrl-C to stop)", flush=True)
+    try:
+        serve(socket_path, generator)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+# Commands that aren't the default "generate a package" one.
+_g_sub_commands = {
+    "bench": run_bench,
+    "cache": run_cache,
+    "convert": run_convert,
+    "serve": run_serve,
+}
 
 
 def run():
+    if len(sys.argv) > 1 and sys.argv[1] in _g_sub_commands:
+        return _g_sub_commands[sys.argv[1]](sys.argv[2:])
+
     parser = argparse.ArgumentParser(description="Generate python package")
     parser.add_argument(
         "yaml_type_file",
         type=Path,
-        help="The yaml file that contains the type info",
+        nargs="+",
+        help="The type file (yaml, json, or msgpack) that contains the type info, or a "
+        "directory of them. Give several to generate a package for each release.",
     )
     parser.add_argument(
         "--version",
@@ -29,25 +299,231 @@ def run():
     parser.add_argument(
         "--output_directory",
         type=Path,
-        help="The output directory for the generated python package",
-        default=Path("../func_adl_servicex_xaodrXX"),
+        nargs="+",
+        help="The output directory for the generated python package (one for each "
+        "type file). With several type files, defaults to ../<package name>.",
+        default=None,
+    )
+    parser.add_argument(
+        "--yaml_backend",
+        choices=["auto", "c", "python"],
+        help="The yaml parser to use: libyaml (c), pure python, or the fastest available (auto)",
+        default="auto",
+    )
+    parser.add_argument(
+        "--cache_directory",
+        type=Path,
+        help="Where to cache parsed type files and compiled templates between runs",
+        default=None,
+    )
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="Always parse the type file and compile the templates, and do not cache "
+        "the results",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Number of worker processes to load and render with (default is one per "
+        "CPU)",
+        default=None,
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["jinja", "fast"],
+        help="How to write the class files: the jinja template, or the (faster) "
+        "python emitter that gives the same output",
+        default="jinja",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Update an existing output directory in place, only writing the files "
+        "that changed",
+    )
+    parser.add_argument(
+        "--timings",
+        type=Path,
+        nargs="?",
+        const=Path("-"),
+        help="Write the wall and CPU time of each phase as JSON to this file (or to "
+        "stdout if no file is given)",
+        default=None,
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running, and update the output directory every time the type file "
+        "or the templates change",
+    )
+    parser.add_argument(
+        "--poll_interval",
+        type=float,
+        help="How often, in seconds, --watch looks for changes",
+        default=0.5,
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Run under cProfile and write the stats to this file (worker processes "
+        "are not profiled)",
+        default=None,
     )
     args = parser.parse_args()
 
-    generate_package(args.yaml_type_file, args.version, args.output_directory)
+    cache_dir = None
+    template_cache_dir = None
+    if not args.no_cache:
+        cache_dir = (
+            args.cache_directory
+            if args.cache_directory is not None
+            else default_model_cache_dir()
+        )
+        template_cache_dir = (
+            args.cache_directory / "templates"
+            if args.cache_directory is not None
+            else default_template_cache_dir()
+        )
+
+    if args.output_directory is None:
+        output_directories = (
+            [Path("../func_adl_servicex_xaodrXX")]
+            if len(args.yaml_type_file) == 1
+            else [None] * len(args.yaml_type_file)
+        )
+    elif len(args.output_directory) != len(args.yaml_type_file):
+        parser.error(
+            f"{len(args.yaml_type_file)} type files need as many output directories "
+            f"(got {len(args.output_directory)})"
+        )
+    else:
+        output_directories = args.output_directory
+
+    if args.watch:
+        return _run_watch(args, output_directories, template_cache_dir)
+
+    timings = phase_timings()
+    options = dict(
+        yaml_backend=args.yaml_backend,
+        model_cache_dir=cache_dir,
+        template_cache_dir=template_cache_dir,
+        jobs=args.jobs,
+        incremental=args.incremental,
+        engine=args.engine,
+        timings=timings,
+    )
+    profile = cProfile.Profile() if args.profile is not None else None
+    if profile is not None:
+        profile.enable()
+    try:
+        if len(args.yaml_type_file) == 1:
+            all_stats = {
+                str(output_directories[0]): generate_package(
+                    args.yaml_type_file[0],
+                    args.version,
+                    output_directories[0],
+                    **options,
+                )
+            }
+        else:
+            release_stats = generate_packages(
+                list(zip(args.yaml_type_file, output_directories)),
+                args.version,
+                **options,
+            )
+            all_stats = dict(zip(timings.releases.keys(), release_stats))
+    finally:
+        if profile is not None:
+            profile.disable()
+            profile.dump_stats(str(args.profile))
+
+    if args.timings is not None:
+        if args.timings == Path("-"):
+            print(timings.as_json())
+        else:
+            args.timings.write_text(timings.as_json())
+    if args.incremental:
+        for name, stats in all_stats.items():
+            prefix = f"{name}: " if len(all_stats) > 1 else ""
+            print(
+                f"{prefix}{stats.written} files written, {stats.unchanged} unchanged, "
+                f"{stats.deleted} deleted"
+            )
     return 0
 
 
-def generate_package(
-    yaml_type_file: Path, version: str, output_directory: Optional[Path]
-):
-    # Load in the base data
-    data = load_yaml(yaml_type_file)
+def _run_watch(
+    args: argparse.Namespace,
+    output_directories: List[Optional[Path]],
+    template_cache_dir: Optional[Path],
+) -> int:
+    "Run `sx_type_gen --watch` until it is interrupted"
+    # The watcher uses the generator, so it can only be imported here
+    from func_adl_servicex_type_generator.watch import release_watcher, watch_releases
+
+    watchers = [
+        release_watcher(
+            f,
+            args.version,
+            o,
+            yaml_backend=args.yaml_backend,
+            template_cache_dir=template_cache_dir,
+            jobs=args.jobs if args.jobs is not None else (os.cpu_count() or 1),
+            engine=args.engine,
+        )
+        for f, o in zip(args.yaml_type_file, output_directories)
+    ]
+
+    def report(w, stats: write_stats, seconds: float):
+        print(
+            f"{w.yaml_type_file}: {stats.written} files written, {stats.unchanged} "
+            f"unchanged, {stats.deleted} deleted ({seconds:.2f} s)",
+            flush=True,
+        )
 
+    print("Watching for changes (Ctrl-C to stop)", flush=True)
+    try:
+        watch_releases(watchers, args.poll_interval, on_update=report)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _load_release(
+    yaml_type_file: Path,
+    yaml_backend: str,
+    model_cache_dir: Optional[Path],
+    jobs: Optional[int],
+) -> LoadedData:
+    "Load a type file, or directory of them, through the model cache if there is one"
+    if model_cache_dir is None:
+        return load_type_path(yaml_type_file, backend=yaml_backend, jobs=jobs)
+    return load_cached_model(
+        yaml_type_file,
+        lambda p: load_type_path(p, backend=yaml_backend, jobs=jobs),
+        model_cache_dir,
+    )
+
+
+@dataclass
+class _release_package:
+    "Everything needed to write the package for one release"
+
+    data: LoadedData
+    package_name: str
+    release_series: str
+    output_path: Path
+    template_data: Dict[str, Any]
+
+
+def _prepare_release(
+    data: LoadedData, version: str, output_directory: Optional[Path]
+) -> _release_package:
+    "Work out the package name, version, and location for a loaded type file"
     # Extract release info
     release_name = data.config["atlas_release"]
     release_tuple = split_release(release_name)
-    package_name = f"func_adl_servicex_xaodr{release_tuple[0]}"
 
     # Extract the version info. Look for any non alphabet characters and split
     # the version string by that.
@@ -72,14 +548,13 @@ def generate_package(
         output_directory if output_directory is not None else Path(f"../{package_name}")
     )
 
-    # Fix up the collection types
-    all_class_names = {c.name for c in data.classes}
+    # Fix up the collection types. The loaded collections are left alone, so the
+    # same data can be written out again.
+    collections = []
     for c in data.collections:
-        new_c = package_qualified_class(
-            c.collection_type, package_name, all_class_names
-        )
+        new_c = data.index.package_qualified(c.collection_type, package_name)
         assert new_c is not None
-        c.collection_type = new_c
+        collections.append(replace(c, collection_type=new_c))
 
     template_data = {
         "package_name": package_name,
@@ -87,26 +562,265 @@ def generate_package(
         "package_info_description": f"xAOD R{release_tuple[0]} {data.config['atlas_release']}",  # noqa
         "calibration_types": [""] + list(data.config["dataset_types"]),
         "backend_default_name": f"atlasr{release_tuple[0]}",
-        "collections": data.collections,
+        "collections": collections,
         "metadata": data.metadata,
         "release_series": release_series,
     }
+    return _release_package(
+        data, package_name, str(release_series), output_directory, template_data
+    )
+
 
-    template_path = Path(__file__).parent / ".." / "template"
+def _write_release(
+    r: _release_package,
+    template_cache_dir: Optional[Path],
+    jobs: int,
+    incremental: bool,
+    engine: str,
+    timings: phase_timings,
+    on_class_rendered: Optional[render_hook],
+    pool: Optional[render_pool] = None,
+    template_path: Path = _g_template_path,
+    renderer: Optional[class_renderer] = None,
+) -> write_stats:
+    "Write the package for one release"
     assert template_path.exists()
-    output_path = output_directory
+    output_path = r.output_path
 
-    template_package_scaffolding(template_data, template_path, output_path, data.files)
+    # In incremental mode, only classes whose inputs changed since the last run
+    # are rendered again.
+    previous_hashes = load_manifest(output_path, engine) if incremental else None
+    with timings.phase("scaffolding"):
+        writer = output_writer(output_path, incremental=incremental)
+        template_package_scaffolding(
+            r.template_data,
+            template_path,
+            output_path,
+            r.data.files,
+            writer=writer,
+            bytecode_cache_dir=template_cache_dir,
+        )
 
-    base_init_lines = list(itertools.chain(*[f.init_lines for f in data.files]))
+    base_init_lines = list(itertools.chain(*[f.init_lines for f in r.data.files]))
 
-    write_out_classes(
-        data.classes,
+    input_hashes = write_out_classes(
+        r.data.classes,
         template_path,
-        output_path / template_data["package_name"],
-        package_name,
-        [""] + list(data.config["dataset_types"]),
-        str(release_series),
+        output_path / r.package_name,
+        r.package_name,
+        [""] + list(r.data.config["dataset_types"]),
+        r.release_series,
         base_init_lines=base_init_lines,
-        config_vars=data.config,
+        config_vars=r.data.config,
+        index=r.data.index,
+        jobs=jobs,
+        writer=writer,
+        previous_hashes=previous_hashes,
+        bytecode_cache_dir=template_cache_dir,
+        engine=engine,
+        timings=timings,
+        on_class_rendered=on_class_rendered,
+        pool=pool,
+        pool_key=str(output_path),
+        renderer=renderer,
+    )
+
+    with timings.phase("write"):
+        stats = writer.finish()
+        save_manifest(output_path, input_hashes, engine)
+
+    timings.count("files_written", stats.written)
+    timings.count("files_unchanged", stats.unchanged)
+    timings.count("files_deleted", stats.deleted)
+    return stats
+
+
+def _count_subrender_cache(timings: phase_timings, before: Any):
+    """Log and count how well the sub-template cache did since `before` (what
+    `subrender_cache_info` returned at the start of the run). The cache lives as
+    long as the process, so its own counts cover every run so far."""
+    sub_info = subrender_cache_info()
+    hits = sub_info.hits - before.hits
+    misses = sub_info.misses - before.misses
+    logging.info(
+        f"Sub-template cache: {hits} hits, {misses} misses "
+        f"({sub_info.currsize} of {sub_info.maxsize} kept)"
+    )
+    timings.count("subrender_hits", hits)
+    timings.count("subrender_misses", misses)
+
+
+def generate_package(
+    yaml_type_file: Path,
+    version: str,
+    output_directory: Optional[Path],
+    yaml_backend: str = "auto",
+    model_cache_dir: Optional[Path] = None,
+    template_cache_dir: Optional[Path] = None,
+    jobs: Optional[int] = 1,
+    incremental: bool = False,
+    engine: str = "jinja",
+    timings: Optional[phase_timings] = None,
+    on_class_rendered: Optional[render_hook] = None,
+) -> write_stats:
+    """Generate the python package for a type file.
+
+    Args:
+        yaml_type_file (Path): The type file, or directory of type files
+        version (str): The version of the package to generate
+        output_directory (Optional[Path]): Where to write the package. Defaults to
+            `../<package name>`.
+        yaml_backend (str): The yaml parser to use
+        model_cache_dir (Optional[Path]): Where to cache the loaded model, or None
+            to always load the type file.
+        template_cache_dir (Optional[Path]): Where to cache the compiled templates
+        jobs (Optional[int]): Number of worker processes (None is one per CPU)
+        incremental (bool): Update `output_directory` in place
+        engine (str): How to write the class files (`jinja` or `fast`)
+        timings (Optional[phase_timings]): If given, filled with the wall and CPU
+            time of each phase, and some counters.
+        on_class_rendered (Optional[render_hook]): If given, called with the name
+            of each class that is rendered and how long it took.
+
+    Returns:
+        write_stats: What happened to the files in the output directory
+    """
+    timings = timings if timings is not None else phase_timings()
+    subrender_before = subrender_cache_info()
+
+    # Load in the base data
+    with timings.phase("load"):
+        data = _load_release(yaml_type_file, yaml_backend, model_cache_dir, jobs)
+
+    stats = _write_release(
+        _prepare_release(data, version, output_directory),
+        template_cache_dir,
+        jobs if jobs is not None else (os.cpu_count() or 1),
+        incremental,
+        engine,
+        timings,
+        on_class_rendered,
+    )
+    _count_subrender_cache(timings, subrender_before)
+    return stats
+
+
+def _write_releases(
+    packages: Sequence[_release_package],
+    template_cache_dir: Optional[Path],
+    n_jobs: int,
+    incremental: bool,
+    engine: str,
+    timings: phase_timings,
+    on_class_rendered: Optional[render_hook],
+    template_path: Path = _g_template_path,
+) -> List[write_stats]:
+    """Write the packages for several releases, sharing one pool of workers. Each
+    release is timed in `timings.release(<output directory>)`."""
+
+    def write(r: _release_package, pool: Optional[render_pool]) -> write_stats:
+        return _write_release(
+            r,
+            template_cache_dir,
+            n_jobs,
+            incremental,
+            engine,
+            timings.release(str(r.output_path)),
+            on_class_rendered,
+            pool,
+            template_path=template_path,
+        )
+
+    with timings.phase("releases"):
+        if n_jobs <= 1:
+            # Nothing to gain by writing the releases side by side
+            stats = [write(r, None) for r in packages]
+        else:
+            with render_pool(n_jobs) as pool:
+                for r in packages:
+                    pool.add_model(
+                        str(r.output_path),
+                        r.data.classes,
+                        template_path,
+                        r.package_name,
+                        r.data.index,
+                        template_cache_dir,
+                        engine,
+                    )
+                pool.start()
+
+                # Each release is written by its own thread, which spends most of
+                # its time waiting on the workers.
+                with ThreadPoolExecutor(max_workers=len(packages)) as executor:
+                    stats = list(executor.map(lambda r: write(r, pool), packages))
+
+    return stats
+
+
+def generate_packages(
+    releases: Sequence[Tuple[Path, Optional[Path]]],
+    version: str,
+    yaml_backend: str = "auto",
+    model_cache_dir: Optional[Path] = None,
+    template_cache_dir: Optional[Path] = None,
+    jobs: Optional[int] = 1,
+    incremental: bool = False,
+    engine: str = "jinja",
+    timings: Optional[phase_timings] = None,
+    on_class_rendered: Optional[render_hook] = None,
+) -> List[write_stats]:
+    """Generate the python packages for several type files (releases) at once.
+
+    The output is the same as calling `generate_package` for each, but the
+    releases share one template environment, compiled template cache, and pool
+    of worker processes, and are written at the same time.
+
+    Args:
+        releases (Sequence[Tuple[Path, Optional[Path]]]): The type file (or
+            directory of type files) for each release, and where to write its
+            package (None for `../<package name>`).
+        version (str): The version of the packages to generate
+        yaml_backend (str): The yaml parser to use
+        model_cache_dir (Optional[Path]): Where to cache the loaded models, or None
+            to always load the type files.
+        template_cache_dir (Optional[Path]): Where to cache the compiled templates
+        jobs (Optional[int]): Number of worker processes (None is one per CPU)
+        incremental (bool): Update the output directories in place
+        engine (str): How to write the class files (`jinja` or `fast`)
+        timings (Optional[phase_timings]): If given, filled with the time taken to
+            load all the type files (`load`) and write all the packages
+            (`releases`), and the timings of each release by output directory.
+        on_class_rendered (Optional[render_hook]): If given, called with the name
+            of each class that is rendered and how long it took. It may be called
+            from several threads.
+
+    Returns:
+        List[write_stats]: What happened to the files in each output directory
+    """
+    timings = timings if timings is not None else phase_timings()
+    subrender_before = subrender_cache_info()
+    n_jobs = jobs if jobs is not None else (os.cpu_count() or 1)
+
+    # All the models have to be loaded before the workers are forked
+    packages: List[_release_package] = []
+    for yaml_type_file, output_directory in releases:
+        release_timings = phase_timings()
+        with timings.phase("load"), release_timings.phase("load"):
+            data = _load_release(yaml_type_file, yaml_backend, model_cache_dir, jobs)
+        packages.append(_prepare_release(data, version, output_directory))
+        name = str(packages[-1].output_path)
+        if name in timings.releases:
+            raise RuntimeError(f"Two releases are being written to {name}")
+        timings.releases[name] = release_timings
+
+    stats = _write_releases(
+        packages,
+        template_cache_dir,
+        n_jobs,
+        incremental,
+        engine,
+        timings,
+        on_class_rendered,
     )
+    _count_subrender_cache(timings, subrender_before)
+    return stats
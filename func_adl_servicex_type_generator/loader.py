@@ -1,9 +1,29 @@
-from dataclasses import dataclass
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
 
 import yaml
 
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
 from func_adl_servicex_type_generator.class_utils import class_split_namespace
 from func_adl_servicex_type_generator.data_model import (
     class_info,
@@ -18,47 +38,118 @@ from func_adl_servicex_type_generator.data_model import (
     normal_parameter,
     parameter_action,
 )
+from func_adl_servicex_type_generator.type_index import type_index
+
+# The libyaml backed loader is an order of magnitude faster than the pure python
+# one, but it is only there if PyYAML was built against libyaml.
+_g_yaml_backends: Dict[str, Type[Any]] = {"python": yaml.SafeLoader}
+if hasattr(yaml, "CSafeLoader"):
+    _g_yaml_backends["c"] = yaml.CSafeLoader
+
+
+def yaml_loader_class(backend: str = "auto") -> Type[Any]:
+    """Return the PyYAML safe loader class for a backend.
+
+    Args:
+        backend (str): One of "auto" (libyaml if available, otherwise pure python),
+            "c" (libyaml, fails if it is not available), or "python".
+
+    Returns:
+        Type[Any]: The loader class to hand to `yaml.load`.
+    """
+    if backend == "auto":
+        return _g_yaml_backends.get("c", _g_yaml_backends["python"])
+    if backend == "c" and backend not in _g_yaml_backends:
+        raise RuntimeError(
+            "The libyaml (c) yaml backend was requested, but PyYAML was built without it"
+        )
+    if backend not in _g_yaml_backends:
+        raise RuntimeError(
+            f"Unknown yaml backend {backend} - choose from auto, "
+            f"{', '.join(_g_yaml_backends.keys())}"
+        )
+    return _g_yaml_backends[backend]
+
+
+def _intern(s: Any) -> Any:
+    """Share a single copy of a string. Type names like `float` or
+    `const xAOD::IParticle*` repeat hundreds of thousands of times in a big
+    type file."""
+    return sys.intern(s) if isinstance(s, str) else s
+
+
+def _args_key(args: List[dict]) -> Tuple[Any, ...]:
+    return tuple((a["name"], a["type"]) for a in args)
+
 
+def _method_key(d: dict) -> Tuple[Any, ...]:
+    "Hashable form of a method definition, for sharing identical methods"
+    return (
+        d["name"],
+        d["return_type"],
+        _args_key(d.get("arguments", [])),
+        _args_key(d.get("parameter_arguments", [])),
+        d.get("param_helper", None),
+        d.get("param_type_callback", None),
+    )
 
-def method_loader(methods: List[dict]) -> List[method_info]:
+
+def method_loader(
+    methods: List[dict], shared: Optional[Dict[Any, Any]] = None
+) -> Sequence[method_info]:
     """Return the list of methods from the input
 
+    Many classes have identical accessors (or identical lists of them). Pass the
+    same `shared` dictionary when loading all the classes in a file and those
+    are only built once, and shared between the classes. This is why
+    `method_info` is immutable.
+
     Args:
         methods (List[dict]): List of found methods
+        shared (Optional[Dict[Any, Any]]): Lookup table of already built methods
 
     Returns:
-        List[method_info]: List of methods in our data class format
-    """
-    result = []
-    for d in methods:
-        result.append(
-            method_info(
-                name=d["name"],
-                return_type=d["return_type"],
-                arguments=(
-                    [
-                        method_arg_info(a["name"], None, a["type"])
-                        for a in d["arguments"]
-                    ]
-                    if "arguments" in d
-                    else []
-                ),
-                param_arguments=(
-                    [
-                        method_arg_info(a["name"], None, a["type"])
-                        for a in d["parameter_arguments"]
-                    ]
-                    if "parameter_arguments" in d
-                    else []
-                ),
-                param_helper=d["param_helper"] if "param_helper" in d else None,
-                param_type_cb=(
-                    d["param_type_callback"] if "param_type_callback" in d else None
-                ),
-            )
+        Sequence[method_info]: List of methods in our data class format
+    """
+    shared = shared if shared is not None else {}
+
+    def share(key: Tuple[Any, ...], build: Callable[[], Any]) -> Any:
+        r = shared.get(key, None)
+        if r is None:
+            r = build()
+            shared[key] = r
+        return r
+
+    def build_args(args: List[dict]) -> Tuple[method_arg_info, ...]:
+        return share(
+            ("args", _args_key(args)),
+            lambda: tuple(
+                method_arg_info(_intern(a["name"]), None, _intern(a["type"]))
+                for a in args
+            ),
         )
 
-    return result
+    def build_method(d: dict) -> method_info:
+        return method_info(
+            name=_intern(d["name"]),
+            return_type=_intern(d["return_type"]),
+            arguments=build_args(d.get("arguments", [])),
+            param_arguments=build_args(d.get("parameter_arguments", [])),
+            param_helper=_intern(d["param_helper"]) if "param_helper" in d else None,
+            param_type_cb=(
+                _intern(d["param_type_callback"])
+                if "param_type_callback" in d
+                else None
+            ),
+        )
+
+    keys = [_method_key(d) for d in methods]
+    return share(
+        ("methods", tuple(keys)),
+        lambda: tuple(
+            share(("method", k), lambda: build_method(d)) for k, d in zip(keys, methods)
+        ),
+    )
 
 
 def load_parameters(params: List[Dict[str, Any]]) -> List[normal_parameter]:
@@ -77,9 +168,10 @@ def enum_loader(enums: List[Dict[str, Any]]) -> List[enum_info]:
     "Load extra parameters from the file yaml"
     return [
         enum_info(
-            name=e["name"],
+            name=_intern(e["name"]),
             values=[
-                enum_value_info(name=v["name"], value=v["value"]) for v in e["values"]
+                enum_value_info(name=_intern(v["name"]), value=v["value"])
+                for v in e["values"]
             ],
         )
         for e in enums
@@ -106,6 +198,336 @@ def load_parameters_extra(params: List[Dict[str, Any]]) -> List[extra_parameter]
     ]
 
 
+def collection_loader(c: Dict[str, Any]) -> collection_info:
+    "Load a single collection from the file yaml"
+    return collection_info(
+        name=c["collection_name"],
+        collection_type=c["python_container_type"],
+        collection_item_type=c["python_item_type"],
+        collection_item_type_name=class_split_namespace(c["python_item_type"])[1],
+        cpp_item_type=c["cpp_item_type"],
+        cpp_collection_type=c["cpp_container_type"],
+        cpp_include_file=(
+            [c["include_file"]]
+            if ("include_file" in c) and (len(c["include_file"]) > 0)
+            else []
+        ),
+        link_libraries=c["link_libraries"],
+        parameters=([] if "parameters" not in c else load_parameters(c["parameters"])),
+        extra_parameters=(
+            []
+            if "extra_parameters" not in c
+            else load_parameters_extra(c["extra_parameters"])
+        ),
+        method_callback=c["method_callback"] if "method_callback" in c else "",
+    )
+
+
+def class_loader(
+    c: Dict[str, Any], shared: Optional[Dict[Any, Any]] = None
+) -> class_info:
+    """Load a single class from the file yaml. Methods are shared with other
+    classes loaded with the same `shared` dictionary (see `method_loader`)."""
+    return class_info(
+        name=_intern(c["python_name"]),
+        cpp_name=_intern(c["cpp_name"]),
+        methods=method_loader(c["methods"], shared) if "methods" in c else (),
+        python_container_type=(
+            None
+            if "is_container_of_python" not in c
+            else _intern(c["is_container_of_python"])
+        ),
+        cpp_container_type=(
+            None
+            if "is_container_of_cpp" not in c
+            else _intern(c["is_container_of_cpp"])
+        ),
+        include_file=_intern(c["include_file"]) if "include_file" in c else "",
+        is_alias=("is_alias" in c) and (c["is_alias"] == "True"),
+        behaviors=(
+            [_intern(b) for b in c["also_behaves_like"]]
+            if "also_behaves_like" in c
+            else []
+        ),
+        enums=enum_loader(c["enums"]) if "enums" in c else [],
+        library=_intern(c["library"]) if "library" in c else None,
+    )
+
+
+def metadata_loader(m: Dict[str, Any]) -> Tuple[str, metadata_info]:
+    "Load a single named metadata block from the file yaml"
+    return m["name"], metadata_info(data=m["data"])
+
+
+def file_loader(f: Dict[str, Any]) -> file_info:
+    "Load a single file to be written out from the file yaml"
+    return file_info(
+        file_name=f["name"], init_lines=f["init_lines"], contents=f["contents"]
+    )
+
+
+def _section_loaders() -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    """The top level sections in a type file that are lists, and how to turn each
+    item of the list into our data model. Use one of these per file, so all the
+    classes in the file share their methods."""
+    shared: Dict[Any, Any] = {}
+    return {
+        "collections": collection_loader,
+        "classes": lambda c: class_loader(c, shared),
+        "metadata": metadata_loader,
+        "files": file_loader,
+    }
+
+
+def _compose_node(loader: Any, anchors: Dict[str, yaml.Node]) -> yaml.Node:
+    """Build the next node in the event stream (and all its children).
+
+    This is what `yaml.composer.Composer.compose_node` does, but it uses only
+    the event API, which is all the libyaml parser exposes.
+    """
+    event = loader.get_event()
+    if isinstance(event, yaml.AliasEvent):
+        if event.anchor not in anchors:
+            raise yaml.composer.ComposerError(
+                None, None, f"found undefined alias {event.anchor}", event.start_mark
+            )
+        return anchors[event.anchor]
+
+    node: yaml.Node
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        node = yaml.ScalarNode(
+            tag, event.value, event.start_mark, event.end_mark, style=event.style
+        )
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+    elif isinstance(event, yaml.SequenceStartEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.SequenceNode, None, event.implicit)
+        node = yaml.SequenceNode(
+            tag, [], event.start_mark, None, flow_style=event.flow_style
+        )
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+        while not loader.check_event(yaml.SequenceEndEvent):
+            node.value.append(_compose_node(loader, anchors))
+        node.end_mark = loader.get_event().end_mark
+    elif isinstance(event, yaml.MappingStartEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.MappingNode, None, event.implicit)
+        node = yaml.MappingNode(
+            tag, [], event.start_mark, None, flow_style=event.flow_style
+        )
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = _compose_node(loader, anchors)
+            node.value.append((key, _compose_node(loader, anchors)))
+        node.end_mark = loader.get_event().end_mark
+    else:
+        raise RuntimeError(f"Unexpected yaml event {event}")
+
+    return node
+
+
+def _construct(loader: Any, anchors: Dict[str, yaml.Node]) -> Any:
+    "Build the python object for the next node in the event stream"
+    data = loader.construct_object(_compose_node(loader, anchors), deep=True)
+    # Forget about what we built so memory does not grow with the file.
+    loader.constructed_objects = {}
+    loader.recursive_objects = {}
+    return data
+
+
+def iter_yaml(config_path: Path, backend: str = "auto") -> Iterator[Tuple[str, Any]]:
+    """Read a type file, returning each collection, class, etc., as soon as it has
+    been parsed.
+
+    Only one item of the list sections is ever in memory at a time, so this can
+    be used on type files that are too big to load in one go.
+
+    Yields `(section, item)` pairs, in file order:
+
+    - `("collections", collection_info)`
+    - `("classes", class_info)`
+    - `("metadata", (name, metadata_info))`
+    - `("files", file_info)`
+    - `("config", Dict[str, str])`
+
+    Args:
+        config_path (Path): The path to the type file
+        backend (str): The yaml parser backend to use ("auto", "c", or "python").
+    """
+    with config_path.open("rb") as f_in:
+        loader = yaml_loader_class(backend)(f_in)
+        try:
+            anchors: Dict[str, yaml.Node] = {}
+            loader.get_event()  # Stream start
+            if loader.check_event(yaml.StreamEndEvent):
+                raise RuntimeError(f"Type file {config_path} is empty")
+            loader.get_event()  # Document start
+            if not loader.check_event(yaml.MappingStartEvent):
+                raise RuntimeError(
+                    f"Type file {config_path} does not have a top level dictionary"
+                )
+            loader.get_event()
+
+            section_loaders = _section_loaders()
+            while not loader.check_event(yaml.MappingEndEvent):
+                section = _construct(loader, anchors)
+                if section in section_loaders and loader.check_event(
+                    yaml.SequenceStartEvent
+                ):
+                    item_loader = section_loaders[section]
+                    loader.get_event()
+                    while not loader.check_event(yaml.SequenceEndEvent):
+                        yield section, item_loader(_construct(loader, anchors))
+                    loader.get_event()
+                else:
+                    value = _construct(loader, anchors)
+                    if section == "config":
+                        yield section, value
+        finally:
+            loader.dispose()
+
+
+def iter_type_document(data: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+    """Convert an already loaded type file document, section by section. This
+    returns the same stream as `iter_yaml`.
+
+    Args:
+        data (Dict[str, Any]): The raw type file contents
+
+    Yields:
+        Tuple[str, Any]: The `(section, item)` pairs, in document order
+    """
+    if not isinstance(data, dict):
+        raise RuntimeError("Type file does not have a top level dictionary")
+    section_loaders = _section_loaders()
+    for section, value in data.items():
+        if section in section_loaders and isinstance(value, list):
+            item_loader = section_loaders[section]
+            for item in value:
+                yield section, item_loader(item)
+        elif section == "config":
+            yield section, value
+
+
+# File extensions we recognize for each type file format
+_g_type_file_extensions = {
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".json": "json",
+    ".msgpack": "msgpack",
+    ".mpk": "msgpack",
+}
+
+
+def type_file_format(path: Path) -> str:
+    """Figure out the format of a type file - from the extension, or, if that
+    doesn't tell us, by looking at the start of the file.
+
+    Args:
+        path (Path): The type file
+
+    Returns:
+        str: One of `yaml`, `json`, or `msgpack`
+    """
+    file_format = _g_type_file_extensions.get(path.suffix.lower(), None)
+    if file_format is not None:
+        return file_format
+
+    with path.open("rb") as f_in:
+        start = f_in.read(64)
+    if len(start) > 0 and (0x80 <= start[0] <= 0x8F or start[0] in (0xDE, 0xDF)):
+        # A msgpack map - which is never the first byte of a text file.
+        return "msgpack"
+    if start.lstrip().startswith(b"{"):
+        return "json"
+    return "yaml"
+
+
+def _need_msgpack():
+    if msgpack is None:
+        raise RuntimeError(
+            "MessagePack type files need the msgpack package "
+            "(pip install func_adl_servicex_type_generator[msgpack])"
+        )
+
+
+def load_raw_type_file(path: Path, backend: str = "auto") -> Dict[str, Any]:
+    """Load a type file without converting it to our data model.
+
+    Args:
+        path (Path): The type file (yaml, json, or msgpack)
+        backend (str): The yaml parser backend to use for yaml files
+
+    Returns:
+        Dict[str, Any]: The raw contents of the file
+    """
+    file_format = type_file_format(path)
+    with path.open("rb") as f_in:
+        if file_format == "json":
+            return json.load(f_in)
+        if file_format == "msgpack":
+            _need_msgpack()
+            return msgpack.unpack(f_in, raw=False)
+        return yaml.load(f_in, Loader=yaml_loader_class(backend))
+
+
+def iter_type_file(path: Path, backend: str = "auto") -> Iterator[Tuple[str, Any]]:
+    """Read a yaml, json, or msgpack type file, and return its contents item by
+    item (see `iter_yaml`).
+
+    Only yaml files are streamed: json and msgpack are fast enough to load in
+    one go.
+
+    Args:
+        path (Path): The type file
+        backend (str): The yaml parser backend to use for yaml files
+    """
+    if type_file_format(path) == "yaml":
+        return iter_yaml(path, backend=backend)
+    return iter_type_document(load_raw_type_file(path))
+
+
+def convert_type_file(input_path: Path, output_path: Path, backend: str = "auto"):
+    """Write a type file out in a different format. The output format comes from
+    the extension of `output_path`.
+
+    The json and msgpack formats are much faster to parse than yaml, so it is
+    worth converting a type file that is going to be used many times.
+
+    Args:
+        input_path (Path): The type file to read
+        output_path (Path): Where to write it
+        backend (str): The yaml parser backend to use for yaml files
+    """
+    data = load_raw_type_file(input_path, backend=backend)
+
+    output_format = _g_type_file_extensions.get(output_path.suffix.lower(), None)
+    if output_format is None:
+        raise RuntimeError(
+            f"Do not know the type file format for {output_path} - use one of the "
+            f"extensions {', '.join(_g_type_file_extensions.keys())}"
+        )
+
+    if output_format == "msgpack":
+        _need_msgpack()
+        with output_path.open("wb") as f_out:
+            msgpack.pack(data, f_out, use_bin_type=True)
+    elif output_format == "json":
+        with output_path.open("wt") as f_out:
+            json.dump(data, f_out, separators=(",", ":"))
+    else:
+        with output_path.open("wt") as f_out:
+            yaml.safe_dump(data, f_out, sort_keys=False)
+
+
 @dataclass
 class LoadedData:
     "Data loaded from the yaml file"
@@ -125,83 +547,248 @@ class LoadedData:
     # Config
     config: Dict[str, str]
 
+    # Lookup tables for the classes, built the first time they are needed (so
+    # shards loaded in worker processes don't build and send back their own).
+    _index: Optional[type_index] = field(
+        default=None, init=False, compare=False, repr=False
+    )
+
+    @property
+    def index(self) -> type_index:
+        "Lookup tables for the classes"
+        if self._index is None:
+            self._index = type_index(self.classes)
+        return self._index
 
-def load_yaml(
-    config_path: Path,
+
+def loaded_data_from_stream(
+    items: Iterable[Tuple[str, Any]],
+    source: str = "type file",
+    require_config: bool = True,
 ) -> LoadedData:
+    """Gather everything from a type file stream (see `iter_yaml`) into memory.
+
+    Args:
+        items (Iterable[Tuple[str, Any]]): The `(section, item)` stream
+        source (str): Name of where the stream came from, for error messages
+        require_config (bool): If False, a missing config section is treated as empty
+
+    Returns:
+        LoadedData: All the collections, classes, etc., from the stream
+    """
+    sections: Dict[str, Any] = {
+        "collections": [],
+        "classes": [],
+        "metadata": {},
+        "files": [],
+    }
+    config = None
+    for section, item in items:
+        if section == "config":
+            config = item
+        elif section == "metadata":
+            sections["metadata"][item[0]] = item[1]
+        else:
+            sections[section].append(item)
+
+    # The list sections can be missing or empty, but we can't do anything without
+    # the config.
+    if config is None:
+        if require_config:
+            raise RuntimeError(f"{source} is missing the config section")
+        config = {}
+
+    return LoadedData(
+        sections["collections"],
+        sections["classes"],
+        sections["metadata"],
+        sections["files"],
+        config,
+    )
+
+
+def load_yaml(config_path: Path, backend: str = "auto") -> LoadedData:
     """Return data from a loaded info file
 
     Args:
         config_path (Path): The path to the file we are using
+        backend (str): The yaml parser backend to use ("auto", "c", or "python").
 
     Returns:
-        Tuple[List[collection_info], List[class_info]]]: [description]
-    """
-    data = yaml.safe_load(config_path.read_text())
-
-    data_collections = data["collections"]
-    data_classes = data["classes"]
-    data_metadata = data["metadata"]
-    data_files = data["files"]
-
-    collections = [
-        collection_info(
-            name=c["collection_name"],
-            collection_type=c["python_container_type"],
-            collection_item_type=c["python_item_type"],
-            collection_item_type_name=class_split_namespace(c["python_item_type"])[1],
-            cpp_item_type=c["cpp_item_type"],
-            cpp_collection_type=c["cpp_container_type"],
-            cpp_include_file=(
-                [c["include_file"]]
-                if ("include_file" in c) and (len(c["include_file"]) > 0)
-                else []
-            ),
-            link_libraries=c["link_libraries"],
-            parameters=(
-                [] if "parameters" not in c else load_parameters(c["parameters"])
-            ),
-            extra_parameters=(
-                []
-                if "extra_parameters" not in c
-                else load_parameters_extra(c["extra_parameters"])
-            ),
-            method_callback=c["method_callback"] if "method_callback" in c else "",
-        )
-        for c in data_collections
-    ]
+        LoadedData: The collections, classes, etc., found in the file.
+    """
+    return loaded_data_from_stream(
+        iter_yaml(config_path, backend=backend), source=str(config_path)
+    )
 
-    classes = [
-        class_info(
-            name=c["python_name"],
-            cpp_name=c["cpp_name"],
-            methods=method_loader(c["methods"]) if "methods" in c else [],
-            python_container_type=(
-                None
-                if "is_container_of_python" not in c
-                else c["is_container_of_python"]
-            ),
-            cpp_container_type=(
-                None if "is_container_of_cpp" not in c else c["is_container_of_cpp"]
-            ),
-            include_file=c["include_file"] if "include_file" in c else "",
-            is_alias=("is_alias" in c) and (c["is_alias"] == "True"),
-            behaviors=c["also_behaves_like"] if "also_behaves_like" in c else [],
-            enums=enum_loader(c["enums"]) if "enums" in c else [],
-            library=c["library"] if "library" in c else None,
-        )
-        for c in data_classes
-    ]
 
-    metadata = {m["name"]: metadata_info(data=m["data"]) for m in data_metadata}
+def load_type_file(path: Path, backend: str = "auto") -> LoadedData:
+    """Return data from a yaml, json, or msgpack type file. The format is
+    determined by `type_file_format`.
+
+    Args:
+        path (Path): The type file
+        backend (str): The yaml parser backend to use for yaml files
+
+    Returns:
+        LoadedData: The collections, classes, etc., found in the file.
+    """
+    return loaded_data_from_stream(
+        iter_type_file(path, backend=backend), source=str(path)
+    )
+
 
-    files = [
-        file_info(
-            file_name=f["name"], init_lines=f["init_lines"], contents=f["contents"]
+def _load_shard(path: Path, backend: str) -> LoadedData:
+    "Load one type file of a sharded directory (run in a worker process)"
+    return loaded_data_from_stream(
+        iter_type_file(path, backend=backend), source=str(path), require_config=False
+    )
+
+
+def type_files_in_directory(directory: Path) -> List[Path]:
+    """Return all the type files (shards) in a directory, sorted by name so the
+    merged result does not depend on the order the file system lists them.
+
+    Args:
+        directory (Path): Directory of type files
+
+    Returns:
+        List[Path]: The type files
+    """
+    return sorted(
+        p
+        for p in directory.iterdir()
+        if p.is_file()
+        and not p.name.startswith(".")
+        and p.suffix.lower() in _g_type_file_extensions
+    )
+
+
+def _merge_by_key(
+    items: Iterable[Tuple[str, Any]],
+    key: Callable[[Any], str],
+    what: str,
+    conflicts: List[str],
+) -> List[Any]:
+    """Merge items from several shards by a key. An item already seen in another
+    shard is dropped if it is identical, and recorded as a conflict if it is not.
+
+    Repeats inside a single shard are left alone - single type files have them.
+    """
+    result: List[Any] = []
+    first_seen: Dict[str, Tuple[str, List[Any]]] = {}
+    for shard, item in items:
+        k = key(item)
+        if k not in first_seen:
+            first_seen[k] = (shard, [item])
+        elif first_seen[k][0] == shard:
+            first_seen[k][1].append(item)
+        else:
+            if item not in first_seen[k][1]:
+                conflicts.append(
+                    f"{what} {k} is defined differently in {first_seen[k][0]} and {shard}"
+                )
+            continue
+        result.append(item)
+    return result
+
+
+def merge_loaded_data(shards: Sequence[Tuple[str, LoadedData]]) -> LoadedData:
+    """Merge the data loaded from several type files into one.
+
+    The same class, collection, metadata, file, or config value may appear in
+    more than one shard as long as it is identical in all of them. If it is not,
+    a `RuntimeError` listing every conflict is raised.
+
+    Args:
+        shards (Sequence[Tuple[str, LoadedData]]): Name of each shard (for error
+            messages) and the data loaded from it
+
+    Returns:
+        LoadedData: The merged data
+    """
+    conflicts: List[str] = []
+
+    def all_items(getter: Callable[[LoadedData], Iterable[Any]]):
+        return [(name, item) for name, data in shards for item in getter(data)]
+
+    classes = _merge_by_key(
+        all_items(lambda d: d.classes), lambda c: c.name, "Class", conflicts
+    )
+    # Classes must also be unique by their C++ name
+    _merge_by_key(
+        all_items(lambda d: d.classes), lambda c: c.cpp_name, "C++ class", conflicts
+    )
+    collections = _merge_by_key(
+        all_items(lambda d: d.collections), lambda c: c.name, "Collection", conflicts
+    )
+    metadata = _merge_by_key(
+        all_items(lambda d: d.metadata.items()), lambda m: m[0], "Metadata", conflicts
+    )
+    files = _merge_by_key(
+        all_items(lambda d: d.files), lambda f: f.file_name, "File", conflicts
+    )
+    config = _merge_by_key(
+        all_items(lambda d: d.config.items()), lambda c: c[0], "Config value", conflicts
+    )
+
+    if len(conflicts) > 0:
+        raise RuntimeError(
+            "Conflicting definitions in type file shards:\n  " + "\n  ".join(conflicts)
         )
-        for f in data_files
-    ]
+    if len(config) == 0:
+        raise RuntimeError("None of the type file shards has a config section")
+
+    return LoadedData(
+        collections=collections,
+        classes=classes,
+        metadata=dict(metadata),
+        files=files,
+        config=dict(config),
+    )
 
-    config = data["config"]
 
-    return LoadedData(collections, classes, metadata, files, config)
+def load_type_directory(
+    directory: Path, backend: str = "auto", jobs: Optional[int] = None
+) -> LoadedData:
+    """Load a directory of type files (for example, one per namespace) and merge
+    them. The files are loaded in parallel.
+
+    Args:
+        directory (Path): Directory of type files
+        backend (str): The yaml parser backend to use for yaml files
+        jobs (Optional[int]): Number of worker processes (default is one per CPU)
+
+    Returns:
+        LoadedData: The merged data from all the type files
+    """
+    shards = type_files_in_directory(directory)
+    if len(shards) == 0:
+        raise RuntimeError(f"No type files found in {directory}")
+
+    n_workers = min(len(shards), jobs if jobs is not None else (os.cpu_count() or 1))
+    if n_workers <= 1:
+        loaded = [_load_shard(p, backend) for p in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            loaded = list(executor.map(_load_shard, shards, [backend] * len(shards)))
+
+    return merge_loaded_data([(p.name, d) for p, d in zip(shards, loaded)])
+
+
+def load_type_path(
+    path: Path, backend: str = "auto", jobs: Optional[int] = None
+) -> LoadedData:
+    """Load a type file, or a directory of type file shards.
+
+    Args:
+        path (Path): The type file or directory
+        backend (str): The yaml parser backend to use for yaml files
+        jobs (Optional[int]): Number of worker processes to use for a directory
+
+    Returns:
+        LoadedData: The collections, classes, etc.
+    """
+    if path.is_dir():
+        return load_type_directory(path, backend=backend, jobs=jobs)
+    return load_type_file(path, backend=backend)
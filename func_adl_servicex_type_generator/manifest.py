@@ -0,0 +1,75 @@
+import json
+import logging
+from pathlib import Path
+from typing import Dict
+
+from func_adl_servicex_type_generator.model_cache import generator_version
+
+# The manifest lives in the top level of the output directory. It is hidden, so
+# incremental runs never remove it as a stale file.
+_g_manifest_name = ".sx_type_gen_manifest.json"
+
+# Bump this if the layout of the manifest, or what goes into the hashes, changes
+_g_manifest_format = 3
+
+
+def manifest_path(output_path: Path) -> Path:
+    "Location of the generation manifest in an output directory"
+    return output_path / _g_manifest_name
+
+
+def load_manifest(output_path: Path, engine: str = "jinja") -> Dict[str, str]:
+    """Return the input hashes of the class files from the last generation into
+    `output_path`.
+
+    If there is no manifest, or it was written by a different version of the
+    generator or with a different engine, an empty dictionary is returned (so
+    everything is rendered).
+
+    Args:
+        output_path (Path): The output directory
+        engine (str): The engine the class files will be written with
+
+    Returns:
+        Dict[str, str]: Input hash, by class file path relative to the package
+    """
+    m_path = manifest_path(output_path)
+    if not m_path.exists():
+        return {}
+    try:
+        manifest = json.loads(m_path.read_text())
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable generation manifest {m_path}: {e}")
+        return {}
+
+    if (
+        not isinstance(manifest, dict)
+        or manifest.get("format", None) != _g_manifest_format
+        or manifest.get("generator_version", None) != generator_version()
+        or manifest.get("engine", None) != engine
+    ):
+        logging.info(
+            f"Ignoring generation manifest {m_path} from another version or engine"
+        )
+        return {}
+    return manifest.get("files", {})
+
+
+def save_manifest(
+    output_path: Path, input_hashes: Dict[str, str], engine: str = "jinja"
+):
+    """Write the generation manifest
+
+    Args:
+        output_path (Path): The output directory
+        input_hashes (Dict[str, str]): Input hash, by class file path relative to
+            the package
+        engine (str): The engine the class files were written with
+    """
+    manifest = {
+        "format": _g_manifest_format,
+        "generator_version": generator_version(),
+        "engine": engine,
+        "files": dict(sorted(input_hashes.items())),
+    }
+    manifest_path(output_path).write_text(json.dumps(manifest, indent=1) + "\n")
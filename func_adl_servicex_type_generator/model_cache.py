@@ -0,0 +1,219 @@
+import hashlib
+import logging
+import os
+import pickle
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from func_adl_servicex_type_generator.loader import LoadedData, type_files_in_directory
+
+# The modules that define `LoadedData` (and everything it holds) and build it.
+# Their source is part of the cache key, so old pickles are never loaded into
+# edited classes.
+_g_model_sources = (
+    "class_utils.py",
+    "cpp_types.py",
+    "data_model.py",
+    "loader.py",
+    "type_index.py",
+)
+
+# Default upper limit on the total size of the cached models
+default_max_cache_bytes = 512 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """Return the directory where we cache things between runs.
+
+    `SX_TYPE_GEN_CACHE` wins if it is set, otherwise we follow the XDG convention
+    (`~/.cache/func_adl_servicex_type_generator`).
+
+    Returns:
+        Path: The cache directory (may not exist yet)
+    """
+    if "SX_TYPE_GEN_CACHE" in os.environ:
+        return Path(os.environ["SX_TYPE_GEN_CACHE"])
+    xdg_cache = os.environ.get("XDG_CACHE_HOME", "")
+    base = Path(xdg_cache) if xdg_cache != "" else Path.home() / ".cache"
+    return base / "func_adl_servicex_type_generator"
+
+
+def default_model_cache_dir() -> Path:
+    "Return the directory where the parsed models are cached"
+    return default_cache_dir() / "models"
+
+
+def default_template_cache_dir() -> Path:
+    "Return the directory where the compiled templates are cached"
+    return default_cache_dir() / "templates"
+
+
+def generator_version() -> str:
+    "Return the version of this package, or `unknown` if it isn't installed"
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+
+        return version("func_adl_servicex_type_generator")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+@lru_cache(maxsize=None)
+def source_digest(module_files: Tuple[str, ...]) -> str:
+    """Return a hash of the source of some of this package's modules. Anything
+    built by them can then be thrown away when they are edited, even if the
+    version was not bumped (as in an editable install). Each set of modules is
+    only read once per process.
+
+    Args:
+        module_files (Tuple[str, ...]): File names of the modules, e.g. `loader.py`
+
+    Returns:
+        str: Hex digest of the names and contents of the modules
+    """
+    h = hashlib.sha256()
+    for name in module_files:
+        h.update(f"{name}:".encode())
+        h.update((Path(__file__).parent / name).read_bytes())
+    return h.hexdigest()
+
+
+def model_cache_key(type_file: Path) -> str:
+    """Return the cache key for a type file: hash of its contents along with the
+    generator version and the source of the modules that build the model.
+
+    Args:
+        type_file (Path): The type file that will be loaded. If this is a directory
+            of type file shards, the names and contents of all the shards are used.
+
+    Returns:
+        str: Hex digest to use as the cache key
+    """
+    h = hashlib.sha256()
+    h.update(f"{generator_version()}:{source_digest(_g_model_sources)}:".encode())
+    shards = type_files_in_directory(type_file) if type_file.is_dir() else [type_file]
+    for shard in shards:
+        h.update(f"{shard.name}:".encode())
+        with shard.open("rb") as f_in:
+            for chunk in iter(lambda: f_in.read(1024 * 1024), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_entries(cache_dir: Path) -> List[Path]:
+    "All the cached models in the cache directory"
+    if not cache_dir.exists():
+        return []
+    return list(cache_dir.glob("*.pickle"))
+
+
+def load_cached_model(
+    type_file: Path,
+    loader: Callable[[Path], LoadedData],
+    cache_dir: Path,
+    max_cache_bytes: int = default_max_cache_bytes,
+) -> LoadedData:
+    """Return the fully built model for a type file, using the on-disk cache
+    if we have seen this file before.
+
+    On a miss the model is built with `loader` and saved to the cache, and the
+    cache is trimmed back to `max_cache_bytes`.
+
+    Args:
+        type_file (Path): The type file to load
+        loader (Callable[[Path], LoadedData]): Builds the model on a cache miss
+        cache_dir (Path): Directory that holds the cached models
+        max_cache_bytes (int): Size limit for everything in `cache_dir`
+
+    Returns:
+        LoadedData: The model
+    """
+    cache_file = cache_dir / f"{model_cache_key(type_file)}.pickle"
+
+    if cache_file.exists():
+        try:
+            with cache_file.open("rb") as f_in:
+                data = pickle.load(f_in)
+            # Touch it so eviction sees it as recently used
+            cache_file.touch()
+            logging.info(f"Loaded model for {type_file} from cache {cache_file}")
+            return data
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable model cache file {cache_file}: {e}")
+            cache_file.unlink(missing_ok=True)
+
+    data = loader(type_file)
+
+    # Write to a temp file first so a parallel run never sees half a pickle.
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with tmp_file.open("wb") as f_out:
+        pickle.dump(data, f_out, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+    logging.info(f"Saved model for {type_file} to cache {cache_file}")
+
+    evict_model_cache(cache_dir, max_cache_bytes)
+    return data
+
+
+def evict_model_cache(cache_dir: Path, max_cache_bytes: int) -> int:
+    """Remove the least recently used models until the cache fits in
+    `max_cache_bytes`.
+
+    Args:
+        cache_dir (Path): Directory that holds the cached models
+        max_cache_bytes (int): Size limit for everything in `cache_dir`
+
+    Returns:
+        int: Number of cached models removed
+    """
+    entries = [(p, p.stat()) for p in _cache_entries(cache_dir)]
+    total = sum(s.st_size for _, s in entries)
+    removed = 0
+    for p, s in sorted(entries, key=lambda e: e[1].st_mtime):
+        if total <= max_cache_bytes:
+            break
+        p.unlink(missing_ok=True)
+        total -= s.st_size
+        removed += 1
+    return removed
+
+
+def clear_model_cache(cache_dir: Path) -> int:
+    """Remove all cached models
+
+    Args:
+        cache_dir (Path): Directory that holds the cached models
+
+    Returns:
+        int: Number of cached models removed
+    """
+    entries = _cache_entries(cache_dir)
+    for p in entries:
+        p.unlink(missing_ok=True)
+    return len(entries)
+
+
+@dataclass
+class model_cache_info:
+    "Summary of what is in the model cache"
+
+    # Where the cache lives
+    cache_dir: Path
+
+    # Number of cached models
+    n_models: int
+
+    # Total size of the cached models
+    total_bytes: int
+
+
+def get_model_cache_info(cache_dir: Optional[Path] = None) -> model_cache_info:
+    "Summarize the contents of the model cache"
+    cache_dir = cache_dir if cache_dir is not None else default_model_cache_dir()
+    entries = _cache_entries(cache_dir)
+    return model_cache_info(
+        cache_dir, len(entries), sum(p.stat().st_size for p in entries)
+    )
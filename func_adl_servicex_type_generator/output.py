@@ -0,0 +1,133 @@
+import logging
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+
+def as_lines(text: str) -> str:
+    """Rewrite text so every line, including the last, ends in a single newline.
+
+    Any line ending python knows about (`\\r\\n`, `\\r`, etc.) becomes `\\n`.
+    """
+    lines = text.splitlines()
+    return "\n".join(lines) + "\n" if len(lines) > 0 else ""
+
+
+def as_lines_list(lines: Sequence[Optional[str]]) -> str:
+    "Join lines, ending every one with a newline. None is an empty line."
+    if len(lines) == 0:
+        return ""
+    return "\n".join(line if line is not None else "" for line in lines) + "\n"
+
+
+def write_if_changed(output_file: Path, text: str) -> bool:
+    """Write a file, unless it already has exactly this text in it.
+
+    Args:
+        output_file (Path): The file to write
+        text (str): What should be in it
+
+    Returns:
+        bool: True if the file was written, False if it was already up to date
+    """
+    if output_file.exists():
+        try:
+            if output_file.read_text() == text:
+                return False
+        except (OSError, UnicodeDecodeError):
+            pass
+    else:
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    with output_file.open("wt") as out:
+        out.write(text)
+    return True
+
+
+def _is_kept(relative_path: Path) -> bool:
+    "Files we never remove from the output directory, even if we did not write them"
+    return any(
+        p.startswith(".") or p == "__pycache__" or p.endswith(".egg-info")
+        for p in relative_path.parts
+    )
+
+
+@dataclass
+class write_stats:
+    "What happened to the files in the output directory"
+
+    # Files that were new or had different contents
+    written: int
+
+    # Files that already had the right contents
+    unchanged: int
+
+    # Files that were there before, but aren't part of the package any longer
+    deleted: int
+
+
+class output_writer:
+    """Writes the files of a generated package.
+
+    Files are only written if their contents changed. In incremental mode, the
+    output directory is left in place and `finish` removes anything that was not
+    written this time around. Otherwise, the output directory is removed before
+    anything is written.
+    """
+
+    def __init__(self, output_path: Path, incremental: bool = False):
+        """Set up the writer
+
+        Args:
+            output_path (Path): The directory everything is written into
+            incremental (bool): Keep what is already in `output_path`, and only touch
+                files that changed.
+        """
+        self._output_path = output_path
+        self._incremental = incremental
+
+        # Every file we have produced, and if it was written (or was unchanged)
+        self._files: Dict[Path, bool] = {}
+
+        if not incremental and output_path.exists():
+            shutil.rmtree(output_path)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+    def write(self, output_file: Path, text: str):
+        "Write `text` to `output_file` if it changed"
+        self.record(output_file, write_if_changed(output_file, text))
+
+    def write_lines(self, output_file: Path, text: str):
+        "Write `text` to `output_file` (see `as_lines`) if it changed"
+        self.write(output_file, as_lines(text))
+
+    def record(self, output_file: Path, written: bool):
+        "Note a file that was written (or checked) somewhere else, like a worker"
+        self._files[output_file] = self._files.get(output_file, False) or written
+
+    def finish(self) -> write_stats:
+        """Remove stale files (incremental mode only), and return what was done.
+
+        Hidden files and directories, `__pycache__`, and `.egg-info` directories
+        are never removed.
+
+        Returns:
+            write_stats: The number of files written, unchanged, and deleted
+        """
+        deleted = 0
+        if self._incremental:
+            for f in sorted(self._output_path.rglob("*"), reverse=True):
+                relative_path = f.relative_to(self._output_path)
+                if _is_kept(relative_path):
+                    continue
+                if f.is_dir():
+                    if not any(f.iterdir()):
+                        f.rmdir()
+                elif f not in self._files:
+                    logging.info(f"Removing stale file {f}")
+                    f.unlink()
+                    deleted += 1
+
+        written = sum(1 for w in self._files.values() if w)
+        return write_stats(written, len(self._files) - written, deleted)
@@ -1,24 +1,84 @@
+import hashlib
 import logging
-import shutil
-from dataclasses import dataclass
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import jinja2
 
 from func_adl_servicex_type_generator.class_utils import (
+    _g_type_token,
     class_ns_as_path,
     class_split_namespace,
     remove_ns_stem,
 )
+from func_adl_servicex_type_generator.cpp_types import (
+    _g_py_single_types,
+    normalize_cpp_type,
+    parse_cpp_type,
+)
 from func_adl_servicex_type_generator.data_model import (
     class_info,
+    collection_info,
     enum_info,
     file_info,
+    metadata_info,
     method_info,
 )
+from func_adl_servicex_type_generator.emitter import emit_class_module
+from func_adl_servicex_type_generator.model_cache import source_digest
+from func_adl_servicex_type_generator.output import (
+    as_lines,
+    as_lines_list,
+    output_writer,
+    write_if_changed,
+)
+from func_adl_servicex_type_generator.timings import phase_timings, render_hook
+from func_adl_servicex_type_generator.type_index import (  # noqa: F401
+    py_type_from_cpp,
+    type_index,
+)
+from func_adl_servicex_type_generator.view_model import (
+    argument_view,
+    class_view,
+    collection_view,
+    enum_view,
+    metadata_entry_view,
+    metadata_view,
+    method_view,
+)
+
+# The ways we can write out a class module
+_g_engines = ("jinja", "fast")
+
+# The modules that turn the model into class files. They are part of every input
+# hash, so editing them renders everything again.
+_g_render_sources = (
+    "class_utils.py",
+    "cpp_types.py",
+    "emitter.py",
+    "package.py",
+    "type_index.py",
+    "view_model.py",
+)
 
-from .class_utils import package_qualified_class
+# Number of compiled sub-templates to keep
+_g_subtemplate_cache_size = 1024
+
+
+@lru_cache(maxsize=_g_subtemplate_cache_size)
+def _compile_subtemplate(env: jinja2.Environment, source: str) -> jinja2.Template:
+    "Compile a sub-template. The same few callback snippets are used all over."
+    return env.from_string(source)
+
+
+def subrender_cache_info():
+    "Hits, misses, and size of the compiled sub-template cache"
+    return _compile_subtemplate.cache_info()
 
 
 @jinja2.pass_context  # type: ignore
@@ -26,7 +86,7 @@ def subrender_filter(context, value):
     if value is None:
         return value
 
-    _template = context.eval_ctx.environment.from_string(value)
+    _template = _compile_subtemplate(context.eval_ctx.environment, value)
     result = _template.render(**context)
     if context.eval_ctx.autoescape:
         result = jinja2.Markup(result)  # type: ignore
@@ -37,6 +97,53 @@ def prep_jinja2_env(env: jinja2.Environment):
     env.filters["subrender"] = subrender_filter
 
 
+# The shared environments, by (template directory, bytecode cache directory)
+_g_environments: Dict[Tuple[Path, Optional[Path]], jinja2.Environment] = {}
+
+
+def template_environment(
+    template_dir: Path, bytecode_cache_dir: Optional[Path] = None
+) -> jinja2.Environment:
+    """Return the shared jinja2 environment for a directory of templates.
+
+    All the templates are compiled when the environment is first made, and the
+    environment is reused for the rest of the process (scaffolding, class files,
+    other releases). Templates are not checked for changes once they are loaded.
+
+    Args:
+        template_dir (Path): The directory of templates
+        bytecode_cache_dir (Optional[Path]): If given, the compiled templates are
+            saved here, and later processes load them instead of compiling again.
+
+    Returns:
+        jinja2.Environment: The environment
+    """
+    key = (template_dir.resolve(), bytecode_cache_dir)
+    env = _g_environments.get(key, None)
+    if env is None:
+        bytecode_cache = None
+        if bytecode_cache_dir is not None:
+            bytecode_cache_dir.mkdir(parents=True, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(str(bytecode_cache_dir))
+        env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(str(template_dir)),
+            auto_reload=False,
+            bytecode_cache=bytecode_cache,
+        )
+        prep_jinja2_env(env)
+        for t in env.list_templates():
+            env.get_template(t)
+        _g_environments[key] = env
+    return env
+
+
+def reset_template_environments():
+    """Forget the shared environments, so the templates are loaded again the next
+    time they are used. Call this when the templates have been edited."""
+    _g_environments.clear()
+    _compile_subtemplate.cache_clear()
+
+
 @dataclass
 class config_info:
     "Config variables to be written out"
@@ -45,8 +152,94 @@ class config_info:
     value: str
 
 
+def collection_views(
+    collections: Iterable[collection_info],
+    env: jinja2.Environment,
+    context: Dict[str, Any],
+) -> List[collection_view]:
+    """Build the view of each collection for the `event_collection.py` template.
+
+    Args:
+        collections (Iterable[collection_info]): The collections
+        env (jinja2.Environment): The environment the method callbacks are
+            rendered in
+        context (Dict[str, Any]): The variables the method callbacks are rendered
+            with (`package_name`, etc.)
+
+    Returns:
+        List[collection_view]: The views, in the same order
+    """
+    r = []
+    for c in collections:
+        include_files = "".join(f"'{f}'," for f in c.cpp_include_file)
+        metadata = [
+            "'metadata_type': 'add_atlas_event_collection_info',",
+            f"'name': '{c.name}',",
+            f"'include_files': [{include_files}],",
+            f"'container_type': '{c.cpp_collection_type}',",
+        ]
+        contains_collection = c.cpp_item_type != c.cpp_collection_type
+        if contains_collection:
+            metadata.append(f"'element_type': '{c.cpp_item_type}',")
+        metadata += [
+            f"'contains_collection': {contains_collection},",
+            f"'link_libraries': {c.link_libraries},",
+        ]
+
+        arguments = "".join(
+            f", {p.name}: {p.type}"
+            + (f" = {p.default_value}" if p.default_value is not None else "")
+            for p in c.parameters
+        ) + "".join(
+            f", {p.name}: {p.type} = {p.default_value}" for p in c.extra_parameters
+        )
+
+        r.append(
+            collection_view(
+                name=c.name,
+                collection_type=c.collection_type,
+                metadata=metadata,
+                arguments=arguments,
+                method_callback=(
+                    _compile_subtemplate(env, c.method_callback).render(**context)
+                    if len(c.method_callback) > 0
+                    else None
+                ),
+                extra_parameters=c.extra_parameters,
+            )
+        )
+    return r
+
+
+def metadata_views(metadata: Dict[str, metadata_info]) -> List[metadata_view]:
+    """Build the view of each named metadata block for the `event_collection.py`
+    template.
+
+    Args:
+        metadata (Dict[str, metadata_info]): The metadata blocks, by name
+
+    Returns:
+        List[metadata_view]: The views, in the same order
+    """
+    return [
+        metadata_view(
+            name,
+            [
+                metadata_entry_view(key, value, isinstance(value, str))
+                for key, value in md.data[0].items()
+            ],
+        )
+        for name, md in metadata.items()
+    ]
+
+
 def template_package_scaffolding(
-    data: Dict[str, Any], template_path: Path, output_path: Path, files: List[file_info]
+    data: Dict[str, Any],
+    template_path: Path,
+    output_path: Path,
+    files: List[file_info],
+    writer: Optional[output_writer] = None,
+    bytecode_cache_dir: Optional[Path] = None,
 ):
     """Generate the package scaffolding:
 
@@ -59,54 +252,42 @@ def template_package_scaffolding(
         output_path:           Location where we want to write the generated
                                package
         files:                 List of files to write out
+        writer:                Writes the files. If not given, anything already
+                               in `output_path` is removed first.
+        bytecode_cache_dir:    Where to keep compiled templates between runs
     """
     # Load up the template structure and environment
-    loader = jinja2.FileSystemLoader(str(template_path / "package"))
-    env = jinja2.Environment(loader=loader)
-    prep_jinja2_env(env)
+    env = template_environment(template_path / "package", bytecode_cache_dir)
 
     # Remove the package if it was there before
-    if output_path.exists():
-        shutil.rmtree(output_path)
-
-    # Create the output directory
-    output_path.mkdir(parents=True, exist_ok=True)
+    writer = writer if writer is not None else output_writer(output_path)
 
-    # Generate import statements for the collection classes
+    # The collections and metadata are only interpolated by the templates
     template_data = dict(data)
+    template_data["collection_views"] = collection_views(
+        data.get("collections", []), env, template_data
+    )
+    template_data["metadata_views"] = metadata_views(data.get("metadata", {}))
 
-    # Generate the package
-    for t in loader.list_templates():
+    # Generate the package. The src directory is written as the package directory.
+    dest_path = output_path / template_data["package_name"]
+    templates = env.list_templates()
+    assert any(Path(t).parts[0] == "src" for t in templates)
+    for t in templates:
         template = env.get_template(t)
-        output_file = output_path / t
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+        t_parts = Path(t).parts
+        output_file = (
+            dest_path.joinpath(*t_parts[1:]) if t_parts[0] == "src" else output_path / t
+        )
         logging.info(f"Rendering {output_file}")
-        with output_file.open("wt") as out:
-            for line in template.render(template_data).splitlines():
-                out.write(line)
-                out.write("\n")
-
-    # We rename the src directory to be the package name now
-    assert (output_path / "src").exists()
-    dest_path = output_path / template_data["package_name"]
-    if not dest_path.exists():
-        (output_path / "src").rename(dest_path)
-    else:
-        for f in (output_path / "src").iterdir():
-            dest = dest_path / f.name
-            if dest.exists():
-                dest.unlink()
-            f.rename(dest)
+        writer.write_lines(output_file, template.render(template_data))
 
     # Write out all the files
     for f in files:
-        output_file_path = dest_path / Path(f.file_name)
-        output_file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_file_path, "w") as f_out:
-            for line in f.contents:
-                if line is not None:
-                    f_out.write(line)
-                f_out.write("\n")
+        writer.write(
+            dest_path / Path(f.file_name),
+            as_lines_list(f.contents),
+        )
 
 
 @dataclass
@@ -143,145 +324,620 @@ def cpp_collection_element(
     return c.cpp_container_type
 
 
-_g_cpp_to_py_type_map = {
-    "float": "float",
-    "int": "int",
-    "uint": "int",
-    "int16_t": "int",
-    "int32_t": "int",
-    "unsigned int": "int",
-    "short": "int",
-    "unsigned short": "int",
-    "unsigned long long": "int",
-    "long long": "int",
-    "long": "int",
-    "unsigned long": "int",
-    "double": "float",
-    "bool": "bool",
-    "uint64_t": "int",
-    "uint16_t": "int",
-    "uint8_t": "int",
-    "char": "str",
-    "string": "str",
-}
-
-_g_py_single_types = {i for _, i in _g_cpp_to_py_type_map.items()}
-
-
-def clean_cpp_type(cpp_class_name: Optional[str]) -> Optional[str]:
-    """Remove the prefixes and post-fixes from a C++ class name.
-
-    Args:
-        cpp_class_name (str): The C++ class name
+class class_renderer:
+    """Renders the python file for each class.
 
-    Returns:
-        str: The cleaned C++ class name
+    Everything that is worked out along the way (the resolved methods, the method
+    tables of behavior classes, etc.) is kept, so it is only done once no matter
+    how many classes use it. When the model changes, `update_classes` keeps what
+    the change did not touch.
     """
-    if cpp_class_name is None:
-        return None
-
-    # Remove the prefixes and post-fixes
-    cpp_class_name = cpp_class_name.strip()
-    if cpp_class_name.startswith("const "):
-        cpp_class_name = cpp_class_name[6:].strip()
-    while cpp_class_name.endswith("*"):
-        cpp_class_name = cpp_class_name[:-1].strip()
-
-    return cpp_class_name
 
+    def __init__(
+        self,
+        all_classes: Iterable[class_info],
+        template_path: Path,
+        package_name: str,
+        index: Optional[type_index] = None,
+        bytecode_cache_dir: Optional[Path] = None,
+        engine: str = "jinja",
+        config_vars: Dict[str, str] = {},
+    ):
+        """Set up the renderer
+
+        Args:
+            all_classes (Iterable[class_info]): All the classes in the package
+            template_path (Path): Location of our templates
+            package_name (str): Name of package for use in import statements
+            index (Optional[type_index]): Lookup tables for `all_classes`. Built
+                here if not given.
+            bytecode_cache_dir (Optional[Path]): Where to keep compiled templates
+                between runs
+            engine (str): `jinja` renders the class template, `fast` builds the
+                same text directly in python (see `emitter`).
+            config_vars (Dict[str, str]): The release config. Only used in the
+                input hashes (see `input_hash`).
+        """
+        if engine not in _g_engines:
+            raise RuntimeError(
+                f"Unknown engine {engine} - choose from {', '.join(_g_engines)}"
+            )
+        self._engine = engine
+
+        env = template_environment(template_path / "files", bytecode_cache_dir)
+        self._env = env
+        self._class_template = env.get_template("object.py")
+
+        # Any change to the templates, the code that renders them, the package
+        # name, or the config changes the input hash of every class
+        h = hashlib.sha256()
+        h.update(source_digest(_g_render_sources).encode())
+        for t in env.list_templates():
+            h.update(f"{t}:".encode())
+            h.update((template_path / "files" / t).read_bytes())
+        h.update(repr((package_name, sorted(config_vars.items()))).encode())
+        self._release_hash = h.hexdigest()
+
+        self._package_name = package_name
+        self._classes = list(all_classes)
+        self._index = index if index is not None else type_index(self._classes)
+
+        # The loader shares identical `method_info`s between classes, so resolve
+        # the types in each one only once (by identity - they are immutable).
+        self._resolved_methods: Dict[int, Dict[str, Any]] = {}
+        self._referenced_enums: Dict[int, List[Tuple[class_info, enum_info]]] = {}
+
+        # The resolved methods of a class, by (class, deref count), shared by every
+        # class that behaves like it.
+        self._method_tables: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+
+        # All the classes a class behaves like, by class
+        self._behavior_closures: Dict[int, List[Tuple[class_info, int]]] = {}
+        self._behavior_in_progress: Set[int] = set()
+
+        # Hashes of each class entry (without its methods), each resolved method
+        # (with the enums it references), and each method table, that go into the
+        # input hashes.
+        self._class_digests: Dict[int, bytes] = {}
+        self._method_digests: Dict[int, bytes] = {}
+        self._table_digests: Dict[Tuple[int, int], bytes] = {}
+
+        # The names each resolved method looked up in the index, and the resolved
+        # methods that looked up each name. Only kept once `update_classes` has
+        # been called.
+        self._method_lookups: Optional[Dict[int, Set[str]]] = None
+        self._lookup_methods: Dict[str, Set[int]] = {}
+
+    def resolve_method(self, m: method_info) -> Dict[str, Any]:
+        """Return the template info for a method, resolving all its types.
+
+        Args:
+            m (method_info): The method
+
+        Returns:
+            Dict[str, Any]: Everything the template needs, except the class name
+        """
+        r = self._resolved_methods.get(id(m), None)
+        if r is None:
+            index = self._index
+            package_name = self._package_name
+            py_return_type = index.py_type_from_cpp(m.return_type)
+            r = {
+                "name": m.name,
+                "cpp_return_type": normalize_cpp_type(m.return_type),
+                "return_type": index.package_qualified(py_return_type, package_name),
+                "return_type_element": normalize_cpp_type(
+                    cpp_collection_element(py_return_type, index.by_python)
+                ),
+                "arguments": [
+                    {
+                        "arg_type": index.package_qualified(a.arg_type, package_name),
+                        "name": a.name,
+                    }
+                    for a in m.arguments
+                ],
+                "param_call_args": m.param_arguments,
+                "param_helper_class": m.param_helper,
+                "param_type_cb": m.param_type_cb,
+            }
+            self._resolved_methods[id(m)] = r
+            if self._method_lookups is not None:
+                self._add_lookups(m, py_return_type)
+        return r
+
+    def _add_lookups(self, m: method_info, py_return_type: str):
+        """Remember the names of the classes resolving `m` looks up in the index:
+        the C++ return type, every python type in the return and argument types,
+        and the classes that could own an enum of each. The resolved method (and
+        the enums it references) can only change if one of these classes does."""
+        base_type = parse_cpp_type(m.return_type).base_type
+        names = {base_type, base_type.rsplit("::", 1)[0]}
+        for t in [py_return_type] + [a.arg_type for a in m.arguments]:
+            if t is None:
+                continue
+            names.add(t.rsplit(".", 1)[0])
+            for name in _g_type_token.findall(t):
+                names.add(name.strip())
+                names.add(name.strip().rsplit(".", 1)[0])
+
+        assert self._method_lookups is not None
+        self._method_lookups[id(m)] = names
+        for name in names:
+            self._lookup_methods.setdefault(name, set()).add(id(m))
+
+    def _forget_method(self, method_id: int):
+        "Drop everything worked out for a method"
+        self._resolved_methods.pop(method_id, None)
+        self._referenced_enums.pop(method_id, None)
+        self._method_digests.pop(method_id, None)
+        assert self._method_lookups is not None
+        for name in self._method_lookups.pop(method_id, set()):
+            self._lookup_methods[name].discard(method_id)
+
+    def update_classes(
+        self,
+        all_classes: Iterable[class_info],
+        index: Optional[type_index],
+        changed: Iterable[class_info],
+    ):
+        """Switch to a new version of the model, keeping everything worked out for
+        the parts of it that did not change.
+
+        Classes that did not change must be the same objects as before. Dropped
+        are the classes that did change, the resolved methods that looked up any
+        of them (by C++ or python name), the method tables of the classes with
+        those methods, and the behavior closures (which are cheap to rebuild).
+
+        Args:
+            all_classes (Iterable[class_info]): All the classes in the new model
+            index (Optional[type_index]): Lookup tables for `all_classes`. Built
+                here if not given.
+            changed (Iterable[class_info]): The classes that were added, removed,
+                or modified - both the old and the new objects.
+        """
+        if self._method_lookups is None:
+            # Work out what the methods resolved so far looked up, against the old
+            # index.
+            self._method_lookups = {}
+            for c in self._classes:
+                for m in c.methods:
+                    if (
+                        id(m) in self._resolved_methods
+                        and id(m) not in self._method_lookups
+                    ):
+                        self._add_lookups(
+                            m, self._index.py_type_from_cpp(m.return_type)
+                        )
 
-def count_pointer_depth(cpp_class_name: Optional[str]) -> int:
-    """Count number of pointer levels in this declaration
+        changed = list(changed)
+        changed_ids = {id(c) for c in changed}
+        changed_names = {n for c in changed for n in (c.name, c.cpp_name)}
+
+        forget_methods = {id(m) for c in changed for m in c.methods}
+        for name in changed_names:
+            forget_methods |= self._lookup_methods.get(name, set())
+        for method_id in forget_methods:
+            self._forget_method(method_id)
+
+        self._classes = list(all_classes)
+        self._index = index if index is not None else type_index(self._classes)
+
+        forget_classes = changed_ids | {
+            id(c)
+            for c in self._classes
+            if any(id(m) in forget_methods for m in c.methods)
+        }
+        for c_id in changed_ids:
+            self._class_digests.pop(c_id, None)
+        for cache in [self._method_tables, self._table_digests]:
+            for key in [k for k in cache if k[0] in forget_classes]:
+                del cache[key]
+        self._behavior_closures.clear()
+
+    def referenced_enums(self, m: method_info) -> List[Tuple[class_info, enum_info]]:
+        """Get referenced enums in a method
+
+        Args:
+            m (method_info): The method to check for referenced enums
+
+        Returns:
+            List[Tuple[class_info, enum_info]]: List of the class and enum that was referenced.
+        """
+        r = self._referenced_enums.get(id(m), None)
+        if r is None:
+            index = self._index
+            r = [
+                e_info
+                for arg in [a.arg_type for a in m.arguments]
+                + [index.py_type_from_cpp(m.return_type)]
+                if (arg is not None) and (e_info := index.lookup_enum(arg)) is not None
+            ]
+            self._referenced_enums[id(m)] = r
+        return r
+
+    def method_table(self, c: class_info, deref_count: int) -> List[Dict[str, Any]]:
+        """Return the template info for all methods of a class.
+
+        Args:
+            c (class_info): The class whose methods we want
+            deref_count (int): Pointer depth to get from the calling class to `c`
+
+        Returns:
+            List[Dict[str, Any]]: Template info for each method, without the name of
+                the class being written out.
+        """
+        key = (id(c), deref_count)
+        r = self._method_tables.get(key, None)
+        if r is None:
+            r = [self.resolve_method(m) for m in c.methods]
+            if deref_count > 0:
+                r = [dict(m, deref_count=deref_count) for m in r]
+            self._method_tables[key] = r
+        return r
 
-    Args:
-        cpp_class_name (Optional[str]): Class name to do counting on.
-        If None, then return zero
+    def behavior_closure(self, c: class_info) -> List[Tuple[class_info, int]]:
+        """Return all the classes `c` behaves like, directly or through the behaviors
+        of those classes, along with the pointer depth needed to reach each one.
 
-    Returns:
-        int: How many pointers
-    """
-    if cpp_class_name is None:
-        return 0
+        A class reached along more than one path is only listed once (the first path
+        wins).
 
-    cpp_class_name = cpp_class_name.strip()
-    count = 0
-    while cpp_class_name.endswith("*"):
-        cpp_class_name = cpp_class_name[:-1].strip()
-        count += 1
-    return count
+        Args:
+            c (class_info): The class
 
+        Returns:
+            List[Tuple[class_info, int]]: The behavior classes and deref counts
+        """
+        r = self._behavior_closures.get(id(c), None)
+        if r is not None:
+            return r
 
-def normalize_cpp_type(cpp_class_name: Optional[str]) -> Optional[str]:
-    """Normalize a C++ type for lookup (remove
-    extra spaces, etc.))
+        if id(c) in self._behavior_in_progress:
+            raise RuntimeError(f"Class {c.name} behaves like itself")
+        self._behavior_in_progress.add(id(c))
 
-    Args:
-        cpp_class_name (str): The C++ class name
+        r = []
+        seen = {id(c)}
+        for b in c.behaviors:
+            b_type = parse_cpp_type(b)
+            name = b_type.base_type
+            if name not in self._index.by_cpp:
+                raise RuntimeError(f"Unknown behavior class {name} for class {c.name}")
+            b_class = self._index.by_cpp[name]
+            for t_class, t_depth in [(b_class, 0)] + self.behavior_closure(b_class):
+                if id(t_class) not in seen:
+                    seen.add(id(t_class))
+                    r.append((t_class, b_type.pointer_depth + t_depth))
+
+        self._behavior_in_progress.remove(id(c))
+        self._behavior_closures[id(c)] = r
+        return r
+
+    def _method_view(
+        self,
+        m: Dict[str, Any],
+        fully_qualified_name: str,
+        ns_stem: str,
+        callback_context: Dict[str, Any],
+    ) -> method_view:
+        "Build the view of a resolved method (see `resolve_method`) for a class"
+        metadata = [
+            "'metadata_type': 'add_method_type_info',",
+            f"'type_string': '{fully_qualified_name}',",
+            f"'method_name': '{m['name']}',",
+        ]
+        if m["return_type_element"]:
+            metadata += [
+                f"'return_type_element': '{m['return_type_element']}',",
+                f"'return_type_collection': '{m['cpp_return_type']}',",
+            ]
+        else:
+            metadata.append(f"'return_type': '{m['cpp_return_type']}',")
+        deref_count = m.get("deref_count", 0)
+        if deref_count:
+            metadata.append(f"'deref_count': {deref_count}")
+
+        is_parameterized = len(m["param_call_args"]) > 0
+        return method_view(
+            name=m["name"],
+            return_type=m["return_type"],
+            arguments=[
+                argument_view(a["name"], remove_ns_stem(ns_stem, a["arg_type"]))
+                for a in m["arguments"]
+            ],
+            metadata=metadata,
+            is_parameterized=is_parameterized,
+            param_type_cb=(
+                _compile_subtemplate(self._env, m["param_type_cb"]).render(
+                    **callback_context
+                )
+                if is_parameterized and m["param_type_cb"] is not None
+                else None
+            ),
+            param_helper_class=m["param_helper_class"],
+        )
 
-    Returns:
-        str: The normalized C++ class name
-    """
-    if cpp_class_name is None:
-        return None
+    def _bases(self, c: class_info) -> str:
+        "The classes the python class for `c` inherits from"
+        index = self._index
+        if c.python_container_type is not None:
+            if (c.python_container_type in index.python_names) or (
+                c.python_container_type in _g_py_single_types
+            ):
+                return f"(Iterable[{index.package_qualified(c.python_container_type, self._package_name)}])"  # NOQA
+        return ""
 
-    result = cpp_class_name
+    def view(self, c: class_info) -> class_view:
+        """Return the view model for a class: everything the class module needs,
+        with all the types resolved and the callbacks rendered. The class
+        template (and `emitter`) only write it out.
 
-    def replace_till_done(s: str, old: str, new: str) -> str:
-        while True:
-            n_result = s.replace(old, new)
-            if n_result == s:
-                break
-            s = n_result
-        return s
+        Args:
+            c (class_info): The class
 
-    result = replace_till_done(result, "  ", " ")
-    result = replace_till_done(result, "> >", ">>")
-    result = replace_till_done(result, "< <", "<<")
+        Returns:
+            class_view: The view model
+        """
+        package_name = self._package_name
+        c_ns, c_name = class_split_namespace(c.name)
 
-    return result
+        # Methods from this class, and then from the behavior as classes
+        tables = [self.method_table(c, 0)]
+        all_includes = [c.include_file] if c.include_file != "" else []
+        all_libraries = [c.library] if c.library is not None else []
+        for b_class, deref_count in self.behavior_closure(c):
+            tables.append(self.method_table(b_class, deref_count))
+            if b_class.include_file != "":
+                all_includes.append(b_class.include_file)
+            if b_class.library is not None:
+                all_libraries.append(b_class.library)
 
+        # The enums the methods of this class reference, by method name.
+        referenced_enums = {
+            m.name: [enum_view(e_c.name, e.name, e.values) for e_c, e in e_info_list]
+            for m in c.methods
+            if m.return_type is not None
+            and len(e_info_list := self.referenced_enums(m)) > 0
+        }
+
+        fully_qualified_name = normalize_cpp_type(c.cpp_name)
+        ns_stem = f"{package_name}.{c_name.lower()}"
+        # The only variables the method callbacks can use - so they depend on
+        # nothing but the class and the package (see `input_hash`).
+        callback_context = dict(
+            package_name=package_name,
+            class_name=c_name,
+            full_class_name=c.name,
+            cpp_as_py_namespace=c_ns,
+        )
+        return class_view(
+            class_name=c_name,
+            full_class_name=c.name,
+            package_name=package_name,
+            cpp_as_py_namespace=c_ns,
+            bases=self._bases(c),
+            include_files=all_includes,
+            libraries=all_libraries,
+            methods=[
+                self._method_view(m, fully_qualified_name, ns_stem, callback_context)
+                for table in tables
+                for m in table
+            ],
+            referenced_enums=referenced_enums,
+            enums=[enum_view(c.name, e.name, e.values) for e in c.enums],
+        )
 
-def py_type_from_cpp(
-    cpp_class_name: Optional[str], cpp_class_dict: Dict[str, class_info]
-) -> str:
-    """Return the Python equivalent type for a C++ class type.
+    def render(self, c: class_info) -> str:
+        """Render the python file for a class
+
+        Args:
+            c (class_info): The class to render
+
+        Returns:
+            str: The text of the file
+        """
+        return self.render_view(self.view(c))
+
+    def render_view(self, v: class_view) -> str:
+        "Render the python file for a class from its view model (see `view`)"
+        if self._engine == "fast":
+            return emit_class_module(v)
+        return self._class_template.render(vars(v))
+
+    def _class_digest(self, c: class_info) -> bytes:
+        """Hash of a class entry, as it was loaded from the type file. The methods
+        are left out - they are hashed once they are resolved (`_method_digest`)."""
+        r = self._class_digests.get(id(c), None)
+        if r is None:
+            entry = [getattr(c, f.name) for f in fields(c) if f.name != "methods"]
+            r = hashlib.sha256(repr(entry).encode()).digest()
+            self._class_digests[id(c)] = r
+        return r
+
+    def _method_digest(self, m: method_info) -> bytes:
+        "Hash of a resolved method (see `resolve_method`) and the enums it references"
+        r = self._method_digests.get(id(m), None)
+        if r is None:
+            enums = [(e_c.name, e) for e_c, e in self.referenced_enums(m)]
+            r = hashlib.sha256(repr((self.resolve_method(m), enums)).encode()).digest()
+            self._method_digests[id(m)] = r
+        return r
+
+    def _table_digest(self, c: class_info, deref_count: int) -> bytes:
+        "Hash of a class entry and its method table (see `method_table`)"
+        key = (id(c), deref_count)
+        r = self._table_digests.get(key, None)
+        if r is None:
+            h = hashlib.sha256(self._class_digest(c))
+            h.update(str(deref_count).encode())
+            for m in c.methods:
+                h.update(self._method_digest(m))
+            r = h.digest()
+            self._table_digests[key] = r
+        return r
+
+    def input_hash(self, c: class_info) -> str:
+        """Return a hash of everything that goes into the python file for a class:
+        the class, the classes it behaves like, the types its methods resolve to
+        (which covers the names of the other classes), the enums it references,
+        the config, and the templates.
+
+        This is worked out from the loaded classes, without building the view,
+        and each part is only hashed once, no matter how many classes use it. If
+        this hash has not changed, the rendered file will not have either.
+
+        Args:
+            c (class_info): The class
+
+        Returns:
+            str: Hex digest
+        """
+        h = hashlib.sha256(self._release_hash.encode())
+        h.update(self._bases(c).encode())
+        h.update(self._table_digest(c, 0))
+        for b_class, deref_count in self.behavior_closure(c):
+            h.update(self._table_digest(b_class, deref_count))
+        return h.hexdigest()
+
+
+# The models each rendering worker process can render, by key, and the renderers
+# built for them so far.
+_g_worker_models: Dict[str, Tuple[Any, ...]] = {}
+_g_worker_renderers: Dict[str, Tuple[List[class_info], class_renderer]] = {}
+
+
+def _init_render_worker(models: Dict[str, Tuple[Any, ...]]):
+    "Set up a worker process to render classes"
+    global _g_worker_models
+    _g_worker_models = models
+    _g_worker_renderers.clear()
+
+
+def _render_class_file(work: Tuple[str, Path, int]) -> Tuple[bool, float]:
+    """Render and write one class file in a worker process. Returns True if it was
+    written, and the seconds it took to render."""
+    key, class_file, class_index = work
+    if key not in _g_worker_renderers:
+        all_classes, *renderer_args = _g_worker_models[key]
+        _g_worker_renderers[key] = (
+            all_classes,
+            class_renderer(all_classes, *renderer_args),
+        )
+    all_classes, renderer = _g_worker_renderers[key]
+    start = time.perf_counter()
+    text = renderer.render(all_classes[class_index])
+    render_time = time.perf_counter() - start
+    return write_if_changed(class_file, as_lines(text)), render_time
 
-    Will raise an exception if it can't find the mapping.
 
-    Args:
-        cpp_class_name (str): The C++ class name
-        cpp_class_dict (Dict[str, class_info]): Dict of all classes, indexed by C++ name
+class render_pool:
+    """Worker processes that render and write class files, for one or more models
+    (releases).
 
-    Returns:
-        str: The python class name
+    Every model must be added before the workers start. They are forked where we
+    can, so they share the classes and index copy-on-write rather than pickling
+    them. Once started, classes from any of the models can be rendered from any
+    thread.
     """
-    cpp_class_name = clean_cpp_type(cpp_class_name)
-    if cpp_class_name is None:
-        raise RuntimeError("C++ class name is None")
 
-    py_type = cpp_class_dict.get(cpp_class_name, None)
-    if py_type is not None:
-        return py_type.name
+    def __init__(self, jobs: int):
+        self.jobs = jobs
+        self._models: Dict[str, Tuple[Any, ...]] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def add_model(
+        self,
+        key: str,
+        all_classes: List[class_info],
+        template_path: Path,
+        package_name: str,
+        index: Optional[type_index] = None,
+        bytecode_cache_dir: Optional[Path] = None,
+        engine: str = "jinja",
+    ):
+        """Add a model the workers can render classes from.
+
+        Args:
+            key (str): The name to render the model's classes by
+            all_classes (List[class_info]): All the classes in the model
+            template_path (Path): Location of our templates
+            package_name (str): Name of the package the classes are written to
+            index (Optional[type_index]): Lookup tables for `all_classes`. Each
+                worker builds its own if not given.
+            bytecode_cache_dir (Optional[Path]): Where to keep compiled templates
+            engine (str): How to write the class files
+        """
+        if self._executor is not None:
+            raise RuntimeError(
+                f"Model {key} cannot be added after the render workers have started"
+            )
+        self._models[key] = (
+            all_classes,
+            template_path,
+            package_name,
+            index,
+            bytecode_cache_dir,
+            engine,
+        )
 
-    py_type = _g_cpp_to_py_type_map.get(cpp_class_name, None)
-    if py_type is not None:
-        return py_type
+    def start(self):
+        """Start the workers. This is done by the first `render` if not called, but
+        as the workers are forked it is safest to start them before any other
+        threads are running."""
+        if self._executor is not None:
+            return
+        context = (
+            multiprocessing.get_context("fork")
+            if "fork" in multiprocessing.get_all_start_methods()
+            else None
+        )
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.jobs,
+            mp_context=context,
+            initializer=_init_render_worker,
+            initargs=(self._models,),
+        )
+        # Workers are only launched once there is work for them
+        self._executor.submit(int).result()
+
+    def render(
+        self, key: str, work: Dict[Path, int]
+    ) -> Iterable[Tuple[Path, int, bool, float]]:
+        """Render and write class files.
+
+        Args:
+            key (str): The model the classes are from
+            work (Dict[Path, int]): The index (into the model's classes) of the
+                class to write into each file
+
+        Returns:
+            Iterable[Tuple[Path, int, bool, float]]: For each file, in order, the
+                file, the class index, if it was written, and the seconds it took
+                to render.
+        """
+        if key not in self._models:
+            raise RuntimeError(f"Model {key} was not added to the render workers")
+        self.start()
+        assert self._executor is not None
+        written = self._executor.map(
+            _render_class_file,
+            [(key, class_file, i) for class_file, i in work.items()],
+            chunksize=max(1, len(work) // (self.jobs * 4)),
+        )
+        for (class_file, i), (w, render_time) in zip(work.items(), written):
+            yield class_file, i, w, render_time
 
-    if len(cpp_class_name) == 1:
-        return cpp_class_name
+    def close(self):
+        "Stop the workers"
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
 
-    # Last resort, it is an enum. We need to strip the last name off, see if we can do the lookup.
-    # If so, check for the enum in the class.
-    split_result = cpp_class_name.rsplit("::", 1)
-    if len(split_result) == 2:
-        enum_ns, enum_name = split_result
-        py_type = cpp_class_dict.get(enum_ns, None)
-        if py_type is not None:
-            for e in py_type.enums:
-                if e.name == enum_name:
-                    return f"{py_type.name}.{e.name}"
+    def __enter__(self) -> "render_pool":
+        return self
 
-    raise RuntimeError(f"Unknown C++ type {cpp_class_name}")
+    def __exit__(self, *args):
+        self.close()
 
 
 def write_out_classes(
@@ -293,7 +949,18 @@ def write_out_classes(
     release_series: str,
     base_init_lines: List[str] = [],
     config_vars: Dict[str, str] = {},
-):
+    index: Optional[type_index] = None,
+    jobs: int = 1,
+    writer: Optional[output_writer] = None,
+    previous_hashes: Optional[Dict[str, str]] = None,
+    bytecode_cache_dir: Optional[Path] = None,
+    engine: str = "jinja",
+    timings: Optional[phase_timings] = None,
+    on_class_rendered: Optional[render_hook] = None,
+    pool: Optional[render_pool] = None,
+    pool_key: str = "",
+    renderer: Optional[class_renderer] = None,
+) -> Dict[str, str]:
     """Write out the templates for all classes
 
     This means correctly dealing with any namespace information here as well.
@@ -305,18 +972,51 @@ def write_out_classes(
             (top level __init__.py file location)
         project_name (str): Name of package for use in import statements
         dataset_types (List[str]): Which release is this (22, or 21, etc.)
+        index (Optional[type_index]): Lookup tables for `all_classes` (the loader
+            builds one). Built here if not given.
+        jobs (int): Number of worker processes to render the classes with. The
+            output is the same no matter how many are used. The workers build the
+            view of each class they render - this process only hashes the inputs.
+        writer (Optional[output_writer]): Writes the files. If not given, files are
+            written into `project_src_path` without removing anything.
+        previous_hashes (Optional[Dict[str, str]]): The input hashes returned by a
+            previous run into the same directory. Classes whose inputs have not
+            changed are not rendered again.
+        bytecode_cache_dir (Optional[Path]): Where to keep compiled templates
+            between runs
+        engine (str): How to write the class files: `jinja` (the template) or
+            `fast` (same output, built directly in python).
+        timings (Optional[phase_timings]): Filled with the time spent resolving the
+            classes (`index`), rendering them (`class_render`), writing them
+            (`write`), and writing the `__init__` files (`init`). With more than
+            one job the workers write the files, so that is part of `class_render`.
+        on_class_rendered (Optional[render_hook]): Called with the name of each
+            class that is rendered, and the seconds it took (building its view and
+            rendering the text).
+        pool (Optional[render_pool]): Workers to render the classes with, shared
+            with other models. `all_classes` must have been added to it as
+            `pool_key`. If not given, `jobs` workers are started just for this.
+        pool_key (str): The name `all_classes` were added to `pool` under
+        renderer (Optional[class_renderer]): The renderer to use, set up for
+            `all_classes` (see `class_renderer.update_classes`), so what it has
+            already worked out is not done again. Built here if not given.
+
+    Returns:
+        Dict[str, str]: The input hash of each class file, by path relative to
+            `project_src_path`.
     """
     # Load up the template structure and environment
-    loader = jinja2.FileSystemLoader(str(template_path / "files"))
-    env = jinja2.Environment(loader=loader)
-    prep_jinja2_env(env)
-
-    class_template_file = env.get_template("object.py")
+    env = template_environment(template_path / "files", bytecode_cache_dir)
     init_template_file = env.get_template("__init__.py")
+    timings = timings if timings is not None else phase_timings()
 
-    all_classes_names = {c.name for c in all_classes}
-    py_all_classes_dict = {c.name: c for c in all_classes}
-    cpp_all_classes_dict = {c.cpp_name: c for c in all_classes}
+    all_classes = list(all_classes)
+    index = index if index is not None else type_index(all_classes)
+    writer = (
+        writer
+        if writer is not None
+        else output_writer(project_src_path, incremental=True)
+    )
 
     # We need to do two passes. This is because the __init__ template. First pass
     # we write out the classes and accumulate information, and the second pass we just
@@ -325,7 +1025,11 @@ def write_out_classes(
     class_load_info: Dict[Path, Tuple[str, List[str]]] = {}
     sub_module_load_info: Dict[Path, Set[str]] = {}
 
-    for c in all_classes:
+    # The class to write into each file, as an index into `all_classes`. If a type
+    # file lists a class more than once, the last one wins.
+    class_files: Dict[Path, int] = {}
+
+    for i, c in enumerate(all_classes):
         # We do not write out aliases...
         if c.is_alias:
             continue
@@ -334,6 +1038,8 @@ def write_out_classes(
         c_ns, c_name = class_split_namespace(c.name)
         class_file = project_src_path / class_ns_as_path(c_ns) / f"{c_name.lower()}.py"
         class_file.parent.mkdir(parents=True, exist_ok=True)
+        class_files.pop(class_file, None)
+        class_files[class_file] = i
 
         # Gather info for the __init__ file: classes and sub-modules
         if class_file.parent not in class_load_info:
@@ -351,179 +1057,86 @@ def write_out_classes(
             ns_name = dir_path.name
             dir_path = dir_path.parent
 
-        # Get the imports we need at the top of the file
-        import_statements = []
-        if c.python_container_type is not None:
-            import_statements.append("from typing import Iterable")
-
-        # Add all the objects this needs to inherit from
-        inheritance_list: List[str] = []
-        if c.python_container_type is not None:
-            if (c.python_container_type in all_classes_names) or (
-                c.python_container_type in _g_py_single_types
+    # Work out which classes need to be rendered: skip any whose inputs are the same
+    # as last time (and whose file is still there).
+    input_hashes: Dict[str, str] = {}
+    to_render: Dict[Path, int] = {}
+    with timings.phase("index"):
+        if renderer is None:
+            renderer = class_renderer(
+                all_classes,
+                template_path,
+                package_name,
+                index,
+                bytecode_cache_dir,
+                engine,
+                config_vars,
+            )
+        for class_file, i in class_files.items():
+            key = class_file.relative_to(project_src_path).as_posix()
+            input_hashes[key] = renderer.input_hash(all_classes[i])
+            if (
+                previous_hashes is not None
+                and previous_hashes.get(key, None) == input_hashes[key]
+                and class_file.exists()
             ):
-                inheritance_list.append(
-                    f"Iterable[{package_qualified_class(c.python_container_type, package_name, all_classes_names)}]"  # NOQA
-                )
-
-        # Methods from this class
-        def generate_methods(methods: List[method_info], deref_count: int = 0):
-            r = [
-                {
-                    "fully_qualified_name": normalize_cpp_type(c.cpp_name),
-                    "name": m.name,
-                    "cpp_return_type": normalize_cpp_type(m.return_type),
-                    "return_type": package_qualified_class(
-                        py_type_from_cpp(m.return_type, cpp_all_classes_dict),
-                        package_name,
-                        all_classes_names,
-                    ),
-                    "return_type_element": normalize_cpp_type(
-                        cpp_collection_element(
-                            py_type_from_cpp(m.return_type, cpp_all_classes_dict),
-                            py_all_classes_dict,
-                        )
-                    ),
-                    "arguments": [
-                        {
-                            "arg_type": package_qualified_class(
-                                a.arg_type, package_name, all_classes_names
-                            ),
-                            "name": a.name,
-                        }
-                        for a in m.arguments
-                    ],
-                    "param_call_args": m.param_arguments,
-                    "param_helper_class": m.param_helper,
-                    "param_type_cb": m.param_type_cb,
-                }
-                for m in methods
-            ]
-
-            if deref_count > 0:
-                for m in r:
-                    m["deref_count"] = deref_count
-
-            return r
-
-        def lookup_enum(arg: str) -> Optional[Tuple[class_info, enum_info]]:
-            """Return the enum info for the argument if it is an enum.
-
-            Args:
-                arg (method_info): The argument to check (python type)
-
-            Returns:
-                Optional[enum_info]: The enum info if this is an enum, or None
-            """
-            # Split into namespace and enum type.
-            type_info = arg.rsplit(".", 1)
-            if len(type_info) != 2:
-                return None
-            enum_ns, enum_name = type_info
-
-            if (enum_ns_class := py_all_classes_dict.get(enum_ns, None)) is not None:
-                for e in enum_ns_class.enums:
-                    if e.name == enum_name:
-                        return enum_ns_class, e
-
-            return None
-
-        def get_referenced_enums(m: method_info) -> List[Tuple[class_info, enum_info]]:
-            """Get referenced enums in a method
-
-            Args:
-                m (method_info): The method to check for referenced enums
-
-            Returns:
-                List[Tuple[class_info, enum_info]]: List of the class and enum that was referenced.
-            """
-            return [
-                e_info
-                for arg in [a.arg_type for a in m.arguments]
-                + [py_type_from_cpp(m.return_type, cpp_all_classes_dict)]
-                if (arg is not None) and (e_info := lookup_enum(arg)) is not None
-            ]
-
-        def generate_enums(
-            method_list: List[method_info],
-        ) -> Dict[str, List[Tuple[class_info, enum_info]]]:
-            """Return a list of the referenced enum definitions for this call.
-
-            Args:
-                method_list (List[method_info]): List of the methods that we need to look at
-
-            Raises:
-                RuntimeError: _description_
-
-            Returns:
-                Dict[str, Dict[str, Any]]: List, by method name, of all enums referenced.
-            """
-            result = {
-                m.name: e_info_list
-                for m in method_list
-                if m.return_type is not None
-                and len(e_info_list := get_referenced_enums(m)) > 0
-            }
-            return result
-
-        methods = generate_methods(c.methods)
-        referenced_enums = generate_enums(c.methods)
-
-        # Methods from behavior as classes
-        all_includes = [c.include_file] if c.include_file != "" else []
-        all_libraries = [c.library] if c.library is not None else []
-        for b in c.behaviors:
-            name = clean_cpp_type(b)
-            assert name is not None
-            if name not in cpp_all_classes_dict:
-                raise RuntimeError(f"Unknown behavior class {name} for class {c.name}")
-            methods += generate_methods(
-                cpp_all_classes_dict[name].methods, count_pointer_depth(b)
+                writer.record(class_file, False)
+            else:
+                to_render[class_file] = i
+    logging.info(f"Rendering {len(to_render)} of {len(class_files)} classes")
+    timings.count("classes", len(class_files))
+    timings.count("classes_rendered", len(to_render))
+
+    # Write out the object files
+    if (jobs <= 1 and pool is None) or len(to_render) < 2:
+        for class_file, i in to_render.items():
+            with timings.phase("class_render"):
+                start = time.perf_counter()
+                text = renderer.render(all_classes[i])
+                render_time = time.perf_counter() - start
+            if on_class_rendered is not None:
+                on_class_rendered(all_classes[i].name, render_time)
+            with timings.phase("write"):
+                writer.write_lines(class_file, text)
+    else:
+        own_pool = pool is None
+        if pool is None:
+            pool = render_pool(jobs)
+            pool.add_model(
+                pool_key,
+                all_classes,
+                template_path,
+                package_name,
+                index,
+                bytecode_cache_dir,
+                engine,
             )
-            b_class = cpp_all_classes_dict[name]
-            if b_class.include_file != "":
-                all_includes.append(b_class.include_file)
-            if b_class.library is not None:
-                all_libraries.append(b_class.library)
-
-        # Write out the object file
-        text = class_template_file.render(
-            class_name=c_name,
-            full_class_name=c.name,
-            methods=c.methods,
-            include_files=all_includes,
-            import_statements=import_statements,
-            class_split_namespace=class_split_namespace,
-            remove_ns_stem=remove_ns_stem,
-            ns_stem=f"{package_name}.{c_name.lower()}",
-            inheritance_list=inheritance_list,
-            methods_info=methods,
-            package_name=package_name,
-            enums_info=c.enums,
-            referenced_enums=referenced_enums,
-            libraries=all_libraries,
-            cpp_as_py_namespace=c_ns,
-        )
-
-        with class_file.open("wt") as out:
-            for line in text.splitlines():
-                out.write(line)
-                out.write("\n")
+        with timings.phase("class_render"):
+            try:
+                for class_file, i, w, render_time in pool.render(pool_key, to_render):
+                    writer.record(class_file, w)
+                    if on_class_rendered is not None:
+                        on_class_rendered(all_classes[i].name, render_time)
+            finally:
+                # The CPU time of the workers is only counted once they exit
+                if own_pool:
+                    pool.close()
 
     # Write out the __init__ files
-    init_paths = set(class_load_info.keys()) | set(sub_module_load_info.keys())
-    for p in init_paths:
-        c_imports = []
-        m_stub = ""
-        if p in class_load_info:
-            m_stub, c_imports = class_load_info[p]
-
-        sub_ns = []
-        if p in sub_module_load_info:
-            sub_ns = sub_module_load_info[p]
-
-        with (p / "__init__.py").open("wt") as out:
-            out.write(
+    with timings.phase("init"):
+        init_paths = set(class_load_info.keys()) | set(sub_module_load_info.keys())
+        for p in sorted(init_paths):
+            c_imports = []
+            m_stub = ""
+            if p in class_load_info:
+                m_stub, c_imports = class_load_info[p]
+
+            sub_ns = []
+            if p in sub_module_load_info:
+                sub_ns = sorted(sub_module_load_info[p])
+
+            writer.write(
+                p / "__init__.py",
                 init_template_file.render(
                     class_imports=c_imports,
                     module_stub=m_stub,
@@ -533,6 +1146,7 @@ def write_out_classes(
                     release_series=release_series,
                     base_init_lines=base_init_lines,
                     base_variables=[config_info(k, v) for k, v in config_vars.items()],
-                )
+                ),
             )
-            # out.write("\n")  # Get around whitespace trimming
+
+    return input_hashes
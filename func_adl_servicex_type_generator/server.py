@@ -0,0 +1,218 @@
+import logging
+import os
+import socket
+import socketserver
+from collections import OrderedDict
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from func_adl_servicex_type_generator.client import read_message, write_message
+from func_adl_servicex_type_generator.generator import (
+    _g_template_path,
+    _count_subrender_cache,
+    _load_release,
+    _prepare_release,
+    _write_releases,
+)
+from func_adl_servicex_type_generator.loader import LoadedData
+from func_adl_servicex_type_generator.model_cache import model_cache_key
+from func_adl_servicex_type_generator.package import (
+    reset_template_environments,
+    subrender_cache_info,
+    template_environment,
+)
+from func_adl_servicex_type_generator.timings import phase_timings
+from func_adl_servicex_type_generator.watch import file_states
+
+# Number of loaded models the server keeps in memory
+default_max_models = 8
+
+
+class generation_server:
+    """Generates packages on request, keeping the loaded models (by the hash of
+    their type files) and the compiled templates in memory between requests.
+
+    If the templates are edited while the server is running, they are loaded
+    again before the next request.
+    """
+
+    def __init__(
+        self,
+        model_cache_dir: Optional[Path] = None,
+        template_cache_dir: Optional[Path] = None,
+        max_models: int = default_max_models,
+        template_path: Path = _g_template_path,
+    ):
+        """Set up the server, and compile the templates.
+
+        Args:
+            model_cache_dir (Optional[Path]): Where to cache loaded models on disk
+                as well, or None to only keep them in memory
+            template_cache_dir (Optional[Path]): Where to cache the compiled
+                templates
+            max_models (int): Number of models to keep in memory. The least
+                recently used are dropped first.
+            template_path (Path): The template directory
+        """
+        self._model_cache_dir = model_cache_dir
+        self._template_cache_dir = template_cache_dir
+        self._max_models = max_models
+        self._template_path = template_path
+        self._models: "OrderedDict[str, LoadedData]" = OrderedDict()
+
+        self._template_states = file_states([template_path])
+        for d in ["files", "package"]:
+            template_environment(template_path / d, template_cache_dir)
+
+    def model(
+        self, type_file: Path, yaml_backend: str, jobs: Optional[int]
+    ) -> LoadedData:
+        "The model for a type file, loading it if it isn't in memory"
+        key = model_cache_key(type_file)
+        if key in self._models:
+            self._models.move_to_end(key)
+            return self._models[key]
+
+        data = _load_release(type_file, yaml_backend, self._model_cache_dir, jobs)
+        self._models[key] = data
+        while len(self._models) > self._max_models:
+            self._models.popitem(last=False)
+        return data
+
+    def _check_templates(self):
+        "Load the templates again if they have changed"
+        states = file_states([self._template_path])
+        if states != self._template_states:
+            logging.info("Templates have changed - loading them again")
+            reset_template_environments()
+            self._template_states = states
+
+    def generate(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate the packages in a `generate` request (see
+        `client.generate_request`).
+
+        Returns:
+            Dict[str, Any]: What happened to the files in each output directory,
+                and the timings.
+        """
+        self._check_templates()
+        jobs = request.get("jobs", None)
+        n_jobs = jobs if jobs is not None else (os.cpu_count() or 1)
+        cwd = Path(request["cwd"])
+
+        timings = phase_timings()
+        subrender_before = subrender_cache_info()
+        packages = []
+        for type_file, output_directory in request["releases"]:
+            release_timings = phase_timings()
+            with timings.phase("load"), release_timings.phase("load"):
+                data = self.model(
+                    Path(type_file), request.get("yaml_backend", "auto"), jobs
+                )
+            r = _prepare_release(
+                data,
+                request["version"],
+                Path(output_directory) if output_directory is not None else None,
+            )
+            # The default output directory is relative to the client
+            r = replace(r, output_path=cwd / r.output_path)
+            if str(r.output_path) in timings.releases:
+                raise RuntimeError(f"Two releases are being written to {r.output_path}")
+            timings.releases[str(r.output_path)] = release_timings
+            packages.append(r)
+
+        all_stats = _write_releases(
+            packages,
+            self._template_cache_dir,
+            n_jobs,
+            request.get("incremental", False),
+            request.get("engine", "jinja"),
+            timings,
+            None,
+            template_path=self._template_path,
+        )
+        _count_subrender_cache(timings, subrender_before)
+        return {
+            "stats": [
+                {
+                    "output_directory": str(r.output_path),
+                    "written": s.written,
+                    "unchanged": s.unchanged,
+                    "deleted": s.deleted,
+                }
+                for r, s in zip(packages, all_stats)
+            ],
+            "timings": timings.as_dict(),
+        }
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer a request. `command` says what to do:
+
+        - `generate`: generate packages (see `generate`)
+        - `status`: how many models are in memory, and the server's process id
+
+        Any error is returned in `error`, with `ok` set to False.
+        """
+        try:
+            command = request.get("command", None)
+            if command == "generate":
+                response = self.generate(request)
+            elif command == "status":
+                response = {"models": len(self._models), "pid": os.getpid()}
+            else:
+                raise RuntimeError(f"Unknown server command {command}")
+            response["ok"] = True
+            return response
+        except Exception as e:
+            logging.exception("Request failed")
+            return {"ok": False, "error": str(e)}
+
+
+class _request_handler(socketserver.StreamRequestHandler):
+    "Answers each request on a connection from a client"
+
+    def handle(self):
+        server = self.server
+        assert isinstance(server, _unix_server)
+        while True:
+            request = read_message(self.rfile)
+            if request is None:
+                return
+            write_message(self.wfile, server.generator.handle(request))
+
+
+class _unix_server(socketserver.UnixStreamServer):
+    "Handles one client at a time, so the forked render workers see no threads"
+
+    def __init__(self, socket_path: Path, generator: generation_server):
+        self.generator = generator
+        super().__init__(str(socket_path), _request_handler)
+
+
+def serve(socket_path: Path, generator: generation_server):
+    """Listen for requests on a Unix socket until interrupted.
+
+    A socket file left behind by a server that is no longer running is removed.
+    Only the user running the server can connect to it.
+
+    Args:
+        socket_path (Path): Where to make the socket
+        generator (generation_server): Answers the requests
+    """
+    if socket_path.exists():
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            if s.connect_ex(str(socket_path)) == 0:
+                raise RuntimeError(f"A server is already listening on {socket_path}")
+        socket_path.unlink()
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    old_umask = os.umask(0o177)
+    try:
+        server = _unix_server(socket_path, generator)
+    finally:
+        os.umask(old_umask)
+    try:
+        with server:
+            server.serve_forever()
+    finally:
+        socket_path.unlink(missing_ok=True)
@@ -0,0 +1,102 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator
+
+# The phases of a generation, in the order they run
+_g_phases = [
+    "load",
+    "scaffolding",
+    "index",
+    "class_render",
+    "write",
+    "init",
+    "releases",
+]
+
+# Called with the python name of a class and the seconds it took to render
+render_hook = Callable[[str, float], None]
+
+
+def cpu_time() -> float:
+    "CPU time used by this process, and by any child processes that have finished"
+    children = os.times()
+    return time.process_time() + children.children_user + children.children_system
+
+
+@dataclass
+class phase_time:
+    "Time spent in one phase"
+
+    # Elapsed seconds
+    wall: float = 0.0
+
+    # CPU seconds (including worker processes)
+    cpu: float = 0.0
+
+
+class phase_timings:
+    """Wall and CPU time spent in each phase of a generation, along with some
+    counters (number of classes rendered, etc.).
+
+    A phase can be entered any number of times, and the times add up. This lets
+    the per-class render and write steps, which alternate, be timed separately.
+
+    When several releases are generated together each gets its own timings (see
+    `release`). They run at the same time, so their CPU times overlap.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, phase_time] = {}
+        self.counters: Dict[str, int] = {}
+        self.releases: Dict[str, "phase_timings"] = {}
+
+    def release(self, name: str) -> "phase_timings":
+        "The timings for release `name`, when generating several at once"
+        return self.releases.setdefault(name, phase_timings())
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        "Time the body of the `with` statement as part of phase `name`"
+        wall_start = time.perf_counter()
+        cpu_start = cpu_time()
+        try:
+            yield
+        finally:
+            t = self.phases.setdefault(name, phase_time())
+            t.wall += time.perf_counter() - wall_start
+            t.cpu += cpu_time() - cpu_start
+
+    def count(self, name: str, n: int = 1):
+        "Add `n` to the counter `name`"
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the timings, ready to be dumped as JSON.
+
+        The known phases come first, in the order they run, followed by any
+        others. Phases that never ran are left out.
+        """
+        names = [p for p in _g_phases if p in self.phases] + [
+            p for p in self.phases if p not in _g_phases
+        ]
+        result: Dict[str, Any] = {
+            "phases": {
+                p: {"wall": self.phases[p].wall, "cpu": self.phases[p].cpu}
+                for p in names
+            },
+            "total": {
+                "wall": sum(t.wall for t in self.phases.values()),
+                "cpu": sum(t.cpu for t in self.phases.values()),
+            },
+            "counters": dict(self.counters),
+        }
+        if len(self.releases) > 0:
+            result["releases"] = {n: t.as_dict() for n, t in self.releases.items()}
+        return result
+
+    def as_json(self) -> str:
+        "The timings as a JSON document"
+        return json.dumps(self.as_dict(), indent=2)
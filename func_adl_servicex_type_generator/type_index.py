@@ -0,0 +1,151 @@
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from func_adl_servicex_type_generator.class_utils import package_qualified_class
+from func_adl_servicex_type_generator.cpp_types import (
+    _g_cpp_to_py_type_map,
+    parse_cpp_type,
+)
+from func_adl_servicex_type_generator.data_model import class_info, enum_info
+
+
+class type_index:
+    """Lookup tables for all the classes in a type file.
+
+    This is built once, by the loader, and used for every type resolution while
+    the package is written out. Resolved types are remembered, so each distinct
+    type string is only worked out once.
+
+    If a name appears more than once, the last class with that name wins, just
+    like building a dictionary from the class list.
+    """
+
+    def __init__(self, classes: Iterable[class_info]):
+        # python name -> class
+        self.by_python: Dict[str, class_info] = {}
+
+        # C++ name -> class
+        self.by_cpp: Dict[str, class_info] = {}
+
+        for c in classes:
+            self.by_python[c.name] = c
+            self.by_cpp[c.cpp_name] = c
+
+        # All the python class names
+        self.python_names: Set[str] = set(self.by_python.keys())
+
+        # (owning class python name, enum name) -> (owning class, enum)
+        self.enums: Dict[Tuple[str, str], Tuple[class_info, enum_info]] = {}
+        for c in self.by_python.values():
+            for e in c.enums:
+                self.enums.setdefault((c.name, e.name), (c, e))
+
+        # Resolved C++ type -> python type
+        self._py_types: Dict[str, str] = {}
+
+        # (python type, package name) -> package qualified python type
+        self._qualified: Dict[Tuple[str, str], Optional[str]] = {}
+
+    def py_type_from_cpp(self, cpp_class_name: Optional[str]) -> str:
+        """Return the Python equivalent type for a C++ class type.
+
+        Will raise an exception if it can't find the mapping.
+
+        Args:
+            cpp_class_name (Optional[str]): The C++ class name
+
+        Returns:
+            str: The python class name
+        """
+        if cpp_class_name is not None and cpp_class_name in self._py_types:
+            return self._py_types[cpp_class_name]
+
+        if cpp_class_name is None:
+            raise RuntimeError("C++ class name is None")
+        cleaned_name = parse_cpp_type(cpp_class_name).base_type
+
+        py_type = self._resolve_cpp(cleaned_name)
+        if py_type is None:
+            raise RuntimeError(f"Unknown C++ type {cleaned_name}")
+
+        self._py_types[cpp_class_name] = py_type
+        return py_type
+
+    def _resolve_cpp(self, cpp_class_name: str) -> Optional[str]:
+        "Work out the python type for a cleaned C++ type, or None if we can't"
+        c = self.by_cpp.get(cpp_class_name, None)
+        if c is not None:
+            return c.name
+
+        py_type = _g_cpp_to_py_type_map.get(cpp_class_name, None)
+        if py_type is not None:
+            return py_type
+
+        if len(cpp_class_name) == 1:
+            return cpp_class_name
+
+        # Last resort, it is an enum in a class we know about.
+        split_result = cpp_class_name.rsplit("::", 1)
+        if len(split_result) == 2:
+            enum_ns, enum_name = split_result
+            c = self.by_cpp.get(enum_ns, None)
+            if c is not None and (c.name, enum_name) in self.enums:
+                return f"{c.name}.{enum_name}"
+
+        return None
+
+    def lookup_enum(self, py_type: str) -> Optional[Tuple[class_info, enum_info]]:
+        """Return the owning class and enum info if a python type is an enum.
+
+        Args:
+            py_type (str): The python type (`xAOD.CaloCluster_v1.ClusterSize`)
+
+        Returns:
+            Optional[Tuple[class_info, enum_info]]: The class and enum, or None if
+                this isn't an enum we know about.
+        """
+        type_info = py_type.rsplit(".", 1)
+        if len(type_info) != 2:
+            return None
+        return self.enums.get((type_info[0], type_info[1]), None)
+
+    def package_qualified(
+        self, class_name: Optional[str], package_name: str
+    ) -> Optional[str]:
+        """Return the package qualified version of a python type (see
+        `class_utils.package_qualified_class`).
+
+        Args:
+            class_name (Optional[str]): The python type
+            package_name (str): The name of the package we are writing
+
+        Returns:
+            Optional[str]: The qualified name
+        """
+        if class_name is None:
+            return None
+        key = (class_name, package_name)
+        if key not in self._qualified:
+            self._qualified[key] = package_qualified_class(
+                class_name, package_name, self.python_names
+            )
+        return self._qualified[key]
+
+
+def py_type_from_cpp(
+    cpp_class_name: Optional[str], cpp_class_dict: Dict[str, class_info]
+) -> str:
+    """Return the Python equivalent type for a C++ class type.
+
+    Builds a `type_index` for the lookup - when resolving many types, build the
+    index once and use `type_index.py_type_from_cpp` instead.
+
+    Will raise an exception if it can't find the mapping.
+
+    Args:
+        cpp_class_name (str): The C++ class name
+        cpp_class_dict (Dict[str, class_info]): Dict of all classes, indexed by C++ name
+
+    Returns:
+        str: The python class name
+    """
+    return type_index(cpp_class_dict.values()).py_type_from_cpp(cpp_class_name)
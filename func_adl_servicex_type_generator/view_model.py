@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Union
+
+from func_adl_servicex_type_generator.data_model import enum_value_info, extra_parameter
+
+
+@dataclass
+class argument_view:
+    "A method argument, ready to be written out"
+
+    # Argument name
+    name: str
+
+    # The python type, relative to the module the class is written into
+    arg_type: str
+
+
+@dataclass
+class method_view:
+    "A method of a class module, with all types resolved"
+
+    # Method name
+    name: str
+
+    # Python return type (package qualified)
+    return_type: str
+
+    # The arguments
+    arguments: List[argument_view]
+
+    # The lines of this method's `_method_map` entry
+    metadata: List[str]
+
+    # True if this is a parameterized call (`j.pt[...]`), in which case the
+    # rendered callback and helper class are used.
+    is_parameterized: bool = False
+    param_type_cb: Optional[str] = None
+    param_helper_class: Optional[str] = None
+
+
+@dataclass
+class enum_view:
+    "An enum definition"
+
+    # Python name of the class the enum belongs to
+    namespace: str
+
+    # Name of the enum
+    name: str
+
+    # The enum values
+    values: Sequence[enum_value_info]
+
+
+@dataclass
+class class_view:
+    "Everything needed to write the python module for a class"
+
+    # The class name, without namespace
+    class_name: str
+
+    # Fully qualified python name
+    full_class_name: str
+
+    # Name of the package being generated
+    package_name: str
+
+    # The python namespace that mirrors the C++ namespace of the class
+    cpp_as_py_namespace: str
+
+    # The base class list, with parentheses (`(Iterable[...])`), or empty
+    bases: str
+
+    # Include files and libraries needed by the methods
+    include_files: List[str]
+    libraries: List[str]
+
+    # All the methods, including the ones from behavior classes
+    methods: List[method_view]
+
+    # Enums referenced by each method, by method name
+    referenced_enums: Dict[str, List[enum_view]] = field(default_factory=dict)
+
+    # Enums defined in this class
+    enums: List[enum_view] = field(default_factory=list)
+
+
+@dataclass
+class collection_view:
+    "A collection of the `Event` class, ready to be written out"
+
+    # Collection name (`Jets`)
+    name: str
+
+    # The package qualified python type the collection method returns
+    collection_type: str
+
+    # The lines of this collection's `_collection_map` entry
+    metadata: List[str]
+
+    # The arguments of the collection method, as they appear after `self`
+    arguments: str
+
+    # The rendered method callback, or None if there isn't one
+    method_callback: Optional[str]
+
+    # Extra parameters that are processed when the collection is used
+    extra_parameters: List[extra_parameter]
+
+
+@dataclass
+class metadata_entry_view:
+    "One key of a metadata block"
+
+    key: str
+
+    # Either a single string, or a list of lines
+    value: Union[str, List[str]]
+    is_text: bool
+
+
+@dataclass
+class metadata_view:
+    "A named metadata block that collection parameters can load"
+
+    name: str
+    entries: List[metadata_entry_view]
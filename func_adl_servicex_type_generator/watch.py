@@ -0,0 +1,282 @@
+import itertools
+import logging
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from func_adl_servicex_type_generator.data_model import class_info
+from func_adl_servicex_type_generator.generator import (
+    _g_template_path,
+    _count_subrender_cache,
+    _prepare_release,
+    _release_package,
+    _write_release,
+)
+from func_adl_servicex_type_generator.loader import (
+    LoadedData,
+    _load_shard,
+    load_type_file,
+    merge_loaded_data,
+    type_files_in_directory,
+)
+from func_adl_servicex_type_generator.output import write_stats
+from func_adl_servicex_type_generator.package import (
+    class_renderer,
+    reset_template_environments,
+    subrender_cache_info,
+)
+from func_adl_servicex_type_generator.timings import phase_timings
+
+# How often, in seconds, the watched files are checked for changes
+default_poll_interval = 0.5
+
+# The modification time and size of a file
+file_state = Tuple[int, int]
+
+
+def file_states(paths: Iterable[Path]) -> Dict[Path, file_state]:
+    """The modification time and size of each file, and of every file under each
+    directory.
+
+    Args:
+        paths (Iterable[Path]): Files and directories to look at
+
+    Returns:
+        Dict[Path, file_state]: The state of each file, by path
+    """
+    result: Dict[Path, file_state] = {}
+    for p in paths:
+        files = sorted(f for f in p.rglob("*") if f.is_file()) if p.is_dir() else [p]
+        for f in files:
+            try:
+                st = f.stat()
+            except FileNotFoundError:
+                # Editors often replace a file by removing it first
+                continue
+            result[f] = (st.st_mtime_ns, st.st_size)
+    return result
+
+
+def changed_files(
+    before: Dict[Path, file_state], after: Dict[Path, file_state]
+) -> List[Path]:
+    "The files that were added, removed, or modified between two `file_states`"
+    return sorted(
+        p for p in set(before) | set(after) if before.get(p, None) != after.get(p, None)
+    )
+
+
+def _reuse_unchanged(
+    old: Sequence[class_info], new: Sequence[class_info]
+) -> List[class_info]:
+    """The new classes, with each one that is the same as the old class of that
+    name replaced by the old object (so what was worked out for it is kept)"""
+    by_name = {c.name: c for c in old}
+    return [
+        old_c if (old_c := by_name.get(c.name, None)) is not None and old_c == c else c
+        for c in new
+    ]
+
+
+class release_watcher:
+    """Keeps the model of one release in memory, and writes its package again
+    whenever the type file or the templates change.
+
+    The class renderer is kept between updates as well: only the classes that
+    changed, and the resolved methods and method tables that depend on them, are
+    worked out again (see `class_renderer.update_classes`). Every class is still
+    hashed on each update (which is cheap once the rest is known), and the
+    output directory is updated in place (see `--incremental`), so only the
+    class files whose input hash changed are rendered. If the type file is a
+    directory of shards, only the shards that changed are loaded again.
+    """
+
+    def __init__(
+        self,
+        yaml_type_file: Path,
+        version: str,
+        output_directory: Optional[Path],
+        yaml_backend: str = "auto",
+        template_cache_dir: Optional[Path] = None,
+        jobs: int = 1,
+        engine: str = "jinja",
+        template_path: Path = _g_template_path,
+    ):
+        """Set up the watcher. Nothing is loaded or written until `update`.
+
+        Args:
+            yaml_type_file (Path): The type file, or directory of type files
+            version (str): The version of the package to generate
+            output_directory (Optional[Path]): Where to write the package. Defaults
+                to `../<package name>`.
+            yaml_backend (str): The yaml parser to use
+            template_cache_dir (Optional[Path]): Where to cache the compiled
+                templates
+            jobs (int): Number of worker processes to render with
+            engine (str): How to write the class files (`jinja` or `fast`)
+            template_path (Path): The template directory to render with (and watch)
+        """
+        self.yaml_type_file = yaml_type_file
+        self._version = version
+        self._output_directory = output_directory
+        self._yaml_backend = yaml_backend
+        self._template_cache_dir = template_cache_dir
+        self._jobs = jobs
+        self._engine = engine
+        self._template_path = template_path
+
+        # The state of the watched files when they were last loaded, and the
+        # data loaded from each type file (shard).
+        self._states: Dict[Path, file_state] = {}
+        self._shards: Dict[Path, LoadedData] = {}
+        self._data: Optional[LoadedData] = None
+
+        # The renderer for the current model, and the package name and config it
+        # was built for.
+        self._renderer: Optional[class_renderer] = None
+        self._renderer_key: Optional[Tuple[Any, ...]] = None
+
+    def _watched_paths(self) -> List[Path]:
+        return [self.yaml_type_file, self._template_path]
+
+    def _load(self, changed: Sequence[Path]):
+        "Load the type files that changed, and merge them with the ones that didn't"
+        if self.yaml_type_file.is_dir():
+            shards = type_files_in_directory(self.yaml_type_file)
+            for p in shards:
+                if p in changed or p not in self._shards:
+                    shard = _load_shard(p, self._yaml_backend)
+                    if p in self._shards:
+                        shard = replace(
+                            shard,
+                            classes=_reuse_unchanged(
+                                self._shards[p].classes, shard.classes
+                            ),
+                        )
+                    self._shards[p] = shard
+            self._shards = {p: self._shards[p] for p in shards}
+            if len(shards) == 0:
+                raise RuntimeError(f"No type files found in {self.yaml_type_file}")
+            self._data = merge_loaded_data([(p.name, self._shards[p]) for p in shards])
+        else:
+            data = load_type_file(self.yaml_type_file, backend=self._yaml_backend)
+            if self._data is not None:
+                data = replace(
+                    data, classes=_reuse_unchanged(self._data.classes, data.classes)
+                )
+            self._data = data
+
+    def _update_renderer(self, r: _release_package, old_classes: List[class_info]):
+        "Bring the renderer up to date with the model, or start a new one"
+        key = (r.package_name, sorted(r.data.config.items()))
+        if self._renderer is None or key != self._renderer_key:
+            self._renderer = class_renderer(
+                r.data.classes,
+                self._template_path,
+                r.package_name,
+                r.data.index,
+                self._template_cache_dir,
+                self._engine,
+                r.data.config,
+            )
+            self._renderer_key = key
+        elif r.data.classes is not old_classes:
+            old_ids = {id(c) for c in old_classes}
+            new_ids = {id(c) for c in r.data.classes}
+            self._renderer.update_classes(
+                r.data.classes,
+                r.data.index,
+                [c for c in r.data.classes if id(c) not in old_ids]
+                + [c for c in old_classes if id(c) not in new_ids],
+            )
+
+    def update(self, timings: Optional[phase_timings] = None) -> Optional[write_stats]:
+        """Write the package again if any of the watched files changed since the
+        last update (the first update always writes it).
+
+        Args:
+            timings (Optional[phase_timings]): Filled with the time taken by each
+                phase of the update
+
+        Returns:
+            Optional[write_stats]: What happened to the files in the output
+                directory, or None if nothing changed.
+        """
+        timings = timings if timings is not None else phase_timings()
+        subrender_before = subrender_cache_info()
+        states = file_states(self._watched_paths())
+        changed = changed_files(self._states, states)
+        if len(self._states) > 0 and len(changed) == 0:
+            return None
+
+        # Don't try the same broken files again if this update fails
+        self._states = states
+
+        old_classes = self._data.classes if self._data is not None else []
+        if self._data is None or any(
+            p == self.yaml_type_file or self.yaml_type_file in p.parents
+            for p in changed
+        ):
+            with timings.phase("load"):
+                self._load(changed)
+        if any(self._template_path in p.parents for p in changed):
+            reset_template_environments()
+            self._renderer = None
+
+        assert self._data is not None
+        r = _prepare_release(self._data, self._version, self._output_directory)
+        try:
+            with timings.phase("index"):
+                self._update_renderer(r, old_classes)
+            stats = _write_release(
+                r,
+                self._template_cache_dir,
+                self._jobs,
+                True,
+                self._engine,
+                timings,
+                None,
+                template_path=self._template_path,
+                renderer=self._renderer,
+            )
+        except Exception:
+            # Don't trust anything the renderer worked out part way through
+            self._renderer = None
+            raise
+        _count_subrender_cache(timings, subrender_before)
+        return stats
+
+
+def watch_releases(
+    watchers: Sequence[release_watcher],
+    poll_interval: float = default_poll_interval,
+    on_update: Optional[Callable[[release_watcher, write_stats, float], None]] = None,
+    max_polls: Optional[int] = None,
+):
+    """Write the package of each release, and then write them again every time
+    their type file or the templates change. Runs until interrupted.
+
+    A failed update (for example, a type file that is half written) is logged,
+    and the release is tried again the next time its files change.
+
+    Args:
+        watchers (Sequence[release_watcher]): The releases to watch
+        poll_interval (float): How often, in seconds, to look for changes
+        on_update (Optional[Callable[[release_watcher, write_stats, float], None]]):
+            Called after each package is written, with what happened to the files
+            and how many seconds it took.
+        max_polls (Optional[int]): Stop after looking for changes this many times.
+            None means never stop.
+    """
+    for _ in itertools.count() if max_polls is None else range(max_polls):
+        for w in watchers:
+            start = time.perf_counter()
+            try:
+                stats = w.update()
+            except Exception as e:
+                logging.error(f"Unable to generate {w.yaml_type_file}: {e}")
+                continue
+            if stats is not None and on_update is not None:
+                on_update(w, stats, time.perf_counter() - start)
+        time.sleep(poll_interval)
@@ -6,34 +6,25 @@ from enum import Enum
 import {{ package_name }}
 
 _method_map = {
-{%- for method in methods_info %}
+{%- for method in methods %}
     '{{ method.name }}': {
-        'metadata_type': 'add_method_type_info',
-        'type_string': '{{ method.fully_qualified_name }}',
-        'method_name': '{{ method.name }}',
-        {%- if method.return_type_element %}
-        'return_type_element': '{{ method.return_type_element }}',
-        'return_type_collection': '{{ method.cpp_return_type }}',
-        {%- else %}
-        'return_type': '{{ method.cpp_return_type }}',
-        {%- endif %}
-        {%- if method.deref_count %}
-        'deref_count': {{ method.deref_count }}
-        {%- endif %}
+{%- for line in method.metadata %}
+        {{ line }}
+{%- endfor %}
     },
 {%- endfor %}
 }
 
 _enum_function_map = {
-{%- for method_name in referenced_enums.keys() %}
+{%- for method_name, method_enums in referenced_enums.items() %}
     '{{ method_name }}': [
-{%- for enum in referenced_enums[method_name] %}
+{%- for enum in method_enums %}
         {
             'metadata_type': 'define_enum',
-            'namespace': '{{ enum[0].name }}',
-            'name': '{{ enum[1].name }}',
+            'namespace': '{{ enum.namespace }}',
+            'name': '{{ enum.name }}',
             'values': [
-            {%- for value in enum[1].values %}
+            {%- for value in enum.values %}
                 '{{ value.name }}',
             {%- endfor %}
             ],
@@ -44,11 +35,11 @@ _enum_function_map = {
 }
 
 _defined_enums = {
-{%- for enum in enums_info %}
+{%- for enum in enums %}
     '{{ enum.name }}':
         {
             'metadata_type': 'define_enum',
-            'namespace': '{{ full_class_name }}',
+            'namespace': '{{ enum.namespace }}',
             'name': '{{ enum.name }}',
             'values': [
             {%- for value in enum.values %}
@@ -112,27 +103,27 @@ def _add_method_metadata(s: ObjectStream[T], a: ast.Call) -> Tuple[ObjectStream[
 
 
 @func_adl_callback(_add_method_metadata)
-class {{ class_name }}{% if inheritance_list|length > 0 %}({% for super_class in inheritance_list %}{{ super_class }}{% endfor %}){% endif %}:
+class {{ class_name }}{{ bases }}:
     "A class"
-{% for enum in enums_info %}
+{% for enum in enums %}
     class {{ enum.name }}(Enum):
 {%- for value in enum.values %}
         {{ value.name }} = {{ value.value }}
 {%- endfor %}
 {% endfor %}
-{% for method in methods_info -%}
-{% if method.param_call_args|length == 0 %}
+{% for method in methods -%}
+{% if not method.is_parameterized %}
     def {{ method.name }}(self
         {%- for arg in method.arguments -%}
-        , {{ arg.name }}: {{ remove_ns_stem(ns_stem, arg.arg_type)}}
+        , {{ arg.name }}: {{ arg.arg_type }}
         {%- endfor -%}
         ) -> {{ method.return_type }}:
 {%- else %}
-    @func_adl_parameterized_call({{method.param_type_cb|subrender}})
+    @func_adl_parameterized_call({{ method.param_type_cb }})
     @property
-    def {{ method.name }}(self) -> {{ package_name }}.{{method.param_helper_class}}[
+    def {{ method.name }}(self) -> {{ package_name }}.{{ method.param_helper_class }}[
         {%- for arg in method.arguments -%}
-        {{ remove_ns_stem(ns_stem, arg.arg_type)}}
+        {{ arg.arg_type }}
         {%- endfor -%}
     ]:
 {%- endif %}
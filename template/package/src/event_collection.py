@@ -7,31 +7,25 @@ import {{ package_name }}
 
 # The map for collection definitions in ATLAS
 _collection_map = {
-{%- for collection in collections %}
+{%- for collection in collection_views %}
     '{{ collection.name }}': {
-        'metadata_type': 'add_atlas_event_collection_info',
-        'name': '{{ collection.name }}',
-        'include_files': [{%- for file in collection.cpp_include_file -%}'{{ file }}',{%- endfor -%}],
-        'container_type': '{{ collection.cpp_collection_type }}',
-{%- if collection.cpp_item_type != collection.cpp_collection_type %}
-        'element_type': '{{ collection.cpp_item_type }}',
-{%- endif %}
-        'contains_collection': {{ "True" if collection.cpp_item_type != collection.cpp_collection_type else "False" }},
-        'link_libraries': {{ collection.link_libraries }},
+{%- for line in collection.metadata %}
+        {{ line }}
+{%- endfor %}
     },
 {%- endfor %}
 }
 
 _param_metadata : Dict[str, Dict[str, Any]] = {
-{%- for n_md in metadata.keys() %}
-    '{{ n_md }}': {
-    {%- for md_key in metadata[n_md].data[0].keys() %}
-        '{{ md_key }}': 
-            {%- if metadata[n_md].data[0][md_key] is string -%}
-            "{{ metadata[n_md].data[0][md_key] }}",
+{%- for md in metadata_views %}
+    '{{ md.name }}': {
+    {%- for entry in md.entries %}
+        '{{ entry.key }}': 
+            {%- if entry.is_text -%}
+            "{{ entry.value }}",
             {%- else -%}
             [
-                {%- for ln in metadata[n_md].data[0][md_key] %}
+                {%- for ln in entry.value %}
                 "{{ ln }}",
                 {%- endfor %}
             ],
@@ -110,7 +104,7 @@ def match_param_value(value, to_match) -> bool:
 class _process_extra_arguments:
     'Static class that will deal with the extra arguments for each collection'
 
-{%- for item in collections %}{% if item.extra_parameters|length > 0 %}
+{%- for item in collection_views %}{% if item.extra_parameters|length > 0 %}
     @staticmethod
     def process_{{ item.name }}(bank_name: str, s: ObjectStream[T], a: ast.Call) -> Tuple[str, ObjectStream[T], ast.AST]:
         param_values = {}
@@ -187,13 +181,10 @@ class Event:
     '''The top level event class. All data in the event is accessed from here
     '''
 
-{% for item in collections %}
-{% if item.method_callback|length > 0 %}
-    @func_adl_callback({{item.method_callback|subrender }}){% endif %}
-    def {{ item.name }}(self
-{%- for arg in item.parameters %}, {{ arg.name }}: {{ arg.type }}{% if arg.default_value != None %} = {{ arg.default_value }}{% endif %}{% endfor -%}
-{%- for arg in item.extra_parameters %}, {{ arg.name }}: {{ arg.type }} = {{ arg.default_value }}{% endfor -%}
-    ) -> {{ item.collection_type }}:
+{% for item in collection_views %}
+{% if item.method_callback is not none %}
+    @func_adl_callback({{ item.method_callback }}){% endif %}
+    def {{ item.name }}(self{{ item.arguments }}) -> {{ item.collection_type }}:
         ...
 
 {%- endfor -%}
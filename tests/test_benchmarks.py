@@ -0,0 +1,184 @@
+import sys
+from pathlib import Path
+
+import pytest
+from func_adl_servicex_type_generator.benchmarks import (
+    bench_engines,
+    bench_memory,
+    bench_startup,
+    bench_suite,
+    bench_template_environments,
+    bench_type_file_formats,
+    bench_yaml_backends,
+    best_of,
+    compare_load_memory,
+    compare_to_baseline,
+    load_baseline,
+    peak_rss_of_load,
+    save_baseline,
+    synthetic_model,
+    synthetic_type_document,
+    trace_generation_memory,
+    write_synthetic_type_file,
+)
+from func_adl_servicex_type_generator.generator import run_bench
+from func_adl_servicex_type_generator.loader import load_yaml
+from func_adl_servicex_type_generator.package import (
+    reset_template_environments,
+    subrender_cache_info,
+)
+
+
+def test_best_of_runs_repeat():
+    calls = []
+    t = best_of(lambda: calls.append(1), repeat=4)
+    assert len(calls) == 4
+    assert t >= 0
+
+
+def test_bench_yaml_backends():
+    r = bench_yaml_backends(Path("./tests/xaod_r21_1.yaml"), repeat=1)
+    assert "python" in r
+    assert all(t > 0 for t in r.values())
+
+
+def test_bench_type_file_formats():
+    r = bench_type_file_formats(Path("./tests/xaod_r21_1.yaml"), repeat=1)
+    assert {"yaml", "json"} <= set(r.keys())
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Needs the resource module")
+def test_peak_rss_of_load():
+    m = peak_rss_of_load(Path("./tests/xaod_r21_1.yaml"))
+    assert m.rss_after_bytes >= m.rss_before_bytes > 0
+    assert m.model_bytes > 0
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Needs the resource module")
+def test_compare_load_memory():
+    c = compare_load_memory(Path("./tests/xaod_r21_1.yaml"))
+    assert c.plain_rss_bytes > 0 and c.slotted_rss_bytes > 0
+    assert c.ratio == c.plain_rss_bytes / c.slotted_rss_bytes
+
+
+def test_bench_template_environments(monkeypatch):
+    "Each cold build starts from empty environments and sub-template cache"
+    resets = []
+    monkeypatch.setattr(
+        "func_adl_servicex_type_generator.benchmarks.templates."
+        "reset_template_environments",
+        lambda: resets.append(1) or reset_template_environments(),
+    )
+    r = bench_template_environments(repeat=1)
+    assert set(r.keys()) == {"compile", "bytecode_cache", "shared"}
+    assert len(resets) == 4
+    assert subrender_cache_info().currsize == 0
+
+
+def test_bench_startup(tmp_path):
+    assert bench_startup(tmp_path, repeat=1) > 0
+
+
+def test_synthetic_type_document_seeded():
+    assert synthetic_type_document(50, seed=2) == synthetic_type_document(50, seed=2)
+    assert synthetic_type_document(50, seed=2) != synthetic_type_document(50, seed=3)
+
+
+def test_synthetic_model():
+    data = synthetic_model(100)
+    assert len(data.classes) == 100
+    assert any(len(c.behaviors) > 0 for c in data.classes)
+    assert any(len(c.enums) > 0 for c in data.classes)
+
+
+def test_bench_engines():
+    r = bench_engines(100, repeat=1)
+    assert set(r.keys()) == {"jinja", "fast"}
+
+
+def test_synthetic_collections():
+    "Some collections have extra parameters, and their metadata is there"
+    doc = synthetic_type_document(200)
+    metadata_names = set(m["name"] for m in doc["metadata"])
+
+    extra = [c for c in doc["collections"] if "extra_parameters" in c]
+    assert len(extra) > 0
+    for c in extra:
+        for p in c["extra_parameters"]:
+            for a in p["actions"]:
+                assert set(a["metadata_names"]) <= metadata_names
+
+
+def test_write_synthetic_type_file(tmp_path):
+    type_file = tmp_path / "types.yaml"
+    write_synthetic_type_file(type_file, 100)
+
+    data = load_yaml(type_file)
+    assert len(data.classes) == 100
+    assert len(data.collections) > 0
+    assert len(data.metadata) > 0
+
+
+def test_bench_suite():
+    r = bench_suite([100], repeat=1)
+    assert set(r.keys()) == {
+        "load_yaml",
+        "write_out_classes",
+        "template_package_scaffolding",
+        "generate_package",
+    }
+    assert all(t["100"] > 0 for t in r.values())
+
+
+def test_bench_suite_bad_size():
+    with pytest.raises(RuntimeError) as e:
+        bench_suite([10])
+
+    assert "out of range" in str(e.value)
+
+
+def test_baseline_round_trip(tmp_path):
+    results = {"load_yaml": {"100": 0.5}}
+    save_baseline(tmp_path / "sub" / "baseline.json", results)
+
+    assert load_baseline(tmp_path / "sub" / "baseline.json") == results
+
+
+def test_compare_to_baseline():
+    baseline = {"load_yaml": {"100": 1.0, "1000": 10.0}, "other": {"100": 1.0}}
+    results = {"load_yaml": {"100": 1.2, "1000": 30.0}, "new": {"100": 5.0}}
+
+    regressions = compare_to_baseline(results, baseline, max_ratio=1.5)
+
+    assert len(regressions) == 1
+    assert "load_yaml (1000 classes) is 3.00x its baseline" in regressions[0]
+
+
+def test_run_bench_no_baseline(tmp_path, capsys):
+    "Comparing against a baseline that isn't there fails, rather than passing"
+    assert run_bench(["--baseline", str(tmp_path / "none.json")]) == 1
+    assert "No benchmark baseline" in capsys.readouterr().err
+
+
+def test_trace_generation_memory(tmp_path):
+    type_file = tmp_path / "types.yaml"
+    write_synthetic_type_file(type_file, 100)
+
+    phases = trace_generation_memory(type_file, n_sites=3)
+
+    assert [p.name for p in phases] == [
+        "yaml_document",
+        "loaded_data",
+        "resolution",
+        "rendered_text",
+    ]
+    for p in phases:
+        assert p.peak_bytes >= p.retained_bytes > 0
+        assert 0 < len(p.top_sites) <= 3
+        assert "tracemalloc" not in p.top_sites[0].location
+
+
+def test_bench_memory():
+    r = bench_memory([100], n_sites=1)
+    assert list(r.keys()) == ["100"]
+    assert len(r["100"]) == 4
@@ -1,12 +1,16 @@
 from pathlib import Path
+
+import pytest
 from func_adl_servicex_type_generator.class_utils import (
     class_ns_as_path,
     class_split_namespace,
     package_qualified_class,
+    parse_type_expression,
     process_by_namespace,
     remove_namespaces,
     remove_ns_stem,
     split_release,
+    type_expression,
 )
 
 
@@ -135,5 +139,41 @@ def test_pbn_ns():
     assert process_by_namespace("b[a]", lambda a: "hi") == "hi[hi]"
 
 
+def test_pbn_nested_args():
+    assert process_by_namespace("a[b[c, d], e]", lambda a: a.upper()) == "A[B[C, D], E]"
+
+
+def test_parse_type_simple():
+    assert parse_type_expression("xAOD.Jet") == type_expression("xAOD.Jet")
+
+
+def test_parse_type_args():
+    assert parse_type_expression("Iterable[ xAOD.Jet ,float]") == type_expression(
+        "Iterable", (type_expression("xAOD.Jet"), type_expression("float"))
+    )
+
+
+def test_parse_type_cached():
+    assert parse_type_expression("Iterable[hi]") is parse_type_expression(
+        "Iterable[hi]"
+    )
+
+
+def test_parse_type_round_trip():
+    assert str(parse_type_expression("Iterable[Iterable[hi], there]")) == (
+        "Iterable[Iterable[hi], there]"
+    )
+
+
+def test_parse_type_unclosed():
+    with pytest.raises(RuntimeError):
+        parse_type_expression("Iterable[hi")
+
+
+def test_parse_type_trailing():
+    with pytest.raises(RuntimeError):
+        parse_type_expression("Iterable[hi]there")
+
+
 def test_split_release():
     assert split_release("22.2.147") == (22, 2, 147)
@@ -0,0 +1,94 @@
+import pytest
+from func_adl_servicex_type_generator.cpp_types import (
+    clean_cpp_type,
+    count_pointer_depth,
+    normalize_cpp_type,
+    parse_cpp_type,
+)
+
+
+def test_parse_simple():
+    t = parse_cpp_type("xAOD::Jet_v1")
+    assert t.normalized == "xAOD::Jet_v1"
+    assert t.base_type == "xAOD::Jet_v1"
+    assert t.pointer_depth == 0
+    assert not t.is_const
+    assert not t.is_reference
+
+
+def test_parse_const_pointer():
+    t = parse_cpp_type(" const xAOD::Jet_v1 * *")
+    assert t.base_type == "xAOD::Jet_v1"
+    assert t.pointer_depth == 2
+    assert t.is_const
+
+
+def test_parse_reference():
+    t = parse_cpp_type("const xAOD::Jet_v1&")
+    assert t.base_type == "xAOD::Jet_v1"
+    assert t.is_reference
+    assert t.is_const
+
+
+def test_parse_reference_to_pointer():
+    t = parse_cpp_type("xAOD::Jet_v1*&")
+    assert t.base_type == "xAOD::Jet_v1"
+    assert t.pointer_depth == 1
+    assert t.is_reference
+
+
+def test_parse_nested_template():
+    t = parse_cpp_type("vector<vector<  float> >*")
+    assert t.normalized == "vector<vector< float>>*"
+    assert t.base_type == "vector<vector<  float> >"
+    assert t.pointer_depth == 1
+    assert t.template_name == "vector"
+
+    assert len(t.template_args) == 1
+    inner = t.template_args[0]
+    assert inner.template_name == "vector"
+    assert inner.template_args == (parse_cpp_type("float"),)
+
+
+def test_parse_template_args():
+    t = parse_cpp_type("map<string, vector<const xAOD::Jet_v1*>>")
+    assert t.template_name == "map"
+    assert [a.base_type for a in t.template_args] == [
+        "string",
+        "vector<const xAOD::Jet_v1*>",
+    ]
+    jet = t.template_args[1].template_args[0]
+    assert jet.base_type == "xAOD::Jet_v1"
+    assert jet.is_const
+    assert jet.pointer_depth == 1
+
+
+def test_parse_not_template():
+    t = parse_cpp_type("xAOD::Jet_v1")
+    assert t.template_name == "xAOD::Jet_v1"
+    assert t.template_args == ()
+
+
+def test_parse_cached():
+    assert parse_cpp_type("xAOD::Jet_v1*") is parse_cpp_type("xAOD::Jet_v1*")
+
+
+@pytest.mark.parametrize(
+    "cpp_type, normalized",
+    [
+        ("a  b", "a b"),
+        ("a    b", "a b"),
+        ("a<b<c> > >", "a<b<c>>>"),
+        ("a< < b", "a<< b"),
+        ("a<  <b>  >", "a<<b>>"),
+        ("a< >", "a< >"),
+    ],
+)
+def test_normalize(cpp_type, normalized):
+    assert normalize_cpp_type(cpp_type) == normalized
+
+
+def test_helpers_none():
+    assert clean_cpp_type(None) is None
+    assert normalize_cpp_type(None) is None
+    assert count_pointer_depth(None) == 0
@@ -1,5 +1,11 @@
-from func_adl_servicex_type_generator.data_model import class_info
+import pickle
+
 import pytest
+from func_adl_servicex_type_generator.data_model import (
+    class_info,
+    method_arg_info,
+    method_info,
+)
 
 
 def test_class_with_space_as_container():
@@ -12,3 +18,29 @@ def test_class_with_space_as_name():
     "Make sure spaces in class names don't cause a problem"
     with pytest.raises(AssertionError):
         class_info("xAOD Jets", "xAOD::Jets", [], None, "unsigned jets", "jet.hpp")
+
+
+def test_method_info_has_no_dict():
+    "Slotted classes save a lot of memory on big type files"
+    m = method_info("pt", "double", [method_arg_info("a", None, "int")], [], None)
+    assert not hasattr(m, "__dict__")
+    assert m.param_type_cb is None
+
+
+def test_slotted_class_defaults():
+    c = class_info("xAOD.Jets", "xAOD::Jets", [], None, None, "jet.hpp")
+    assert c.behaviors == []
+    assert c.is_alias is False
+    assert c.library is None
+
+
+def test_slotted_class_pickle():
+    c = class_info("xAOD.Jets", "xAOD::Jets", [], None, None, "jet.hpp")
+    assert pickle.loads(pickle.dumps(c)) == c
+
+
+def test_frozen_slotted_class_pickle():
+    m = method_info("pt", "double", (method_arg_info("a", None, "int"),), (), None)
+    m2 = pickle.loads(pickle.dumps(m))
+    assert m2 == m
+    assert hash(m2) == hash(m)
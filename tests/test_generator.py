@@ -0,0 +1,85 @@
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from func_adl_servicex_type_generator.benchmarks.synthetic import (
+    write_synthetic_type_file,
+)
+from func_adl_servicex_type_generator.generator import (
+    generate_package,
+    generate_packages,
+)
+from func_adl_servicex_type_generator.timings import phase_timings
+
+
+@pytest.fixture
+def type_files(tmp_path):
+    "Two small type files"
+    files = [tmp_path / "model_1.yaml", tmp_path / "model_2.yaml"]
+    for i, f in enumerate(files):
+        write_synthetic_type_file(f, 100 + 20 * i, seed=i)
+    yield files
+
+
+def _read_tree(root: Path) -> Dict[str, str]:
+    "All the files under `root`, by relative path"
+    return {
+        str(f.relative_to(root)): f.read_text()
+        for f in sorted(root.rglob("*"))
+        if f.is_file()
+    }
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_generate_packages(tmp_path, type_files, jobs):
+    "Several releases at once give the same packages as one at a time"
+    for f in type_files:
+        generate_package(f, "1.0.0b1", tmp_path / "single" / f.stem)
+
+    timings = phase_timings()
+    stats = generate_packages(
+        [(f, tmp_path / "batch" / f.stem) for f in type_files],
+        "1.0.0b1",
+        jobs=jobs,
+        timings=timings,
+    )
+
+    for f, s in zip(type_files, stats):
+        single = _read_tree(tmp_path / "single" / f.stem)
+        assert len(single) > 0
+        assert single == _read_tree(tmp_path / "batch" / f.stem)
+        assert s.written == len(single) - 1
+
+    assert list(timings.as_dict()["phases"].keys()) == ["load", "releases"]
+    assert list(timings.releases.keys()) == [
+        str(tmp_path / "batch" / f.stem) for f in type_files
+    ]
+    for t in timings.releases.values():
+        assert "load" in t.phases
+        assert "class_render" in t.phases
+        assert t.counters["classes_rendered"] > 0
+
+
+def test_generate_packages_same_output(tmp_path, type_files):
+    with pytest.raises(RuntimeError) as e:
+        generate_packages(
+            [(f, tmp_path / "out") for f in type_files], "1.0.0b1", jobs=1
+        )
+    assert "Two releases" in str(e.value)
+
+
+def test_generate_package_subrender_counts(tmp_path, type_files):
+    "The sub-template cache counts are for each run, not the whole process"
+    counts = []
+    for i in range(2):
+        timings = phase_timings()
+        generate_package(
+            type_files[0], "1.0.0b1", tmp_path / f"out_{i}", timings=timings
+        )
+        counts.append(
+            (timings.counters["subrender_hits"], timings.counters["subrender_misses"])
+        )
+
+    assert sum(counts[0]) > 0
+    assert sum(counts[1]) == sum(counts[0])
+    assert counts[1][1] == 0
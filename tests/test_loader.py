@@ -1,6 +1,21 @@
+import dataclasses
+import json
 from pathlib import Path
+
 import pytest
-from func_adl_servicex_type_generator.loader import load_yaml
+import yaml
+from func_adl_servicex_type_generator.data_model import class_info, collection_info
+from func_adl_servicex_type_generator.loader import (
+    _load_shard,
+    convert_type_file,
+    iter_yaml,
+    load_type_directory,
+    load_type_file,
+    load_yaml,
+    loaded_data_from_stream,
+    type_file_format,
+    yaml_loader_class,
+)
 
 
 def test_load_full_file():
@@ -109,3 +124,251 @@ def test_load_all_test_files(yaml_file):
     assert data is not None
 
     assert "xAOD.CaloCluster_v1" in {c.name for c in data.classes}
+
+
+def test_load_python_backend():
+    data = load_yaml(Path("./tests/xaod_r21_small.yaml"), backend="python")
+    assert "xAOD.CaloCluster_v1" in {c.name for c in data.classes}
+
+
+@pytest.mark.skipif(
+    not hasattr(yaml, "CSafeLoader"), reason="PyYAML built without libyaml"
+)
+def test_load_c_backend_same_as_python():
+    data_c = load_yaml(Path("./tests/xaod_r21_small.yaml"), backend="c")
+    data_py = load_yaml(Path("./tests/xaod_r21_small.yaml"), backend="python")
+    assert data_c == data_py
+
+
+def test_load_auto_backend():
+    assert yaml_loader_class("auto") is getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def test_load_unknown_backend():
+    with pytest.raises(RuntimeError):
+        load_yaml(Path("./tests/xaod_r21_small.yaml"), backend="fork")
+
+
+@pytest.mark.parametrize("backend", ["auto", "python"])
+def test_iter_yaml_items(backend):
+    items = list(iter_yaml(Path("./tests/xaod_r21_1.yaml"), backend=backend))
+    sections = {s for s, _ in items}
+    assert sections == {"collections", "classes", "metadata", "files", "config"}
+
+    assert all(isinstance(i, class_info) for s, i in items if s == "classes")
+    assert all(isinstance(i, collection_info) for s, i in items if s == "collections")
+    assert "xAOD.Jet_v1" in {i.name for s, i in items if s == "classes"}
+
+
+def test_iter_yaml_is_lazy(tmp_path):
+    "The first class is returned before we have parsed the broken second one"
+    f = tmp_path / "types.yaml"
+    f.write_text(
+        "classes:\n"
+        "  - python_name: xAOD.Jet\n"
+        "    cpp_name: xAOD::Jet\n"
+        "  - python_name: [\n"
+    )
+    items = iter_yaml(f)
+    section, item = next(items)
+    assert section == "classes"
+    assert item.name == "xAOD.Jet"
+    with pytest.raises(yaml.YAMLError):
+        next(items)
+
+
+def test_iter_yaml_anchors(tmp_path):
+    f = tmp_path / "types.yaml"
+    f.write_text(
+        "classes:\n"
+        "  - python_name: xAOD.Jet\n"
+        "    cpp_name: xAOD::Jet\n"
+        "    methods: &jet_methods\n"
+        "      - name: pt\n"
+        "        return_type: double\n"
+        "  - python_name: xAOD.Muon\n"
+        "    cpp_name: xAOD::Muon\n"
+        "    methods: *jet_methods\n"
+        "config:\n"
+        "  atlas_release: 22.2.1\n"
+    )
+    data = load_yaml(f)
+    assert [m.name for m in data.classes[1].methods] == ["pt"]
+    assert data.config == {"atlas_release": "22.2.1"}
+    assert data.collections == []
+
+
+def test_loaded_data_needs_config():
+    with pytest.raises(RuntimeError):
+        loaded_data_from_stream([])
+
+
+@pytest.mark.parametrize(
+    "name, contents, expected",
+    [
+        ("types.yaml", b"{}", "yaml"),
+        ("types.json", b"", "json"),
+        ("types.msgpack", b"", "msgpack"),
+        ("types", b'  {"config": {}}', "json"),
+        ("types", b"\x81\xa6config\x80", "msgpack"),
+        ("types", b"config:\n  a: b\n", "yaml"),
+    ],
+)
+def test_type_file_format(tmp_path, name, contents, expected):
+    f = tmp_path / name
+    f.write_bytes(contents)
+    assert type_file_format(f) == expected
+
+
+def test_convert_to_json(tmp_path):
+    json_file = tmp_path / "types.json"
+    convert_type_file(Path("./tests/xaod_r21_small.yaml"), json_file)
+
+    assert load_type_file(json_file) == load_yaml(Path("./tests/xaod_r21_small.yaml"))
+
+
+def test_convert_to_msgpack(tmp_path):
+    pytest.importorskip("msgpack")
+    mp_file = tmp_path / "types.msgpack"
+    convert_type_file(Path("./tests/xaod_r21_small.yaml"), mp_file)
+
+    # No extension to make sure we figure it out from the contents
+    no_ext = tmp_path / "types"
+    mp_file.rename(no_ext)
+    assert load_type_file(no_ext) == load_yaml(Path("./tests/xaod_r21_small.yaml"))
+
+
+def test_convert_unknown_format(tmp_path):
+    with pytest.raises(RuntimeError):
+        convert_type_file(Path("./tests/xaod_r21_small.yaml"), tmp_path / "types.xml")
+
+
+def _write_shards(directory: Path, type_file: Path):
+    "Split a type file up into a shard per top level namespace"
+    data = yaml.safe_load(type_file.read_text())
+    by_ns = {}
+    for c in data["classes"]:
+        by_ns.setdefault(c["python_name"].split(".")[0], []).append(c)
+    for ns, classes in by_ns.items():
+        (directory / f"{ns}.yaml").write_text(yaml.safe_dump({"classes": classes}))
+    del data["classes"]
+    (directory / "base.json").write_text(json.dumps(data))
+    return len(by_ns) + 1
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_load_shard_directory(tmp_path, jobs):
+    n_shards = _write_shards(tmp_path, Path("./tests/xaod_r21_small.yaml"))
+    assert n_shards > 2
+
+    data = load_type_directory(tmp_path, jobs=jobs)
+    full = load_yaml(Path("./tests/xaod_r21_small.yaml"))
+
+    assert sorted(c.name for c in data.classes) == sorted(c.name for c in full.classes)
+    assert {c.name: c for c in data.classes} == {c.name: c for c in full.classes}
+    assert data.collections == full.collections
+    assert data.metadata == full.metadata
+    assert data.config == full.config
+
+
+def test_load_shard_no_index(tmp_path):
+    "Shards are sent back from the workers without lookup tables"
+    _write_shards(tmp_path, Path("./tests/xaod_r21_small.yaml"))
+    shard = _load_shard(tmp_path / "xAOD.yaml", "auto")
+    assert len(shard.classes) > 0
+    assert shard._index is None
+
+    data = load_type_directory(tmp_path, jobs=1)
+    assert data._index is None
+    assert data.index.by_python.keys() == {c.name for c in data.classes}
+
+
+def test_load_shard_same_class_twice(tmp_path):
+    c = {"python_name": "xAOD.Jet", "cpp_name": "xAOD::Jet"}
+    (tmp_path / "a.yaml").write_text(yaml.safe_dump({"classes": [c]}))
+    (tmp_path / "b.yaml").write_text(
+        yaml.safe_dump({"classes": [c], "config": {"atlas_release": "22.2.1"}})
+    )
+
+    data = load_type_directory(tmp_path, jobs=1)
+    assert len(data.classes) == 1
+
+
+@pytest.mark.parametrize(
+    "c2",
+    [
+        {"python_name": "xAOD.Jet", "cpp_name": "xAOD::Jet", "include_file": "a.h"},
+        {"python_name": "xAOD.Jet2", "cpp_name": "xAOD::Jet"},
+    ],
+)
+def test_load_shard_conflict(tmp_path, c2):
+    c1 = {"python_name": "xAOD.Jet", "cpp_name": "xAOD::Jet"}
+    (tmp_path / "a.yaml").write_text(yaml.safe_dump({"classes": [c1]}))
+    (tmp_path / "b.yaml").write_text(
+        yaml.safe_dump({"classes": [c2], "config": {"atlas_release": "22.2.1"}})
+    )
+
+    with pytest.raises(RuntimeError) as e:
+        load_type_directory(tmp_path, jobs=1)
+    assert "a.yaml" in str(e.value)
+    assert "b.yaml" in str(e.value)
+
+
+def test_load_shard_no_config(tmp_path):
+    c = {"python_name": "xAOD.Jet", "cpp_name": "xAOD::Jet"}
+    (tmp_path / "a.yaml").write_text(yaml.safe_dump({"classes": [c]}))
+
+    with pytest.raises(RuntimeError):
+        load_type_directory(tmp_path, jobs=1)
+
+
+def test_load_interns_type_names():
+    data = load_yaml(Path("./tests/xaod_r21_1.yaml"))
+    return_types = [
+        m.return_type
+        for c in data.classes
+        for m in c.methods
+        if m.return_type == "double"
+    ]
+    assert len(return_types) > 1
+    assert all(t is return_types[0] for t in return_types)
+
+
+def test_load_shares_methods(tmp_path):
+    f = tmp_path / "types.yaml"
+    f.write_text(
+        "classes:\n"
+        "  - python_name: xAOD.Jet\n"
+        "    cpp_name: xAOD::Jet\n"
+        "    methods:\n"
+        "      - name: pt\n"
+        "        return_type: double\n"
+        "      - name: e\n"
+        "        return_type: double\n"
+        "  - python_name: xAOD.Muon\n"
+        "    cpp_name: xAOD::Muon\n"
+        "    methods:\n"
+        "      - name: pt\n"
+        "        return_type: double\n"
+        "      - name: e\n"
+        "        return_type: double\n"
+        "  - python_name: xAOD.Electron\n"
+        "    cpp_name: xAOD::Electron\n"
+        "    methods:\n"
+        "      - name: pt\n"
+        "        return_type: double\n"
+        "config:\n"
+        "  atlas_release: 22.2.1\n"
+    )
+    jet, muon, electron = load_yaml(f).classes
+
+    assert jet.methods is muon.methods
+    assert electron.methods[0] is jet.methods[0]
+    assert electron.methods is not jet.methods
+
+
+def test_loaded_methods_are_frozen():
+    data = load_yaml(Path("./tests/xaod_r21_1.yaml"))
+    m = data.classes[0].methods[0]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        m.name = "fork"  # type: ignore
@@ -0,0 +1,40 @@
+import json
+
+from func_adl_servicex_type_generator.manifest import (
+    load_manifest,
+    manifest_path,
+    save_manifest,
+)
+
+
+def test_manifest_round_trip(tmp_path):
+    save_manifest(tmp_path, {"xAOD/jets.py": "1234"})
+    assert load_manifest(tmp_path) == {"xAOD/jets.py": "1234"}
+
+
+def test_manifest_missing(tmp_path):
+    assert load_manifest(tmp_path) == {}
+
+
+def test_manifest_unreadable(tmp_path):
+    manifest_path(tmp_path).write_text("{not json")
+    assert load_manifest(tmp_path) == {}
+
+
+def test_manifest_other_version(tmp_path):
+    save_manifest(tmp_path, {"xAOD/jets.py": "1234"})
+    m = json.loads(manifest_path(tmp_path).read_text())
+    m["generator_version"] = "0.0.0-not-this-one"
+    manifest_path(tmp_path).write_text(json.dumps(m))
+
+    assert load_manifest(tmp_path) == {}
+
+
+def test_manifest_other_engine(tmp_path):
+    save_manifest(tmp_path, {"xAOD/jets.py": "1234"}, "fast")
+    assert load_manifest(tmp_path, "fast") == {"xAOD/jets.py": "1234"}
+    assert load_manifest(tmp_path, "jinja") == {}
+
+
+def test_manifest_is_hidden(tmp_path):
+    assert manifest_path(tmp_path).name.startswith(".")
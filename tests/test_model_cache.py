@@ -0,0 +1,91 @@
+import os
+from pathlib import Path
+
+from func_adl_servicex_type_generator.loader import load_yaml
+from func_adl_servicex_type_generator.model_cache import (
+    clear_model_cache,
+    evict_model_cache,
+    get_model_cache_info,
+    load_cached_model,
+    model_cache_key,
+    source_digest,
+)
+
+
+class counting_loader:
+    "Wrap load_yaml so we can tell if the cache was used"
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, p: Path):
+        self.count += 1
+        return load_yaml(p)
+
+
+def test_cache_miss_then_hit(tmp_path):
+    loader = counting_loader()
+    type_file = Path("./tests/xaod_r21_1.yaml")
+
+    d1 = load_cached_model(type_file, loader, tmp_path)
+    d2 = load_cached_model(type_file, loader, tmp_path)
+
+    assert loader.count == 1
+    assert d1 == d2
+    assert get_model_cache_info(tmp_path).n_models == 1
+
+
+def test_cache_key_follows_contents(tmp_path):
+    f = tmp_path / "types.yaml"
+    f.write_text("hi: there\n")
+    k1 = model_cache_key(f)
+    f.write_text("hi: there again\n")
+    assert model_cache_key(f) != k1
+
+
+def test_cache_key_follows_model_source(tmp_path, monkeypatch):
+    "Editing the modules that build the model changes the key"
+    f = tmp_path / "types.yaml"
+    f.write_text("hi: there\n")
+    k1 = model_cache_key(f)
+    monkeypatch.setattr(
+        "func_adl_servicex_type_generator.model_cache.source_digest",
+        lambda module_files: "edited",
+    )
+    assert model_cache_key(f) != k1
+
+
+def test_source_digest():
+    assert source_digest(("loader.py",)) == source_digest(("loader.py",))
+    assert source_digest(("loader.py",)) != source_digest(("data_model.py",))
+
+
+def test_cache_bad_file_is_reloaded(tmp_path):
+    loader = counting_loader()
+    type_file = Path("./tests/xaod_r21_1.yaml")
+    (tmp_path / f"{model_cache_key(type_file)}.pickle").write_text("garbage")
+
+    d = load_cached_model(type_file, loader, tmp_path)
+
+    assert loader.count == 1
+    assert len(d.classes) > 0
+
+    # The bad file was replaced by a good one
+    load_cached_model(type_file, loader, tmp_path)
+    assert loader.count == 1
+
+
+def test_cache_clear(tmp_path):
+    load_cached_model(Path("./tests/xaod_r21_1.yaml"), load_yaml, tmp_path)
+    assert clear_model_cache(tmp_path) == 1
+    assert get_model_cache_info(tmp_path).n_models == 0
+
+
+def test_cache_evict_oldest(tmp_path):
+    for i, name in enumerate(["old", "middle", "new"]):
+        p = tmp_path / f"{name}.pickle"
+        p.write_bytes(b"x" * 100)
+        os.utime(p, (1000 + i, 1000 + i))
+
+    assert evict_model_cache(tmp_path, 250) == 1
+    assert {p.stem for p in tmp_path.glob("*.pickle")} == {"middle", "new"}
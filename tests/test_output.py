@@ -0,0 +1,94 @@
+from pathlib import Path
+
+from func_adl_servicex_type_generator.output import (
+    as_lines,
+    as_lines_list,
+    output_writer,
+    write_if_changed,
+)
+
+
+def test_as_lines():
+    assert as_lines("a\nb") == "a\nb\n"
+    assert as_lines("a\r\nb\n\n") == "a\nb\n\n"
+    assert as_lines("") == ""
+
+
+def test_as_lines_other_endings():
+    assert as_lines("a\rb\x0cc\u2028") == "a\nb\nc\n"
+
+
+def test_as_lines_list():
+    assert as_lines_list(["a", None, "b"]) == "a\n\nb\n"
+    assert as_lines_list([None]) == "\n"
+    assert as_lines_list([]) == ""
+
+
+def test_write_if_changed_new(tmp_path):
+    f = tmp_path / "a" / "b.py"
+    assert write_if_changed(f, "hi\n")
+    assert f.read_text() == "hi\n"
+
+
+def test_write_if_changed_same(tmp_path):
+    f = tmp_path / "b.py"
+    f.write_text("hi\n")
+    mtime = f.stat().st_mtime_ns
+    assert not write_if_changed(f, "hi\n")
+    assert f.stat().st_mtime_ns == mtime
+
+
+def test_write_if_changed_different(tmp_path):
+    f = tmp_path / "b.py"
+    f.write_text("hi\n")
+    assert write_if_changed(f, "there\n")
+    assert f.read_text() == "there\n"
+
+
+def test_writer_not_incremental_clears(tmp_path):
+    (tmp_path / "old.py").write_text("hi\n")
+    writer = output_writer(tmp_path)
+    writer.write(tmp_path / "new.py", "hi\n")
+    stats = writer.finish()
+
+    assert not (tmp_path / "old.py").exists()
+    assert (stats.written, stats.unchanged, stats.deleted) == (1, 0, 0)
+
+
+def test_writer_incremental(tmp_path):
+    (tmp_path / "same.py").write_text("hi\n")
+    (tmp_path / "changed.py").write_text("hi\n")
+    (tmp_path / "stale").mkdir()
+    (tmp_path / "stale" / "old.py").write_text("hi\n")
+
+    writer = output_writer(tmp_path, incremental=True)
+    writer.write(tmp_path / "same.py", "hi\n")
+    writer.write(tmp_path / "changed.py", "there\n")
+    writer.write_lines(tmp_path / "new.py", "hi")
+    stats = writer.finish()
+
+    assert (stats.written, stats.unchanged, stats.deleted) == (2, 1, 1)
+    assert not (tmp_path / "stale").exists()
+    assert (tmp_path / "new.py").read_text() == "hi\n"
+
+
+def test_writer_incremental_keeps_caches(tmp_path):
+    for p in [Path("__pycache__/a.pyc"), Path(".git/config"), Path("a.egg-info/b")]:
+        (tmp_path / p).parent.mkdir(parents=True)
+        (tmp_path / p).write_text("hi\n")
+
+    writer = output_writer(tmp_path, incremental=True)
+    stats = writer.finish()
+
+    assert stats.deleted == 0
+    assert (tmp_path / "__pycache__" / "a.pyc").exists()
+    assert (tmp_path / ".git" / "config").exists()
+    assert (tmp_path / "a.egg-info" / "b").exists()
+
+
+def test_writer_record(tmp_path):
+    writer = output_writer(tmp_path, incremental=True)
+    writer.record(tmp_path / "a.py", True)
+    writer.record(tmp_path / "b.py", False)
+    stats = writer.finish()
+    assert (stats.written, stats.unchanged) == (1, 1)
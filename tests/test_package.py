@@ -1,5 +1,7 @@
+import dataclasses
 import os
 from pathlib import Path
+from typing import Dict, List
 
 import pytest
 from func_adl_servicex_type_generator.data_model import (
@@ -9,16 +11,26 @@ from func_adl_servicex_type_generator.data_model import (
     enum_value_info,
     extra_parameter,
     file_info,
+    metadata_info,
     method_arg_info,
     method_info,
     normal_parameter,
     parameter_action,
 )
+from func_adl_servicex_type_generator.loader import load_yaml
+from func_adl_servicex_type_generator.output import output_writer
 from func_adl_servicex_type_generator.package import (
+    class_renderer,
+    collection_views,
+    metadata_views,
     py_type_from_cpp,
+    render_pool,
+    subrender_cache_info,
+    template_environment,
     template_package_scaffolding,
     write_out_classes,
 )
+from func_adl_servicex_type_generator.timings import phase_timings
 
 
 @pytest.fixture
@@ -1433,6 +1445,580 @@ def test_method_with_behavior_deref(tmp_path, template_path):
     assert "'deref_count': 2" in all_text
 
 
+def _behavior_class(name: str, method_name: str, behaviors=[]) -> class_info:
+    "A class with a single float method that behaves like `behaviors`"
+    return class_info(
+        f"xAOD.{name}",
+        f"xAOD::{name}",
+        [
+            method_info(
+                name=method_name,
+                return_type="float",
+                arguments=[],
+                param_arguments=[],
+                param_helper=None,
+            )
+        ],
+        None,
+        None,
+        f"{name}.hpp",
+        behaviors=behaviors,
+    )
+
+
+def test_method_with_transitive_behavior(tmp_path, template_path):
+    "Jets behaves like Tracks, which behaves like Hits"
+    classes = [
+        _behavior_class("Jets", "pt1", ["xAOD::Tracks*"]),
+        _behavior_class("Tracks", "pt2", ["xAOD::Hits*"]),
+        _behavior_class("Hits", "pt3"),
+    ]
+
+    write_out_classes(classes, template_path, tmp_path, "package", [""], "22")
+
+    all_text = (tmp_path / "xAOD" / "jets.py").read_text()
+    assert "pt1(self) -> float:" in all_text
+    assert "pt2(self) -> float:" in all_text
+    assert "pt3(self) -> float:" in all_text
+    assert "'deref_count': 1" in all_text
+    assert "'deref_count': 2" in all_text
+    assert "Hits.hpp" in all_text
+
+
+def test_method_with_diamond_behavior(tmp_path, template_path):
+    "A class reached through two behaviors only contributes its methods once"
+    classes = [
+        _behavior_class("Jets", "pt1", ["xAOD::Tracks", "xAOD::Clusters"]),
+        _behavior_class("Tracks", "pt2", ["xAOD::Hits"]),
+        _behavior_class("Clusters", "pt3", ["xAOD::Hits"]),
+        _behavior_class("Hits", "pt4"),
+    ]
+
+    write_out_classes(classes, template_path, tmp_path, "package", [""], "22")
+
+    all_text = (tmp_path / "xAOD" / "jets.py").read_text()
+    assert all_text.count("def pt4(self)") == 1
+
+
+def test_method_with_behavior_cycle(tmp_path, template_path):
+    classes = [
+        _behavior_class("Jets", "pt1", ["xAOD::Tracks"]),
+        _behavior_class("Tracks", "pt2", ["xAOD::Jets"]),
+    ]
+
+    with pytest.raises(RuntimeError) as e:
+        write_out_classes(classes, template_path, tmp_path, "package", [""], "22")
+
+    assert "behaves like itself" in str(e.value)
+
+
+def _read_tree(root: Path) -> Dict[str, str]:
+    "All the files under `root`, by relative path"
+    return {
+        str(f.relative_to(root)): f.read_text()
+        for f in sorted(root.rglob("*"))
+        if f.is_file()
+    }
+
+
+def test_write_classes_in_parallel(tmp_path, template_path):
+    "The output with several workers is identical to the serial output"
+    classes = [
+        _behavior_class(f"Jets{i}", f"pt{i}", ["xAOD::Tracks*"]) for i in range(10)
+    ] + [_behavior_class("Tracks", "eta", [])]
+
+    serial_path = tmp_path / "serial"
+    write_out_classes(classes, template_path, serial_path, "package", [""], "22")
+    write_out_classes(
+        classes, template_path, tmp_path / "parallel", "package", [""], "22", jobs=3
+    )
+
+    serial = _read_tree(serial_path)
+    assert len(serial) == 13
+    assert serial == _read_tree(tmp_path / "parallel")
+
+
+def test_write_classes_in_parallel_views(tmp_path, template_path, monkeypatch):
+    "With workers, the views are only built in the workers"
+    classes = [_behavior_class(f"Jets{i}", f"pt{i}") for i in range(4)]
+    built = []
+    original_view = class_renderer.view
+    monkeypatch.setattr(
+        class_renderer,
+        "view",
+        lambda self, c: built.append(c.name) or original_view(self, c),
+    )
+
+    write_out_classes(classes, template_path, tmp_path, "package", [""], "22", jobs=2)
+
+    # Views built in the (forked) workers are not seen here
+    assert built == []
+    assert "def pt3(self)" in (tmp_path / "xAOD" / "jets3.py").read_text()
+
+
+def test_write_classes_shared_pool(tmp_path, template_path):
+    "Two models rendered by the same workers give the same output as on their own"
+    models = {
+        "a": [_behavior_class(f"Jets{i}", f"pt{i}") for i in range(4)],
+        "b": [_behavior_class(f"Muons{i}", f"eta{i}") for i in range(3)],
+    }
+    for key, classes in models.items():
+        write_out_classes(classes, template_path, tmp_path / key, key, [""], "22")
+
+    with render_pool(2) as pool:
+        for key, classes in models.items():
+            pool.add_model(f"shared_{key}", classes, template_path, key, None)
+        for key, classes in models.items():
+            write_out_classes(
+                classes,
+                template_path,
+                tmp_path / f"shared_{key}",
+                key,
+                [""],
+                "22",
+                pool=pool,
+                pool_key=f"shared_{key}",
+            )
+
+    for key in models:
+        assert _read_tree(tmp_path / key) == _read_tree(tmp_path / f"shared_{key}")
+
+
+def test_render_pool_add_after_start(template_path):
+    with render_pool(1) as pool:
+        pool.start()
+        with pytest.raises(RuntimeError) as e:
+            pool.add_model("a", [], template_path, "package", None)
+        assert "after the render workers have started" in str(e.value)
+
+
+def test_render_pool_unknown_model(tmp_path):
+    with render_pool(1) as pool:
+        with pytest.raises(RuntimeError) as e:
+            list(pool.render("a", {tmp_path / "a.py": 0}))
+        assert "was not added" in str(e.value)
+
+
+def test_write_classes_duplicate_last_wins(tmp_path, template_path):
+    "If a class is listed twice, the last one is written, no matter the workers"
+    classes = [
+        _behavior_class("Jets", "pt1"),
+        _behavior_class("Tracks", "eta"),
+        _behavior_class("Jets", "pt2"),
+    ]
+
+    write_out_classes(classes, template_path, tmp_path, "package", [""], "22", jobs=2)
+
+    all_text = (tmp_path / "xAOD" / "jets.py").read_text()
+    assert "pt1" not in all_text
+    assert "pt2" in all_text
+
+
+def test_write_classes_input_hashes(tmp_path, template_path):
+    "Only classes whose inputs changed are rendered again"
+    classes = [
+        _behavior_class("Jets", "pt1", ["xAOD::Tracks"]),
+        _behavior_class("Tracks", "pt2"),
+        _behavior_class("Muons", "pt3"),
+    ]
+    hashes = write_out_classes(classes, template_path, tmp_path, "package", [""], "22")
+    assert set(hashes.keys()) == {"xAOD/jets.py", "xAOD/tracks.py", "xAOD/muons.py"}
+
+    # Change the behavior class: it and the class that behaves like it change.
+    classes[1] = _behavior_class("Tracks", "pt4")
+    writer = output_writer(tmp_path, incremental=True)
+    new_hashes = write_out_classes(
+        classes,
+        template_path,
+        tmp_path,
+        "package",
+        [""],
+        "22",
+        writer=writer,
+        previous_hashes=hashes,
+    )
+    stats = writer.finish()
+
+    assert new_hashes["xAOD/muons.py"] == hashes["xAOD/muons.py"]
+    assert new_hashes["xAOD/jets.py"] != hashes["xAOD/jets.py"]
+    assert new_hashes["xAOD/tracks.py"] != hashes["xAOD/tracks.py"]
+    assert stats.written == 2
+    assert "pt4" in (tmp_path / "xAOD" / "jets.py").read_text()
+
+
+def test_write_classes_input_hashes_missing_file(tmp_path, template_path):
+    "A class file that was removed is written again even if its inputs are the same"
+    classes = [_behavior_class("Jets", "pt1")]
+    hashes = write_out_classes(classes, template_path, tmp_path, "package", [""], "22")
+    (tmp_path / "xAOD" / "jets.py").unlink()
+
+    write_out_classes(
+        classes, template_path, tmp_path, "package", [""], "22", previous_hashes=hashes
+    )
+
+    assert (tmp_path / "xAOD" / "jets.py").exists()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_write_classes_timings(tmp_path, template_path, jobs):
+    "The phases are timed, and the hook sees every class that is rendered"
+    classes = [
+        _behavior_class(f"Jets{i}", f"pt{i}", ["xAOD::Tracks*"]) for i in range(3)
+    ] + [_behavior_class("Tracks", "eta", [])]
+    timings = phase_timings()
+    rendered = []
+
+    write_out_classes(
+        classes,
+        template_path,
+        tmp_path,
+        "package",
+        [""],
+        "22",
+        jobs=jobs,
+        timings=timings,
+        on_class_rendered=lambda name, t: rendered.append((name, t)),
+    )
+
+    assert {"index", "class_render", "init"} <= set(timings.phases.keys())
+    assert timings.counters["classes_rendered"] == 4
+    assert sorted(name for name, _ in rendered) == sorted(c.name for c in classes)
+    assert all(t >= 0 for _, t in rendered)
+
+
+def test_write_classes_timings_workers_cpu(tmp_path, template_path):
+    "The CPU time of the render workers is part of the class_render phase"
+    classes = [_behavior_class(f"Jets{i}", f"pt{i}") for i in range(20)]
+    timings = phase_timings()
+
+    before = os.times()
+    write_out_classes(
+        classes, template_path, tmp_path, "package", [""], "22", jobs=2, timings=timings
+    )
+    after = os.times()
+
+    workers_cpu = (after.children_user + after.children_system) - (
+        before.children_user + before.children_system
+    )
+    assert timings.phases["class_render"].cpu >= workers_cpu
+
+
+def test_template_environment_shared(template_path):
+    env1 = template_environment(template_path / "files")
+    env2 = template_environment(template_path / "files")
+    assert env1 is env2
+    assert not env1.auto_reload
+    assert "subrender" in env1.filters
+
+
+def test_template_environment_bytecode_cache(tmp_path, template_path):
+    env = template_environment(template_path / "files", tmp_path / "cache")
+    assert env is not template_environment(template_path / "files")
+    assert len(list((tmp_path / "cache").iterdir())) == len(env.list_templates())
+
+
+def test_subrender_cached(template_path):
+    env = template_environment(template_path / "files")
+    t = env.from_string("{{ cb | subrender }}")
+    before = subrender_cache_info()
+
+    assert t.render(cb="{{ package_name }}.fork", package_name="p1") == "p1.fork"
+    assert t.render(cb="{{ package_name }}.fork", package_name="p2") == "p2.fork"
+
+    after = subrender_cache_info()
+    assert after.misses - before.misses <= 1
+    assert after.hits - before.hits >= 1
+
+
+def test_subrender_none(template_path):
+    env = template_environment(template_path / "files")
+    assert env.from_string("{{ cb | subrender }}").render(cb=None) == "None"
+
+
+@pytest.mark.parametrize(
+    "type_file",
+    ["xaod_r21_1.yaml", "xaod_r21_small.yaml", "xaod_r22_1.yaml", "xaod_r25.yaml"],
+)
+def test_fast_engine_matches_jinja(template_path, type_file):
+    "The fast emitter writes exactly what the class template does"
+    data = load_yaml(Path("./tests") / type_file)
+    jinja = class_renderer(data.classes, template_path, "package", data.index)
+    fast = class_renderer(
+        data.classes, template_path, "package", data.index, engine="fast"
+    )
+
+    for c in data.classes:
+        assert fast.render(c) == jinja.render(c), c.name
+
+
+def test_fast_engine_matches_jinja_files(tmp_path, template_path):
+    "Behaviors, enums, and parameterized methods all come out the same"
+    classes = [
+        _behavior_class("Jets", "pt1", ["xAOD::Tracks*"]),
+        _behavior_class("Tracks", "pt2", ["xAOD::Hits"]),
+        _behavior_class("Hits", "pt3"),
+        class_info(
+            "xAOD.Taus",
+            "xAOD::Taus",
+            [
+                method_info(
+                    name="pt",
+                    return_type="float",
+                    arguments=[method_arg_info("err", None, "float")],
+                    param_arguments=[method_arg_info("rtn_type", None, "cpp_type[U]")],
+                    param_helper="fetcher",
+                ),
+                method_info(
+                    name="kind",
+                    return_type="xAOD::Taus::Kind",
+                    arguments=[method_arg_info("k", None, "xAOD.Taus.Kind")],
+                    param_arguments=[],
+                    param_helper=None,
+                ),
+            ],
+            None,
+            None,
+            "tau.hpp",
+            enums=[
+                enum_info(
+                    "Kind", [enum_value_info("One", 1), enum_value_info("Two", 2)]
+                )
+            ],
+        ),
+    ]
+
+    for engine in ["jinja", "fast"]:
+        write_out_classes(
+            classes,
+            template_path,
+            tmp_path / engine,
+            "package",
+            [""],
+            "22",
+            engine=engine,
+        )
+
+    assert _read_tree(tmp_path / "jinja") == _read_tree(tmp_path / "fast")
+
+
+def test_unknown_engine(template_path):
+    with pytest.raises(RuntimeError) as e:
+        class_renderer([], template_path, "package", engine="mako")
+
+    assert "mako" in str(e.value)
+
+
+def test_class_view(template_path):
+    "The view has everything resolved, so the template only writes it out"
+    classes = [
+        _behavior_class("Jets", "pt", ["xAOD::Tracks*"]),
+        _behavior_class("Tracks", "eta"),
+    ]
+    renderer = class_renderer(classes, template_path, "package")
+
+    v = renderer.view(classes[0])
+
+    assert v.class_name == "Jets"
+    assert v.bases == ""
+    assert v.include_files == ["Jets.hpp", "Tracks.hpp"]
+    assert [m.name for m in v.methods] == ["pt", "eta"]
+    assert v.methods[1].metadata == [
+        "'metadata_type': 'add_method_type_info',",
+        "'type_string': 'xAOD::Jets',",
+        "'method_name': 'eta',",
+        "'return_type': 'float',",
+        "'deref_count': 1",
+    ]
+
+
+def test_class_input_hash(template_path):
+    "The input hash follows the inputs, including the classes behaved like"
+    classes = [
+        _behavior_class("Jets", "pt", ["xAOD::Tracks*"]),
+        _behavior_class("Tracks", "eta"),
+    ]
+    changed = [classes[0], _behavior_class("Tracks", "phi")]
+
+    h = class_renderer(classes, template_path, "package").input_hash(classes[0])
+
+    assert h == class_renderer(classes, template_path, "package").input_hash(classes[0])
+    assert h != class_renderer(changed, template_path, "package").input_hash(classes[0])
+    assert h != class_renderer(
+        classes, template_path, "package", config_vars={"a": "b"}
+    ).input_hash(classes[0])
+
+
+def test_class_input_hash_generator_source(template_path, monkeypatch):
+    "Editing the code that renders the classes changes every input hash"
+    classes = [_behavior_class("Jets", "pt")]
+    h = class_renderer(classes, template_path, "package").input_hash(classes[0])
+
+    monkeypatch.setattr(
+        "func_adl_servicex_type_generator.package.source_digest",
+        lambda module_files: "edited",
+    )
+    assert h != class_renderer(classes, template_path, "package").input_hash(classes[0])
+
+
+def _enum_classes(color_values) -> List[class_info]:
+    "Jets has a method that returns an enum of Tracks, and one that returns Hits"
+    jets = class_info(
+        "xAOD.Jets",
+        "xAOD::Jets",
+        [
+            method_info(
+                name="color",
+                return_type="xAOD::Tracks::Color",
+                arguments=[],
+                param_arguments=[],
+                param_helper=None,
+            ),
+            method_info(
+                name="hits",
+                return_type="xAOD::Hits",
+                arguments=[],
+                param_arguments=[],
+                param_helper=None,
+            ),
+        ],
+        None,
+        None,
+        "Jets.hpp",
+    )
+    tracks = class_info(
+        "xAOD.Tracks",
+        "xAOD::Tracks",
+        [],
+        None,
+        None,
+        "Tracks.hpp",
+        enums=[enum_info(name="Color", values=color_values)],
+    )
+    return [jets, tracks, _behavior_class("Hits", "pt")]
+
+
+def test_class_input_hash_other_classes(template_path):
+    "Referenced enums and the names of referenced classes are part of the hash"
+    classes = _enum_classes([enum_value_info("Red", 1)])
+    h = class_renderer(classes, template_path, "package").input_hash(classes[0])
+
+    changed_enum = [classes[0]] + _enum_classes([enum_value_info("Blue", 1)])[1:]
+    assert h != class_renderer(changed_enum, template_path, "package").input_hash(
+        classes[0]
+    )
+
+    renamed = classes[:2] + [dataclasses.replace(classes[2], name="xAOD.HitsRenamed")]
+    assert h != class_renderer(renamed, template_path, "package").input_hash(classes[0])
+
+
+def test_update_classes(template_path):
+    "Updating the model gives what a new renderer would, keeping the rest"
+    classes = _enum_classes([enum_value_info("Red", 1)]) + [
+        _behavior_class("Muons", "pt")
+    ]
+    renderer = class_renderer(classes, template_path, "package")
+    for c in classes:
+        renderer.input_hash(c)
+    muon_pt = renderer.resolve_method(classes[3].methods[0])
+
+    for changed in [
+        _enum_classes([enum_value_info("Blue", 1)])[1],
+        dataclasses.replace(classes[2], name="xAOD.HitsRenamed"),
+    ]:
+        old = next(c for c in classes if c.cpp_name == changed.cpp_name)
+        classes = [changed if c is old else c for c in classes]
+        renderer.update_classes(classes, None, [old, changed])
+
+        fresh = class_renderer(classes, template_path, "package")
+        assert [renderer.input_hash(c) for c in classes] == [
+            fresh.input_hash(c) for c in classes
+        ]
+
+    assert renderer.resolve_method(classes[3].methods[0]) is muon_pt
+
+
+def test_write_classes_views_only_changed(tmp_path, template_path, monkeypatch):
+    "Views are only built for the classes that are rendered"
+    classes = [_behavior_class(f"Jets{i}", f"pt{i}") for i in range(4)]
+    hashes = write_out_classes(classes, template_path, tmp_path, "package", [""], "22")
+
+    built = []
+    original_view = class_renderer.view
+    monkeypatch.setattr(
+        class_renderer,
+        "view",
+        lambda self, c: built.append(c.name) or original_view(self, c),
+    )
+    classes[2] = _behavior_class("Jets2", "eta")
+    write_out_classes(
+        classes, template_path, tmp_path, "package", [""], "22", previous_hashes=hashes
+    )
+
+    assert built == ["xAOD.Jets2"]
+
+
+def test_class_view_callback_context(template_path):
+    "Method callbacks are rendered with the class and package names only"
+    taus = class_info(
+        "xAOD.Taus",
+        "xAOD::Taus",
+        [
+            method_info(
+                name="pt",
+                return_type="float",
+                arguments=[],
+                param_arguments=[method_arg_info("rtn_type", None, "cpp_type[U]")],
+                param_helper="fetcher",
+                param_type_cb="{{package_name}}|{{class_name}}|{{full_class_name}}|"
+                "{{cpp_as_py_namespace}}|{{include_files}}",
+            )
+        ],
+        None,
+        None,
+        "tau.hpp",
+    )
+
+    v = class_renderer([taus], template_path, "my_package").view(taus)
+
+    assert v.methods[0].param_type_cb == "my_package|Taus|xAOD.Taus|xAOD|"
+
+
+def test_collection_views(template_path):
+    env = template_environment(template_path / "package")
+    jets = collection_info(
+        "Jets",
+        "Iterable[Jet]",
+        "Jet",
+        "Jet",
+        "Jet",
+        "DataVector<Jet>",
+        ["xAODJet/Jet.h"],
+        ["xAODJet"],
+        [normal_parameter("name", "str", "'AntiKt4'")],
+        [extra_parameter("calibrate", "bool", "True", [])],
+        "lambda s, a: {{package_name}}.fixup(s, a)",
+    )
+
+    (v,) = collection_views([jets], env, {"package_name": "my_package"})
+
+    assert "'element_type': 'Jet'," in v.metadata
+    assert "'contains_collection': True," in v.metadata
+    assert v.arguments == ", name: str = 'AntiKt4', calibrate: bool = True"
+    assert v.method_callback == "lambda s, a: my_package.fixup(s, a)"
+
+
+def test_metadata_views():
+    metadata = {"md_doit": metadata_info([{"name": "md_doit", "code": ["a", "b"]}])}
+
+    (v,) = metadata_views(metadata)
+
+    assert v.name == "md_doit"
+    assert [(e.key, e.value, e.is_text) for e in v.entries] == [
+        ("name", "md_doit", True),
+        ("code", ["a", "b"], False),
+    ]
+
+
 def test_simple_method_ptr(tmp_path, template_path):
     """Write out a very simple top level class with a method.
 
@@ -0,0 +1,142 @@
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from func_adl_servicex_type_generator.benchmarks.synthetic import (
+    write_synthetic_type_file,
+)
+from func_adl_servicex_type_generator.client import (
+    default_socket_path,
+    generate_request,
+    send_request,
+)
+from func_adl_servicex_type_generator.generator import generate_package
+from func_adl_servicex_type_generator.server import generation_server, serve
+
+
+def _read_tree(root: Path) -> Dict[str, str]:
+    "All the files under `root`, by relative path"
+    return {
+        str(f.relative_to(root)): f.read_text()
+        for f in sorted(root.rglob("*"))
+        if f.is_file() and not f.name.startswith(".")
+    }
+
+
+@pytest.fixture
+def type_file(tmp_path):
+    f = tmp_path / "types.yaml"
+    write_synthetic_type_file(f, 100)
+    yield f
+
+
+@pytest.fixture
+def template_copy(tmp_path):
+    "A copy of the templates that can be edited"
+    shutil.copytree("template", tmp_path / "template")
+    yield tmp_path / "template"
+
+
+def test_generate_request_paths(tmp_path):
+    r = generate_request([Path("types.yaml")], "1.0.0", [Path("out")], jobs=2)
+    assert r["command"] == "generate"
+    assert r["releases"] == [[os.path.abspath("types.yaml"), os.path.abspath("out")]]
+    assert r["cwd"] == os.getcwd()
+    assert r["jobs"] == 2
+
+
+def test_generate_request_mismatch():
+    with pytest.raises(RuntimeError) as e:
+        generate_request([Path("a.yaml"), Path("b.yaml")], "1.0.0", [Path("out")])
+    assert "need as many output directories" in str(e.value)
+
+
+def test_default_socket_path(monkeypatch, tmp_path):
+    monkeypatch.setenv("SX_TYPE_GEN_SOCKET", str(tmp_path / "s.sock"))
+    assert default_socket_path() == tmp_path / "s.sock"
+
+    monkeypatch.delenv("SX_TYPE_GEN_SOCKET")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert default_socket_path() == tmp_path / "sx_type_gen.sock"
+
+
+def test_no_server(tmp_path):
+    with pytest.raises(RuntimeError) as e:
+        send_request({"command": "status"}, tmp_path / "none.sock")
+    assert "No sx_type_gen server" in str(e.value)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_server_generate(tmp_path, type_file, template_copy, jobs):
+    "The model is loaded once, and the output is what generate_package writes"
+    server = generation_server(template_path=template_copy)
+    generate_package(type_file, "1.0.0", tmp_path / "direct")
+
+    for i in range(2):
+        r = server.handle(
+            generate_request(
+                [type_file], "1.0.0", [tmp_path / f"served_{i}"], jobs=jobs
+            )
+        )
+        assert r["ok"], r.get("error", "")
+        assert r["stats"][0]["written"] > 0
+        assert _read_tree(tmp_path / f"served_{i}") == _read_tree(tmp_path / "direct")
+
+    assert server.handle({"command": "status"})["models"] == 1
+
+
+def test_server_template_change(tmp_path, type_file, template_copy):
+    "Templates edited while the server runs are picked up"
+    server = generation_server(template_path=template_copy)
+    request = generate_request([type_file], "1.0.0", [tmp_path / "out"], jobs=1)
+    assert server.handle(request)["ok"]
+
+    object_template = template_copy / "files" / "object.py"
+    object_template.write_text(
+        object_template.read_text().replace('"A class"', '"A served class"')
+    )
+    assert server.handle(request)["ok"]
+
+    text = _read_tree(tmp_path / "out")
+    assert any('"A served class"' in t for t in text.values())
+
+
+def test_server_errors(tmp_path, template_copy):
+    server = generation_server(template_path=template_copy)
+
+    r = server.handle({"command": "fly"})
+    assert not r["ok"]
+    assert "Unknown server command fly" in r["error"]
+
+    r = server.handle(
+        generate_request([tmp_path / "none.yaml"], "1.0.0", [tmp_path / "out"])
+    )
+    assert not r["ok"]
+
+
+def test_serve_socket(tmp_path, type_file, template_copy):
+    "Requests over the socket are answered"
+    socket_path = tmp_path / "s.sock"
+    server = generation_server(template_path=template_copy)
+    threading.Thread(target=serve, args=(socket_path, server), daemon=True).start()
+    for _ in range(100):
+        if socket_path.exists():
+            break
+        time.sleep(0.05)
+
+    assert send_request({"command": "status"}, socket_path)["pid"] == os.getpid()
+    r = send_request(
+        generate_request([type_file], "1.0.0", [tmp_path / "out"], jobs=1),
+        socket_path,
+    )
+    assert r["ok"], r.get("error", "")
+    assert r["stats"][0]["output_directory"] == str(tmp_path / "out")
+    assert "load" in r["timings"]["phases"]
+
+    with pytest.raises(RuntimeError) as e:
+        serve(socket_path, server)
+    assert "already listening" in str(e.value)
@@ -0,0 +1,76 @@
+import json
+
+from func_adl_servicex_type_generator.timings import phase_timings
+
+
+def test_phase_adds_up():
+    t = phase_timings()
+    with t.phase("write"):
+        pass
+    first = t.phases["write"].wall
+    with t.phase("write"):
+        sum(range(10000))
+
+    assert t.phases["write"].wall > first
+    assert t.phases["write"].cpu >= 0
+
+
+def test_phase_timed_on_exception():
+    t = phase_timings()
+    try:
+        with t.phase("load"):
+            raise ValueError("bad")
+    except ValueError:
+        pass
+
+    assert "load" in t.phases
+
+
+def test_counters():
+    t = phase_timings()
+    t.count("classes", 5)
+    t.count("classes")
+
+    assert t.counters == {"classes": 6}
+
+
+def test_as_dict_phase_order():
+    "Known phases come in the order they run, anything else after"
+    t = phase_timings()
+    for p in ["extra", "init", "load"]:
+        with t.phase(p):
+            pass
+
+    d = t.as_dict()
+    assert list(d["phases"].keys()) == ["load", "init", "extra"]
+    assert d["total"]["wall"] == sum(p["wall"] for p in d["phases"].values())
+
+
+def test_as_json():
+    t = phase_timings()
+    with t.phase("load"):
+        pass
+    t.count("classes", 2)
+
+    d = json.loads(t.as_json())
+    assert set(d["phases"]["load"].keys()) == {"wall", "cpu"}
+    assert d["counters"]["classes"] == 2
+
+
+def test_release_timings():
+    "Each release gets its own timings, listed after the overall ones"
+    t = phase_timings()
+    with t.phase("load"):
+        pass
+    with t.release("r22").phase("index"):
+        pass
+    t.release("r22").count("classes", 3)
+
+    d = t.as_dict()
+    assert list(d["releases"].keys()) == ["r22"]
+    assert list(d["releases"]["r22"]["phases"].keys()) == ["index"]
+    assert d["releases"]["r22"]["counters"]["classes"] == 3
+
+
+def test_no_release_timings():
+    assert "releases" not in phase_timings().as_dict()
@@ -0,0 +1,86 @@
+import pytest
+from func_adl_servicex_type_generator.data_model import (
+    class_info,
+    enum_info,
+    enum_value_info,
+)
+from func_adl_servicex_type_generator.type_index import type_index
+
+
+@pytest.fixture
+def index():
+    yield type_index(
+        [
+            class_info(
+                "xAOD.Jets",
+                "xAOD::Jets",
+                [],
+                None,
+                None,
+                "jet.hpp",
+                enums=[enum_info(name="Color", values=[enum_value_info("Red", 1)])],
+            ),
+            class_info("xAOD.Taus", "xAOD::Taus", [], None, None, "tau.hpp"),
+        ]
+    )
+
+
+def test_index_lookup(index):
+    assert index.by_python["xAOD.Jets"].cpp_name == "xAOD::Jets"
+    assert index.by_cpp["xAOD::Taus"].name == "xAOD.Taus"
+    assert index.python_names == {"xAOD.Jets", "xAOD.Taus"}
+
+
+def test_index_last_class_wins():
+    index = type_index(
+        [
+            class_info("xAOD.Jets", "xAOD::Jets", [], None, None, "jet1.hpp"),
+            class_info("xAOD.Jets", "xAOD::Jets", [], None, None, "jet2.hpp"),
+        ]
+    )
+    assert index.by_python["xAOD.Jets"].include_file == "jet2.hpp"
+    assert index.by_cpp["xAOD::Jets"].include_file == "jet2.hpp"
+
+
+@pytest.mark.parametrize(
+    "cpp_type, py_type",
+    [
+        ("xAOD::Jets", "xAOD.Jets"),
+        ("const xAOD::Jets*", "xAOD.Jets"),
+        ("unsigned int", "int"),
+        ("float&", "float"),
+        ("const xAOD::Jets&", "xAOD.Jets"),
+        ("T", "T"),
+        ("xAOD::Jets::Color", "xAOD.Jets.Color"),
+    ],
+)
+def test_index_py_type_from_cpp(index, cpp_type, py_type):
+    assert index.py_type_from_cpp(cpp_type) == py_type
+    # And again, from the cache
+    assert index.py_type_from_cpp(cpp_type) == py_type
+
+
+@pytest.mark.parametrize("cpp_type", ["xAOD::Jets::ColorR", "xAOD::Fork", None])
+def test_index_py_type_from_cpp_bad(index, cpp_type):
+    with pytest.raises(RuntimeError):
+        index.py_type_from_cpp(cpp_type)
+
+
+def test_index_lookup_enum(index):
+    r = index.lookup_enum("xAOD.Jets.Color")
+    assert r is not None
+    assert r[0].name == "xAOD.Jets"
+    assert r[1].name == "Color"
+
+    assert index.lookup_enum("xAOD.Jets.Flavor") is None
+    assert index.lookup_enum("xAOD.Taus.Color") is None
+    assert index.lookup_enum("float") is None
+
+
+def test_index_package_qualified(index):
+    assert index.package_qualified("xAOD.Jets", "pkg") == "pkg.xAOD.jets.Jets"
+    assert index.package_qualified("Iterable[xAOD.Jets]", "pkg") == (
+        "pkg.FADLStream[pkg.xAOD.jets.Jets]"
+    )
+    assert index.package_qualified("float", "pkg") == "float"
+    assert index.package_qualified(None, "pkg") is None
@@ -0,0 +1,155 @@
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict
+
+import pytest
+import yaml
+from func_adl_servicex_type_generator.benchmarks.synthetic import (
+    synthetic_type_document,
+)
+from func_adl_servicex_type_generator.generator import generate_package
+from func_adl_servicex_type_generator.watch import (
+    changed_files,
+    file_states,
+    release_watcher,
+    watch_releases,
+)
+
+
+def _read_tree(root: Path) -> Dict[str, str]:
+    "All the files under `root`, by relative path"
+    return {
+        str(f.relative_to(root)): f.read_text()
+        for f in sorted(root.rglob("*"))
+        if f.is_file() and not f.name.startswith(".")
+    }
+
+
+@pytest.fixture
+def type_directory(tmp_path):
+    "A synthetic model split into two shards"
+    doc = synthetic_type_document(60)
+    classes = doc.pop("classes")
+    directory = tmp_path / "types"
+    directory.mkdir()
+    with (directory / "a.yaml").open("wt") as f:
+        yaml.safe_dump(dict(doc, classes=classes[:30]), f, sort_keys=False)
+    with (directory / "b.yaml").open("wt") as f:
+        yaml.safe_dump({"classes": classes[30:]}, f, sort_keys=False)
+    yield directory
+
+
+@pytest.fixture
+def template_copy(tmp_path):
+    "A copy of the templates that can be edited"
+    shutil.copytree("template", tmp_path / "template")
+    yield tmp_path / "template"
+
+
+def _edit(p: Path, old: str, new: str):
+    text = p.read_text()
+    assert old in text
+    p.write_text(text.replace(old, new, 1))
+
+
+def test_file_states(tmp_path):
+    (tmp_path / "d").mkdir()
+    (tmp_path / "d" / "a.txt").write_text("hi")
+    (tmp_path / "b.txt").write_text("there")
+
+    before = file_states([tmp_path / "d", tmp_path / "b.txt", tmp_path / "none"])
+    assert set(before.keys()) == {tmp_path / "d" / "a.txt", tmp_path / "b.txt"}
+
+    (tmp_path / "d" / "a.txt").write_text("hello")
+    (tmp_path / "d" / "c.txt").write_text("new")
+    (tmp_path / "b.txt").unlink()
+    after = file_states([tmp_path / "d", tmp_path / "b.txt"])
+
+    assert changed_files(before, after) == [
+        tmp_path / "b.txt",
+        tmp_path / "d" / "a.txt",
+        tmp_path / "d" / "c.txt",
+    ]
+    assert changed_files(after, after) == []
+
+
+def test_watch_type_file_edit(tmp_path, type_directory, template_copy):
+    "Editing a shard writes the classes that changed, and nothing else"
+    w = release_watcher(
+        type_directory, "1.0.0", tmp_path / "out", template_path=template_copy
+    )
+    first = w.update()
+    assert first is not None and first.written > 0
+    assert w.update() is None
+
+    _edit(type_directory / "b.yaml", "name: method0\n", "name: methodRenamed\n")
+    stats = w.update()
+
+    assert stats is not None
+    assert 0 < stats.written < 5
+    assert stats.unchanged > 0
+
+    generate_package(type_directory, "1.0.0", tmp_path / "fresh")
+    assert _read_tree(tmp_path / "out") == _read_tree(tmp_path / "fresh")
+    assert "methodRenamed" in "".join(_read_tree(tmp_path / "out").values())
+
+
+def test_watch_referenced_class_renamed(tmp_path, type_directory, template_copy):
+    "Renaming a class updates the classes in the other shard that refer to it"
+    w = release_watcher(
+        type_directory, "1.0.0", tmp_path / "out", template_path=template_copy
+    )
+    w.update()
+
+    assert "xAOD::Trig::Object7_v1 *" in (type_directory / "b.yaml").read_text()
+    _edit(
+        type_directory / "a.yaml",
+        "python_name: xAOD.Trig.Object7_v1\n",
+        "python_name: xAOD.Trig.Object7Renamed_v1\n",
+    )
+    stats = w.update()
+
+    assert stats is not None
+    assert stats.deleted > 0
+    generate_package(type_directory, "1.0.0", tmp_path / "fresh")
+    out = _read_tree(tmp_path / "out")
+    assert out == _read_tree(tmp_path / "fresh")
+    assert any("Object7Renamed_v1" in t for n, t in out.items() if "Object7" not in n)
+
+
+def test_watch_template_edit(tmp_path, type_directory, template_copy):
+    "Editing the class template writes every class again"
+    w = release_watcher(
+        type_directory, "1.0.0", tmp_path / "out", template_path=template_copy
+    )
+    first = w.update()
+    assert first is not None
+
+    _edit(template_copy / "files" / "object.py", '"A class"', '"A watched class"')
+    stats = w.update()
+
+    assert stats is not None
+    assert stats.written >= 30
+    text = _read_tree(tmp_path / "out")
+    assert any('"A watched class"' in t for t in text.values())
+
+
+def test_watch_bad_type_file(tmp_path, type_directory, template_copy, caplog):
+    "A broken type file is logged, and the next good one is picked up"
+    w = release_watcher(
+        type_directory, "1.0.0", tmp_path / "out", template_path=template_copy
+    )
+    w.update()
+    good = (type_directory / "b.yaml").read_text()
+    (type_directory / "b.yaml").write_text("classes: [")
+
+    updates = []
+    with caplog.at_level(logging.ERROR):
+        watch_releases([w], 0.0, on_update=lambda *a: updates.append(a), max_polls=2)
+    assert len(updates) == 0
+    assert caplog.text.count("Unable to generate") == 1
+
+    (type_directory / "b.yaml").write_text(good + "\n")
+    watch_releases([w], 0.0, on_update=lambda *a: updates.append(a), max_polls=1)
+    assert len(updates) == 1